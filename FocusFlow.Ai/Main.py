@@ -4,19 +4,23 @@ import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
-
-try:
-    import ollama  # type: ignore
-except ModuleNotFoundError:
-    ollama = None  # type: ignore
+from fastapi.responses import JSONResponse, RedirectResponse, Response
 
+from config import settings
 from features.email.analysis.router import router as email_analysis_router
 from features.email.reply.router import router as email_reply_router
 from features.email.compose.router import router as email_compose_router
 from features.email.tasks.router import router as email_tasks_router
+from features.email.process.router import router as email_process_router
+from features.email.triage.router import router as email_triage_router
+from features.admin.router import router as admin_router
+from shared.backends import create_backend
+from shared.circuit_breaker import llm_breaker
+from shared.disconnect import ClientDisconnected
+from shared.residency import model_residency
+from shared.scheduler import SchedulerOverloaded
 
 
 def _configure_logging() -> None:
@@ -32,42 +36,36 @@ logger = logging.getLogger("focusflow.main")
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
-    Routers verwachten request.app.state.ollama_client
+    Routers verwachten request.app.state.ollama_client (historische naam: dit is de
+    actieve inference-backend uit settings.llm_backend).
     """
-    if ollama is None:
+    try:
+        backend = create_backend(settings)
+    except ModuleNotFoundError as e:
         app.state.ollama_client = object()
-        logger.warning("Ollama package not installed; AI calls will not work.")
+        model_residency.disable()
+        logger.warning("LLM backend '%s' not available (%s); AI calls will not work.", settings.llm_backend, e)
         yield
         return
 
-    client = ollama.AsyncClient()
-    app.state.ollama_client = client
-
-    try:
-        from shared.ai_client import warmup_ollama_model
-        await warmup_ollama_model(client)
-        logger.info("Ollama warm-up done (model loaded).")
+    app.state.ollama_client = backend
 
-    except asyncio.CancelledError:
-        logger.info("Startup cancelled (reload/shutdown).")
-        raise
-
-    except Exception as e:
-        logger.warning("Ollama warm-up failed: %s", e)
+    from features.email.warmup import email_warmup_prompts
+    model_residency.register_prompts(email_warmup_prompts(settings.default_user_name))
+    # warm-up op de achtergrond: /health meldt "warming" (503) tot de modellen geladen zijn
+    model_residency.start(backend)
+    logger.info("Warm-up started (backend=%s).", backend.name)
 
     try:
         yield
     finally:
+        await model_residency.stop()
         try:
-            close_fn = getattr(client, "aclose", None) or getattr(client, "close", None)
-            if close_fn is not None:
-                res = close_fn()
-                if asyncio.iscoroutine(res):
-                    await res
+            await backend.aclose()
         except asyncio.CancelledError:
             pass
         except Exception as e:
-            logger.warning("Error while closing Ollama client: %s", e)
+            logger.warning("Error while closing LLM backend: %s", e)
 
 
 _configure_logging()
@@ -85,6 +83,21 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(SchedulerOverloaded)
+async def scheduler_overloaded_handler(request: Request, exc: SchedulerOverloaded):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "AI-service is overbelast, probeer later opnieuw.", "priority": exc.priority},
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+    )
+
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    # niemand leest dit antwoord meer; 499 zoals nginx voor "client closed request"
+    return Response(status_code=499)
+
+
 @app.get("/", include_in_schema=False)
 def root():
     return RedirectResponse(url="/docs")
@@ -92,10 +105,31 @@ def root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    """
+    Readiness: 503 alleen tot de eerste geslaagde warm-up (zie shared.residency).
+    Daarna blijft het 200: een uitgeladen model, een onbereikbare backend of een open
+    breaker maakt de service niet unready (die antwoordt dan degraded); de toestand
+    staat informatief in "llm".
+    """
+    residency = model_residency.stats()
+    ready = residency["ready"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ok" if ready else "warming",
+            "llm": {
+                "breaker": llm_breaker.stats(),
+                "resident": residency["resident"],
+                "models": residency["models"],
+            },
+        },
+    )
 
 
 app.include_router(email_analysis_router)
 app.include_router(email_reply_router)
 app.include_router(email_compose_router)
 app.include_router(email_tasks_router)
+app.include_router(email_process_router)
+app.include_router(email_triage_router)
+app.include_router(admin_router)
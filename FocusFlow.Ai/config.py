@@ -1,15 +1,99 @@
-﻿from pydantic import BaseModel
+﻿from typing import Dict, List, Optional
+
+from pydantic import BaseModel
 
 
 class Settings(BaseModel):
     ai_model: str = "llama3.2"
-    prompt_version: str = "1.0.0"
+    # klein model voor korte/eenvoudige calls (bv. "llama3.2:1b"); None = altijd ai_model
+    ai_model_small: Optional[str] = None
+    model_small_endpoints: List[str] = ["email-analysis", "email-analysis-fields", "extract-tasks", "email-process"]
+    model_small_languages: List[str] = ["nl", "en"]
+    model_small_max_tokens: int = 600
+    # taken met lagere confidence van het kleine model => opnieuw met ai_model
+    model_escalate_confidence: float = 0.6
+    prompt_version: str = "1.1.0"
     ollama_timeout_seconds: int = 25
 
+    # "ollama" | "openai" (llama.cpp server, vLLM, ...) | "fake"
+    llm_backend: str = "ollama"
+    ollama_host: Optional[str] = None
+    # meerdere hosts => pool met least-loaded routing; leeg = alleen ollama_host
+    ollama_hosts: List[str] = []
+    ollama_max_connections_per_host: Optional[int] = None
+    ollama_max_keepalive_per_host: Optional[int] = None
+    pool_eject_after_failures: int = 3
+    pool_eject_seconds: float = 30.0
+    # per host; lager dan ollama_timeout_seconds zodat de pool een hangende host zelf ziet
+    # (anders komt die alleen als annulering binnen en wordt hij nooit uitgesloten)
+    pool_host_timeout_seconds: float = 20.0
+    # hoe lang Ollama een model geladen houdt na de laatste call; per model te overschrijven
+    ollama_keep_alive: str = "30m"
+    ollama_keep_alive_per_model: Dict[str, str] = {}
+    # residency: geladen modellen nakijken en uitgeladen modellen opnieuw opwarmen
+    residency_poll_seconds: float = 60.0
+    residency_warm_prompts: bool = True
+    openai_base_url: str = "http://localhost:8080/v1"
+    openai_api_key: Optional[str] = None
+    openai_json_schema: bool = True
+
+    ollama_parallel_slots: int = 4
+    queue_limit_interactive: int = 8
+    queue_limit_standard: int = 32
+    queue_limit_batch: int = 256
+
+    # hedging: tweede poging als een call de p90 van zijn endpoint overschrijdt
+    hedge_enabled: bool = False
+    hedge_percentile: float = 0.9
+    hedge_min_samples: int = 20
+    hedge_max_ratio: float = 0.1
+    # circuit breaker: na N fouten meteen degraded antwoorden, probe na reset_seconds
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 15.0
+
+    # JSON-schema met korte keys als format (backends met json_schema-capability)
+    llm_structured_output: bool = True
+
+    # ongeldige JSON: beperkt opnieuw proberen met lagere temperature
+    json_retry_attempts: int = 1
+    json_retry_temperature: float = 0.0
+    # afgekapt op num_predict/contextlimiet (done_reason "length"): verder laten schrijven
+    llm_max_continuations: int = 2
+
+    batch_max_concurrency: int = 4
+    pack_max_body_chars: int = 600
+    pack_max_items: int = 8
+
     summary_max_chars: int = 400
     max_body_chars: int = 12000
+    max_body_tokens: int = 3000
+
+    # lange mails: map-reduce over stukken i.p.v. afkappen
+    chunking_enabled: bool = True
+    chunk_max_tokens: int = 1500
+    chunk_max_count: int = 8
+    num_predict_chunk: int = 384
+    num_predict_reduce: int = 256
+
+    # vaste contextgroottes: een andere num_ctx laat Ollama het model herladen
+    llm_num_ctx_tiers: List[int] = [4096, 8192]
+    llm_prompt_overhead_tokens: int = 64
+    token_estimate_margin: float = 1.1
+
+    num_predict_default: int = 512
+    num_predict_analysis: int = 512
+    num_predict_tasks: int = 768
+    num_predict_process: int = 1024
+    num_predict_reply: int = 768
+    num_predict_compose: int = 1024
 
     default_user_name: str = "Karsten"
 
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 24 * 3600
+    llm_cache_max_bytes: int = 16 * 1024 * 1024
+    llm_cache_sqlite_path: Optional[str] = None
+    llm_cache_sqlite_max_bytes: int = 256 * 1024 * 1024
+
 
 settings = Settings()
@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, Request
+
+from shared.disconnect import disconnect_metrics
+from shared.hedging import llm_hedging
+from shared.llm_cache import llm_cache
+from shared.model_router import model_router
+from shared.scheduler import llm_scheduler
+from shared.single_flight import llm_flights
+
+logger = logging.getLogger("focusflow.admin.router")
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.get("/llm-cache")
+def llm_cache_stats() -> Dict[str, Any]:
+    return llm_cache.stats()
+
+
+@router.delete("/llm-cache")
+def llm_cache_flush() -> Dict[str, Any]:
+    flushed = llm_cache.clear()
+    logger.info(
+        "llm cache flushed (memory=%d disk=%d)",
+        flushed["memoryEntries"],
+        flushed["diskEntries"],
+    )
+    return {"flushed": flushed, "stats": llm_cache.stats()}
+
+
+@router.get("/llm-inflight")
+def llm_inflight_stats() -> Dict[str, int]:
+    return llm_flights.stats()
+
+
+@router.get("/disconnects")
+def disconnect_stats() -> Dict[str, Any]:
+    return disconnect_metrics.stats()
+
+
+@router.get("/llm-hedging")
+def llm_hedging_stats() -> Dict[str, Any]:
+    return llm_hedging.stats()
+
+
+@router.get("/model-routing")
+def model_routing_stats() -> Dict[str, Any]:
+    return model_router.stats()
+
+
+@router.get("/scheduler")
+def scheduler_stats() -> Dict[str, Any]:
+    return llm_scheduler.stats()
+
+
+@router.get("/llm-hosts")
+def llm_hosts_stats(request: Request) -> Dict[str, Any]:
+    client = getattr(request.app.state, "ollama_client", None)
+    stats_fn = getattr(client, "stats", None)
+    hosts = stats_fn() if callable(stats_fn) else []
+    return {"backend": getattr(client, "name", None), "hosts": hosts}
@@ -0,0 +1,205 @@
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import ollama
+
+from config import settings
+from shared.llm_json import run_llm_json
+from shared.scheduler import SchedulerOverloaded
+
+from features.email.schemas import AnalyzeBatchItem, AnalyzeBatchResult, AnalyzeEmailResponse
+from features.email.utils.email_text import (
+    build_email_context,
+    is_effectively_empty,
+    make_email_input,
+    trim_body_for_processing,
+)
+from features.email.analysis.prompts import email_analysis_packed_system_prompt
+from features.email.analysis.service import analyze_email, fallback_response, map_to_response
+
+logger = logging.getLogger("focusflow.email.analysis.batch")
+
+_WorkUnit = Union[AnalyzeBatchItem, List[AnalyzeBatchItem]]
+
+
+def _item_result(item_id: str, result: AnalyzeEmailResponse) -> AnalyzeBatchResult:
+    # fallback of onvolledige analyse (timeout, modelfout, deadline): bruikbaar, maar niet ok
+    if result.isPartial:
+        return AnalyzeBatchResult(id=item_id, ok=False, error="degraded", result=result)
+    return AnalyzeBatchResult(id=item_id, result=result)
+
+
+async def _analyze_item(
+    client: ollama.AsyncClient,
+    item: AnalyzeBatchItem,
+    user_name: str,
+) -> AnalyzeBatchResult:
+    try:
+        result = await analyze_email(
+            client=client,
+            subject=item.subject,
+            body=item.body,
+            sender=item.sender,
+            received_at_utc=item.receivedAtUtc,
+            thread_hint=item.threadHint,
+            user_name=user_name,
+            fields=item.fields,
+            priority="batch",
+        )
+        return _item_result(item.id, result)
+
+    except SchedulerOverloaded:
+        logger.warning("batch item %s shed (queue full)", item.id)
+        return AnalyzeBatchResult(id=item.id, ok=False, error="overloaded", result=fallback_response("error"))
+
+    except Exception:
+        logger.exception("batch item %s failed", item.id)
+        return AnalyzeBatchResult(id=item.id, ok=False, error="error", result=fallback_response("error"))
+
+
+def _is_packable(item: AnalyzeBatchItem) -> bool:
+    if item.fields or is_effectively_empty(item.subject, item.body):
+        return False
+    return len(trim_body_for_processing(item.body or "")) <= settings.pack_max_body_chars
+
+
+def _plan_work(items: List[AnalyzeBatchItem], pack: bool) -> List[_WorkUnit]:
+    if not pack:
+        return list(items)
+
+    singles: List[_WorkUnit] = []
+    short = []
+    for item in items:
+        (short if _is_packable(item) else singles).append(item)
+
+    size = max(1, settings.pack_max_items)
+    packs: List[_WorkUnit] = []
+    for i in range(0, len(short), size):
+        group = short[i:i + size]
+        packs.append(group if len(group) > 1 else group[0])
+
+    logger.info("batch packing (short=%d packs=%d singles=%d)", len(short), len(packs), len(singles))
+    return packs + singles
+
+
+def _build_packed_user_prompt(items: List[AnalyzeBatchItem]) -> str:
+    blocks = []
+    for index, item in enumerate(items):
+        email = make_email_input(
+            subject=item.subject,
+            body=item.body,
+            sender=item.sender,
+            received_at_utc=item.receivedAtUtc,
+            thread_hint=item.threadHint,
+        )
+        blocks.append(f"### E-mail {index}\n{build_email_context(email)}")
+    return "\n\n".join(blocks)
+
+
+def _index_entries(data: Optional[Dict[str, Any]], count: int) -> Dict[int, Dict[str, Any]]:
+    raw = (data or {}).get("results")
+    if not isinstance(raw, list):
+        return {}
+
+    entries: Dict[int, Dict[str, Any]] = {}
+    for entry in raw:
+        if not isinstance(entry, dict) or not entry.get("category"):
+            continue
+        index = entry.get("index")
+        if isinstance(index, int) and 0 <= index < count and index not in entries:
+            entries[index] = entry
+    return entries
+
+
+async def _analyze_pack(
+    client: ollama.AsyncClient,
+    items: List[AnalyzeBatchItem],
+    user_name: str,
+) -> AsyncIterator[AnalyzeBatchResult]:
+    data = None
+    try:
+        data, status = await run_llm_json(
+            client=client,
+            system_prompt=email_analysis_packed_system_prompt(user_name, len(items)),
+            user_prompt=_build_packed_user_prompt(items),
+            log_name="email-analysis-packed",
+            preview=False,
+            cache=True,
+            priority="batch",
+            num_predict=settings.num_predict_analysis * len(items),
+        )
+    except SchedulerOverloaded:
+        status = "overloaded"
+
+    entries = _index_entries(data, len(items))
+    if len(entries) < len(items):
+        logger.warning("packed analysis incomplete (status=%s entries=%d/%d)", status, len(entries), len(items))
+
+    for index, item in enumerate(items):
+        result = None
+        entry = entries.get(index)
+        if entry is not None:
+            try:
+                result = map_to_response(
+                    entry,
+                    subject=item.subject or "",
+                    body=item.body or "",
+                    received_at_utc=item.receivedAtUtc,
+                )
+                if status != "ok":
+                    # gered uit kapotte JSON: velden kunnen ontbreken
+                    result = result.model_copy(update={"isPartial": True})
+            except Exception:
+                logger.warning("packed entry %d malformed", index, exc_info=True)
+
+        if result is None:
+            # ontbrekend of onbruikbaar item => gewone single-mail call
+            yield await _analyze_item(client, item, user_name)
+        else:
+            yield _item_result(item.id, result)
+
+
+async def analyze_email_batch(
+    *,
+    client: ollama.AsyncClient,
+    items: List[AnalyzeBatchItem],
+    user_name: str,
+    concurrency: Optional[int] = None,
+    pack: bool = False,
+) -> AsyncIterator[AnalyzeBatchResult]:
+    """
+    Analyseert items met begrensde fan-out en levert elk resultaat op zodra het klaar is
+    (volgorde van afwerking, niet van input). Met pack=True gaan korte mails per groep
+    in één prompt.
+    """
+    limit = max(1, min(concurrency or settings.batch_max_concurrency, settings.batch_max_concurrency))
+    units = _plan_work(items, pack)
+
+    pending: "asyncio.Queue[_WorkUnit]" = asyncio.Queue()
+    for unit in units:
+        pending.put_nowait(unit)
+
+    done: "asyncio.Queue[AnalyzeBatchResult]" = asyncio.Queue()
+
+    async def _worker() -> None:
+        while True:
+            try:
+                unit = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            if isinstance(unit, list):
+                async for result in _analyze_pack(client, unit, user_name):
+                    await done.put(result)
+            else:
+                await done.put(await _analyze_item(client, unit, user_name))
+
+    logger.info("batch started (items=%d concurrency=%d pack=%s)", len(items), limit, pack)
+    workers = [asyncio.create_task(_worker()) for _ in range(min(limit, len(units)))]
+    try:
+        for _ in range(len(items)):
+            yield await done.get()
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -3,16 +3,16 @@
 Je bent FocusFlow, assistent voor {user_name}.
 Gebruik uitsluitend informatie die letterlijk in de e-mail staat. Maak geen aannames.
 
-Geef een JSON-object terug met exact deze velden:
-- summary: max 2 zinnen (NL), moet overeenkomen met keyRequest
+Geef een JSON-object terug met exact deze velden, in deze volgorde:
+- category: één van ["Werk","Prive","Reclame","Factuur","Overig"]
+- suggested_action: één van ["Lezen","Antwoorden","Actie Vereist","Inplannen"]
 - priority_score: geheel getal 0–100 (best effort)
 - priority_signals: lijst van 0+ items, kies enkel uit:
   ["URGENT_WORDS","DEADLINE_MENTIONED","DUE_DATE_SOON","INVOICE_PAYMENT",
    "ACCOUNT_BLOCKED","INCIDENT_OUTAGE","MEETING_SCHEDULE","FOLLOW_UP_NEEDED",
    "FYI_ONLY","SPAM_OR_MARKETING","NO_ACTION_REQUIRED"]
-- category: één van ["Werk","Prive","Reclame","Factuur","Overig"]
-- suggested_action: één van ["Lezen","Antwoorden","Actie Vereist","Inplannen"]
 - keyRequest: 1 korte zin: wat wordt er gevraagd? (NL)
+- summary: max 2 zinnen (NL), moet overeenkomen met keyRequest
 - evidence: lijst van 1–3 letterlijke korte quotes (max 90 tekens per quote)
 - tasks: lijst (mag leeg zijn), elk item:
   - description: kort
@@ -31,3 +31,52 @@ tasks=[], keyRequest="", evidence=[]
 
 Retourneer alleen geldige JSON. Geen extra tekst.
 """.strip()
+
+
+def email_analysis_packed_system_prompt(user_name: str, count: int) -> str:
+    per_email = email_analysis_system_prompt(user_name)
+    return f"""
+Je krijgt {count} korte e-mails, genummerd van 0 tot {count - 1} ("### E-mail <index>").
+Analyseer elke e-mail apart; neem geen informatie over tussen e-mails.
+
+Geef één JSON-object terug met exact deze vorm:
+{{ "results": [ {{ "index": 0, ...velden... }}, {{ "index": 1, ...velden... }} ] }}
+- precies één item per e-mail, met het juiste "index"
+- ...velden... zijn de velden hieronder
+
+Regels per e-mail:
+{per_email}
+""".strip()
+
+
+def email_chunk_analysis_system_prompt(user_name: str, part: int, parts: int) -> str:
+    return f"""
+Je bent FocusFlow, assistent voor {user_name}.
+Je krijgt deel {part} van {parts} van een lange e-mail. Gebruik enkel wat in dit deel staat.
+
+Geef een JSON-object terug met exact deze velden:
+- category: één van ["Werk","Prive","Reclame","Factuur","Overig"]
+- suggested_action: één van ["Lezen","Antwoorden","Actie Vereist","Inplannen"]
+- keyRequest: 1 korte zin: wat wordt er in dit deel gevraagd? (NL, mag leeg zijn)
+- summary: max 1 zin (NL)
+- evidence: lijst van 0–2 letterlijke korte quotes (max 90 tekens per quote)
+- tasks: lijst (mag leeg zijn), elk item: description (kort), priority ("High" | "Medium" | "Low")
+
+Retourneer alleen geldige JSON. Geen extra tekst.
+""".strip()
+
+
+def email_chunk_reduce_system_prompt(user_name: str) -> str:
+    return f"""
+Je bent FocusFlow, assistent voor {user_name}.
+Je krijgt deelanalyses (JSON) van opeenvolgende stukken van één lange e-mail.
+Combineer ze tot één analyse van de hele e-mail.
+
+Geef een JSON-object terug met exact deze velden:
+- category: één van ["Werk","Prive","Reclame","Factuur","Overig"]
+- suggested_action: één van ["Lezen","Antwoorden","Actie Vereist","Inplannen"]
+- keyRequest: 1 korte zin: wat wordt er gevraagd? (NL)
+- summary: max 2 zinnen (NL), moet overeenkomen met keyRequest
+
+Retourneer alleen geldige JSON. Geen extra tekst.
+""".strip()
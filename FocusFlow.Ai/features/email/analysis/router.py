@@ -1,9 +1,16 @@
 ﻿import logging
+from contextlib import aclosing
+
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 
 from config import settings
-from features.email.schemas import AnalyzeEmailRequest, AnalyzeEmailResponse
-from features.email.analysis.service import analyze_email
+from features.email.schemas import AnalyzeBatchRequest, AnalyzeEmailRequest, AnalyzeEmailResponse
+from features.email.analysis.service import analyze_email, stream_analyze_email
+from features.email.analysis.batch import analyze_email_batch
+from shared.deadline import request_deadline
+from shared.disconnect import cancel_on_disconnect
+from shared.sse import sse_response
 
 logger = logging.getLogger("focusflow.email.analysis.router")
 
@@ -21,12 +28,68 @@ async def analyze_email_endpoint(req: AnalyzeEmailRequest, request: Request):
 
     client = request.app.state.ollama_client
 
-    return await analyze_email(
-        client=client,
-        subject=req.subject,
-        body=req.body,
-        sender=req.sender,
-        received_at_utc=req.receivedAtUtc,
-        thread_hint=req.threadHint,
-        user_name=settings.default_user_name,
+    return await cancel_on_disconnect(
+        request,
+        analyze_email(
+            client=client,
+            subject=req.subject,
+            body=req.body,
+            sender=req.sender,
+            received_at_utc=req.receivedAtUtc,
+            thread_hint=req.threadHint,
+            user_name=settings.default_user_name,
+            fields=req.fields,
+            deadline=request_deadline(request, req.deadlineMs),
+        ),
+        route="email-analyze",
+    )
+
+
+@router.post("/analyze/stream", response_class=StreamingResponse)
+async def analyze_email_stream_endpoint(req: AnalyzeEmailRequest, request: Request):
+    logger.info(
+        "stream request received (subject_len=%d body_len=%d sender=%s)",
+        len(req.subject or ""),
+        len(req.body or ""),
+        "yes" if req.sender else "no",
+    )
+
+    client = request.app.state.ollama_client
+
+    return await sse_response(
+        stream_analyze_email(
+            client=client,
+            subject=req.subject,
+            body=req.body,
+            sender=req.sender,
+            received_at_utc=req.receivedAtUtc,
+            thread_hint=req.threadHint,
+            user_name=settings.default_user_name,
+        )
     )
+
+
+@router.post(
+    "/analyze/batch",
+    response_class=StreamingResponse,
+    summary="Analyze many emails, streamed back as NDJSON",
+    description="Each line is an AnalyzeBatchResult tagged with the caller's item id, written as soon as that item finishes.",
+)
+async def analyze_email_batch_endpoint(req: AnalyzeBatchRequest, request: Request):
+    logger.info("batch request received (items=%d concurrency=%s)", len(req.items), req.concurrency or "default")
+
+    client = request.app.state.ollama_client
+
+    async def _lines():
+        results = analyze_email_batch(
+            client=client,
+            items=req.items,
+            user_name=settings.default_user_name,
+            concurrency=req.concurrency,
+            pack=req.pack,
+        )
+        async with aclosing(results):
+            async for result in results:
+                yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
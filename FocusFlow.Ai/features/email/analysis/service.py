@@ -1,12 +1,14 @@
-﻿import logging
-import re
+﻿import json
+import logging
+from contextlib import aclosing
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 import ollama
 
 from config import settings
-from shared.llm_json import run_llm_json
+from shared.llm_json import run_llm_json, stream_llm_json
+from shared.scheduler import Priority
 from shared.text_normalize import bucket_priority, clamp, normalize_choice, parse_int
 
 from features.email.constants import (
@@ -14,30 +16,36 @@ from features.email.constants import (
     ALLOWED_CATEGORIES,
     ALLOWED_TASK_PRIORITIES,
 )
-from features.email.schemas import AnalyzeEmailResponse, TaskItem
+from features.email.contracts import ANALYSIS_CONTRACT, CHUNK_ANALYSIS_CONTRACT, CHUNK_REDUCE_CONTRACT
+from features.email.schemas import AnalyzeEmailResponse, EmailInput, TaskItem
 from features.email.utils.email_text import (
     build_email_context,
     is_effectively_empty,
+    lead_summary,
     limit_summary,
     make_email_input,
 )
-from features.email.analysis.prompts import email_analysis_system_prompt
+from features.email.utils import signals
+from features.email.utils.chunking import (
+    dedupe,
+    gather_chunks,
+    interleave,
+    limit_chunks,
+    prepare_long_body,
+    split_into_chunks,
+)
+from features.email.utils.model_route import route_email_model
+from features.email.utils.scoring import score_bucket
+from features.email.analysis.prompts import (
+    email_analysis_system_prompt,
+    email_chunk_analysis_system_prompt,
+    email_chunk_reduce_system_prompt,
+)
 
 logger = logging.getLogger("focusflow.email.analysis")
 
 
 
-_URGENT_RX = re.compile(r"(?i)\b(asap|dringend|urgent|met\s+spoed|nu|vandaag)\b")
-_BLOCKING_RX = re.compile(r"(?i)\b(incident|geblokkeerd|blocked|storing|down|niet\s+werken)\b")
-_PAYMENT_RX = re.compile(r"(?i)\b(factuur|invoice|betaling|betaal|betaalherinnering)\b")
-_CONFIRM_RX = re.compile(r"(?i)\b(kun\s+je\s+bevestigen|graag\s+bevestiging|confirm)\b")
-_MEETING_RX = re.compile(r"(?i)\b(meeting|call|afstemmen|sync|inplannen|voorstel)\b")
-_DEADLINE_WORD_RX = re.compile(r"(?i)\b(voor|tegen|uiterlijk|deadline)\b")
-
-_DATE_DMY_RX = re.compile(r"\b(\d{1,2})[\/\-](\d{1,2})(?:[\/\-](\d{2,4}))?\b")
-_DATE_ISO_RX = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
-
-
 def _parse_reference_date(received_at_utc: Optional[str]) -> datetime:
     if received_at_utc:
         try:
@@ -47,37 +55,6 @@ def _parse_reference_date(received_at_utc: Optional[str]) -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _extract_earliest_deadline_date(text: str, ref: datetime) -> Optional[datetime]:
-    candidates: List[datetime] = []
-
-    for y, m, d in _DATE_ISO_RX.findall(text or ""):
-        try:
-            candidates.append(datetime(int(y), int(m), int(d), tzinfo=timezone.utc))
-        except Exception:
-            pass
-
-    for dd, mm, yy in _DATE_DMY_RX.findall(text or ""):
-        try:
-            day = int(dd)
-            month = int(mm)
-            if yy:
-                year = int(yy)
-                if year < 100:
-                    year += 2000
-            else:
-                year = ref.year
-            candidates.append(datetime(year, month, day, tzinfo=timezone.utc))
-        except Exception:
-            pass
-
-    if not candidates:
-        return None
-
-    candidates.sort()
-    future = [c for c in candidates if c.date() >= ref.date()]
-    return future[0] if future else candidates[-1]
-
-
 def _compute_priority_score_bucketed(
     *,
     subject: str,
@@ -85,42 +62,28 @@ def _compute_priority_score_bucketed(
     category: str,
     suggested_action: str,
     received_at_utc: Optional[str],
+    scan: Optional[signals.SignalScan] = None,
 ) -> int:
     """
     Deterministische scoring (demo-proof).
     We geven direct buckets terug: 0/25/50/75/100
+    scan: scannerresultaat van de aanroeper (één scan per mail), anders hier gescand.
     """
-    text = f"{subject}\n{body}".strip()
+    if scan is None:
+        scan = signals.scan_email_signals(subject, body)
     ref = _parse_reference_date(received_at_utc)
 
-    if _BLOCKING_RX.search(text):
-        return 100 if _URGENT_RX.search(text) else 75
-
-    if _URGENT_RX.search(text):
-        return 75
-
-    deadline_dt = _extract_earliest_deadline_date(text, ref)
-    if deadline_dt:
-        days = (deadline_dt.date() - ref.date()).days
-        if days <= 1:
-            return 100 if _DEADLINE_WORD_RX.search(text) else 75
-        if days <= 3:
-            return 75
-        return 50
-
-    if category == "Factuur" or _PAYMENT_RX.search(text):
-        if _CONFIRM_RX.search(text):
-            return 75
-        return 50
-
-    if suggested_action == "Inplannen" or _MEETING_RX.search(text):
-        return 50
-
-    if suggested_action == "Antwoorden":
-        return 50
-
-    return 50
-
+    return score_bucket(
+        blocking=scan.has(signals.BLOCKING),
+        urgent=scan.has(signals.URGENT),
+        deadline_days=signals.deadline_days(scan.dates, ref.date()),
+        deadline_word=scan.has(signals.DEADLINE_WORD),
+        payment=scan.has(signals.PAYMENT),
+        confirm=scan.has(signals.CONFIRM),
+        meeting=scan.has(signals.MEETING),
+        category=category,
+        suggested_action=suggested_action,
+    )
 
 
 def _parse_tasks(raw_tasks: Any) -> List[TaskItem]:
@@ -141,7 +104,10 @@ def _parse_tasks(raw_tasks: Any) -> List[TaskItem]:
             ALLOWED_TASK_PRIORITIES,
             "Medium",
         )
-        tasks.append(TaskItem(description=description, priority=priority))
+        # limieten uit ANALYSIS_CONTRACT; niet elke backend handhaaft die in het schema
+        tasks.append(TaskItem(description=description[:120], priority=priority))
+        if len(tasks) >= 5:
+            break
 
     return tasks
 
@@ -162,12 +128,13 @@ def _parse_evidence(raw: Any) -> List[str]:
     return out
 
 
-def _map_to_response(
+def map_to_response(
     data: Dict[str, Any],
     *,
     subject: str,
     body: str,
     received_at_utc: Optional[str],
+    scan: Optional[signals.SignalScan] = None,
 ) -> AnalyzeEmailResponse:
     category = normalize_choice(
         data.get("category"),
@@ -183,7 +150,7 @@ def _map_to_response(
     summary = limit_summary(data.get("summary") or "Geen samenvatting.")
     tasks = _parse_tasks(data.get("tasks", []))
 
-    key_request = (data.get("keyRequest") or data.get("key_request") or "").strip() or None
+    key_request = (data.get("keyRequest") or data.get("key_request") or "").strip()[:200] or None
     evidence = _parse_evidence(data.get("evidence"))
 
     score_bucket = _compute_priority_score_bucketed(
@@ -192,6 +159,7 @@ def _map_to_response(
         category=category,
         suggested_action=action,
         received_at_utc=received_at_utc,
+        scan=scan,
     )
 
     _ = bucket_priority(
@@ -213,7 +181,18 @@ def _map_to_response(
     )
 
 
-def _fallback_response(kind: str) -> AnalyzeEmailResponse:
+def fallback_response(
+    kind: str,
+    *,
+    subject: Optional[str] = None,
+    body: Optional[str] = None,
+    received_at_utc: Optional[str] = None,
+) -> AnalyzeEmailResponse:
+    if kind in ("unavailable", "deadline") and (subject or body):
+        # model onbereikbaar of budget op: deterministisch antwoord i.p.v. een lege fallback
+        from features.email.triage.service import degraded_analysis
+        return degraded_analysis(subject=subject or "", body=body or "", received_at_utc=received_at_utc)
+
     if kind == "timeout":
         summary = "Verwerking duurde te lang."
     elif kind == "invalid_json":
@@ -221,6 +200,7 @@ def _fallback_response(kind: str) -> AnalyzeEmailResponse:
     else:
         summary = "Er ging iets mis bij de verwerking."
 
+    # plaatsvervangende waarden, geen analyse => isPartial
     return AnalyzeEmailResponse(
         summary=summary,
         priorityScore=50,
@@ -229,9 +209,82 @@ def _fallback_response(kind: str) -> AnalyzeEmailResponse:
         extractedTasks=[],
         keyRequest=None,
         evidence=[],
+        isPartial=True,
     )
 
 
+# response-veld -> modelkeys (alternatieven) die ervoor nodig zijn
+_RESPONSE_FIELD_SOURCES: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "category": (("category",),),
+    "suggestedAction": (("suggested_action", "suggestedAction"),),
+    "priorityScore": (("category",), ("suggested_action", "suggestedAction")),
+    "summary": (("summary",),),
+    "keyRequest": (("keyRequest", "key_request"),),
+    "evidence": (("evidence",),),
+    "extractedTasks": (("tasks",),),
+}
+
+
+def _fields_satisfied(fields: Sequence[str], data: Dict[str, Any]) -> bool:
+    for field in fields:
+        for alternatives in _RESPONSE_FIELD_SOURCES.get(field, ()):
+            if not any(key in data for key in alternatives):
+                return False
+    return True
+
+
+def mark_partial(
+    response: AnalyzeEmailResponse,
+    status: str,
+    *,
+    data: Dict[str, Any],
+    subject: str,
+    body: str,
+) -> AnalyzeEmailResponse:
+    """
+    Status "ok" blijft ongemoeid. Anders (deadline/repaired, vroeg gestopt na de gevraagde
+    velden, een stream die na enkele velden afbrak) is alleen wat binnen was echt: isPartial,
+    en een extractieve samenvatting als die ontbrak; de rest is default.
+    """
+    if status == "ok":
+        return response
+    update: Dict[str, Any] = {"isPartial": True}
+    if "summary" not in data:
+        update["summary"] = lead_summary(subject, body)
+    return response.model_copy(update=update)
+
+
+def empty_response() -> AnalyzeEmailResponse:
+    return AnalyzeEmailResponse(
+        summary="Lege e-mail.",
+        priorityScore=0,
+        category="Overig",
+        suggestedAction="Lezen",
+        extractedTasks=[],
+        keyRequest=None,
+        evidence=[],
+    )
+
+
+def _build_prompts(
+    *,
+    subject: str,
+    body: str,
+    user_name: str,
+    sender: Optional[str],
+    received_at_utc: Optional[str],
+    thread_hint: Optional[str],
+) -> Tuple[str, str]:
+    email = make_email_input(
+        subject=subject,
+        body=body,
+        sender=sender,
+        received_at_utc=received_at_utc,
+        thread_hint=thread_hint,
+    )
+    return email_analysis_system_prompt(user_name), build_email_context(email)
+
+
 async def analyze_email(
     *,
     client: ollama.AsyncClient,
@@ -241,6 +294,9 @@ async def analyze_email(
     sender: Optional[str] = None,
     received_at_utc: Optional[str] = None,
     thread_hint: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None,
+    priority: Priority = "standard",
+    deadline: Optional[float] = None,
 ) -> AnalyzeEmailResponse:
 
     subject = subject or ""
@@ -257,42 +313,288 @@ async def analyze_email(
     )
 
     if is_effectively_empty(subject, body):
-        return AnalyzeEmailResponse(
-            summary="Lege e-mail.",
-            priorityScore=0,
-            category="Overig",
-            suggestedAction="Lezen",
-            extractedTasks=[],
-            keyRequest=None,
-            evidence=[],
+        return empty_response()
+
+    scan = signals.scan_email_signals(subject, body)
+    long_body = prepare_long_body(body)
+    if long_body is not None:
+        return await _analyze_chunked(
+            client=client,
+            long_body=long_body,
+            subject=subject,
+            body=body,
+            user_name=user_name,
+            sender=sender,
+            received_at_utc=received_at_utc,
+            thread_hint=thread_hint,
+            priority=priority,
+            deadline=deadline,
+            scan=scan,
         )
 
-    email = make_email_input(
+    system_prompt, user_prompt = _build_prompts(
         subject=subject,
         body=body,
+        user_name=user_name,
         sender=sender,
         received_at_utc=received_at_utc,
         thread_hint=thread_hint,
     )
 
-    system_prompt = email_analysis_system_prompt(user_name)
-    user_prompt = build_email_context(email)
+    wanted = [f for f in (fields or []) if f in _RESPONSE_FIELD_SOURCES]
+    if wanted:
+        data, status = await _run_until_fields(
+            client=client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            fields=wanted,
+            priority=priority,
+            deadline=deadline,
+            model=route_email_model(endpoint="email-analysis-fields", subject=subject, body=body, scan=scan),
+        )
+    else:
+        data, status = await run_llm_json(
+            client=client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            log_name="email-analysis",
+            contract=ANALYSIS_CONTRACT,
+            preview=False,
+            cache=True,
+            priority=priority,
+            num_predict=settings.num_predict_analysis,
+            deadline=deadline,
+            model=route_email_model(endpoint="email-analysis", subject=subject, body=body, scan=scan),
+        )
+
+    if data is None:
+        logger.warning("analysis failed (status=%s)", status)
+        return fallback_response(status, subject=subject, body=body, received_at_utc=received_at_utc)
+
+    response = map_to_response(
+        data,
+        subject=subject,
+        body=body,
+        received_at_utc=received_at_utc,
+        scan=scan,
+    )
+    return mark_partial(response, status, data=data, subject=subject, body=body)
+
+
+_ACTION_URGENCY = ("Actie Vereist", "Inplannen", "Antwoorden", "Lezen")
+
+
+def _reduce_fallback(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    actions = [normalize_choice(p.get("suggested_action"), ALLOWED_ACTIONS, "Lezen") for p in partials]
+    return {
+        "category": partials[0].get("category"),
+        "suggested_action": min(actions, key=_ACTION_URGENCY.index),
+        "keyRequest": next((p.get("keyRequest") for p in partials if p.get("keyRequest")), ""),
+        "summary": " ".join(str(p.get("summary") or "").strip() for p in partials[:2]).strip(),
+    }
+
+
+async def _analyze_chunked(
+    *,
+    client: ollama.AsyncClient,
+    long_body: str,
+    subject: str,
+    body: str,
+    user_name: str,
+    sender: Optional[str],
+    received_at_utc: Optional[str],
+    thread_hint: Optional[str],
+    priority: Priority,
+    deadline: Optional[float] = None,
+    scan: Optional[signals.SignalScan] = None,
+) -> AnalyzeEmailResponse:
+    """
+    Map-reduce voor lange mails: elk stuk apart (parallel) analyseren, daarna één kleine
+    reduce-call voor categorie/actie/samenvatting; taken en evidence worden samengevoegd.
+    """
+    chunks, cut = limit_chunks(split_into_chunks(long_body), log_name="email-analysis")
+    logger.info("chunked analysis (chunks=%d body_len=%d)", len(chunks), len(long_body))
+
+    async def _map(index: int, chunk: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        email = EmailInput(
+            subject=subject,
+            body=chunk,
+            sender=sender,
+            received_at_utc=received_at_utc,
+            thread_hint=thread_hint,
+        )
+        return await run_llm_json(
+            client=client,
+            system_prompt=email_chunk_analysis_system_prompt(user_name, index + 1, len(chunks)),
+            user_prompt=build_email_context(email),
+            log_name="email-analysis-chunk",
+            contract=CHUNK_ANALYSIS_CONTRACT,
+            cache=True,
+            priority=priority,
+            num_predict=settings.num_predict_chunk,
+            deadline=deadline,
+        )
+
+    results = await gather_chunks(_map(i, c) for i, c in enumerate(chunks))
+    partials = [data for data, _ in results if data is not None]
+    if not partials:
+        status = results[0][1] if results else "error"
+        logger.warning("chunked analysis failed (status=%s)", status)
+        return fallback_response(status, subject=subject, body=body, received_at_utc=received_at_utc)
+
+    digest = [
+        {
+            "deel": index + 1,
+            "category": p.get("category"),
+            "suggested_action": p.get("suggested_action"),
+            "keyRequest": p.get("keyRequest"),
+            "summary": p.get("summary"),
+        }
+        for index, p in enumerate(partials)
+    ]
+    reduced, status = await run_llm_json(
+        client=client,
+        system_prompt=email_chunk_reduce_system_prompt(user_name),
+        user_prompt=json.dumps(digest, ensure_ascii=False),
+        log_name="email-analysis-reduce",
+        contract=CHUNK_REDUCE_CONTRACT,
+        cache=True,
+        priority=priority,
+        num_predict=settings.num_predict_reduce,
+        deadline=deadline,
+    )
+    if reduced is None:
+        logger.warning("chunk reduce failed (status=%s) -> merged partials", status)
+        reduced = _reduce_fallback(partials)
+
+    merged = dict(reduced)
+    merged["evidence"] = interleave([_parse_evidence(p.get("evidence")) for p in partials])
+    merged["tasks"] = dedupe(
+        (t for p in partials for t in (p.get("tasks") or []) if isinstance(t, dict)),
+        key=lambda t: str(t.get("description") or ""),
+    )
+
+    response = map_to_response(merged, subject=subject, body=body, received_at_utc=received_at_utc, scan=scan)
+    if cut or len(partials) < len(chunks) or status != "ok":
+        response = response.model_copy(update={"isPartial": True})
+    return response
 
-    data, status = await run_llm_json(
+
+async def _run_until_fields(
+    *,
+    client: ollama.AsyncClient,
+    system_prompt: str,
+    user_prompt: str,
+    fields: Sequence[str],
+    priority: Priority,
+    deadline: Optional[float] = None,
+    model: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Streamt de analyse en stopt de generatie zodra de gevraagde velden binnen zijn.
+    Status "fields": zo gestopt; de overige velden ontbreken (=> isPartial).
+    """
+    collected: Dict[str, Any] = {}
+    status = "ok"
+
+    events = stream_llm_json(
         client=client,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
-        log_name="email-analysis",
-        preview=False,
+        log_name="email-analysis-fields",
+        contract=ANALYSIS_CONTRACT,
+        emit_fields=True,
+        cache=True,
+        priority=priority,
+        num_predict=settings.num_predict_analysis,
+        deadline=deadline,
+        model=model,
     )
+    async with aclosing(events):
+        async for event in events:
+            if event.status is not None:
+                status = event.status
+                if event.data is not None:
+                    collected = event.data
+                break
 
-    if status != "ok" or data is None:
-        logger.warning("analysis failed (status=%s)", status)
-        return _fallback_response(status)
+            collected[event.field] = event.value
+            if _fields_satisfied(fields, collected):
+                logger.info("analysis stopped early (fields=%s)", ",".join(fields))
+                status = "fields"
+                break
 
-    return _map_to_response(
-        data,
+    return collected or None, status
+
+
+async def stream_analyze_email(
+    *,
+    client: ollama.AsyncClient,
+    subject: str,
+    body: str,
+    user_name: str,
+    sender: Optional[str] = None,
+    received_at_utc: Optional[str] = None,
+    thread_hint: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    SSE-variant: een "field" event per response-veld zodra het bepaald is
+    (category en priorityScore dus vóór summary), daarna één "done" event.
+    """
+    subject = subject or ""
+    body = body or ""
+
+    if is_effectively_empty(subject, body):
+        yield "done", empty_response().model_dump()
+        return
+
+    # elk tussentijds field-event mapt opnieuw; de mail wordt maar één keer gescand
+    scan = signals.scan_email_signals(subject, body)
+    system_prompt, user_prompt = _build_prompts(
         subject=subject,
         body=body,
+        user_name=user_name,
+        sender=sender,
         received_at_utc=received_at_utc,
+        thread_hint=thread_hint,
+    )
+
+    collected: Dict[str, Any] = {}
+    sent: set = set()
+
+    events = stream_llm_json(
+        client=client,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        log_name="email-analysis-stream",
+        contract=ANALYSIS_CONTRACT,
+        emit_fields=True,
+        cache=True,
+        priority="standard",
+        num_predict=settings.num_predict_analysis,
     )
+    async with aclosing(events):
+        async for event in events:
+            if event.status is not None:
+                data = event.data or collected
+                if not data:
+                    yield "done", fallback_response(
+                        event.status, subject=subject, body=body, received_at_utc=received_at_utc
+                    ).model_dump()
+                else:
+                    final = map_to_response(
+                        data, subject=subject, body=body, received_at_utc=received_at_utc, scan=scan
+                    )
+                    if event.status != "ok":
+                        final = final.model_copy(update={"isPartial": True})
+                    yield "done", final.model_dump()
+                return
+
+            collected[event.field] = event.value
+            partial = map_to_response(
+                collected, subject=subject, body=body, received_at_utc=received_at_utc, scan=scan
+            )
+            for name in _RESPONSE_FIELD_SOURCES:
+                if name not in sent and _fields_satisfied([name], collected):
+                    sent.add(name)
+                    yield "field", {"name": name, "value": partial.model_dump()[name]}
@@ -3,10 +3,13 @@ from __future__ import annotations
 import logging
 
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 
 from config import settings
 from features.email.schemas import ComposeEmailRequest, ComposeEmailResponse
-from features.email.compose.service import compose_email
+from features.email.compose.service import compose_email, stream_compose_email
+from shared.disconnect import cancel_on_disconnect
+from shared.sse import sse_response
 
 logger = logging.getLogger("focusflow.email.compose.router")
 
@@ -31,18 +34,57 @@ async def compose_endpoint(req: ComposeEmailRequest, request: Request) -> Compos
         req.language or "auto",
     )
 
-    return await compose_email(
-        client=client,
-        prompt=req.prompt,
-        subject=req.subject,
-        instructions=req.instructions,
-        tone=req.tone,
-        length=req.length,
-        language=req.language,
-        user_name=settings.default_user_name,
-        reply_to_subject=req.replyToSubject,
-        reply_to_body=req.replyToBody,
-        reply_to_sender=req.replyToSender,
-        reply_to_received_at_utc=req.replyToReceivedAtUtc,
+    return await cancel_on_disconnect(
+        request,
+        compose_email(
+            client=client,
+            prompt=req.prompt,
+            subject=req.subject,
+            instructions=req.instructions,
+            tone=req.tone,
+            length=req.length,
+            language=req.language,
+            user_name=settings.default_user_name,
+            reply_to_subject=req.replyToSubject,
+            reply_to_body=req.replyToBody,
+            reply_to_sender=req.replyToSender,
+            reply_to_received_at_utc=req.replyToReceivedAtUtc,
+        ),
+        route="email-compose",
     )
 
+
+@router.post(
+    "/compose/stream",
+    response_class=StreamingResponse,
+    summary="Compose an email, streamed as Server-Sent Events",
+    description="Same input as /email/compose. Emits 'delta' events while the model generates and one final 'done' event with the post-processed ComposeEmailResponse.",
+)
+async def compose_stream_endpoint(req: ComposeEmailRequest, request: Request) -> StreamingResponse:
+    client = request.app.state.ollama_client
+
+    logger.info(
+        "compose stream request (prompt_len=%d subject=%s tone=%s length=%s lang=%s)",
+        len((req.prompt or "").strip()),
+        "yes" if (req.subject or "").strip() else "no",
+        req.tone,
+        req.length,
+        req.language or "auto",
+    )
+
+    return await sse_response(
+        stream_compose_email(
+            client=client,
+            prompt=req.prompt,
+            subject=req.subject,
+            instructions=req.instructions,
+            tone=req.tone,
+            length=req.length,
+            language=req.language,
+            user_name=settings.default_user_name,
+            reply_to_subject=req.replyToSubject,
+            reply_to_body=req.replyToBody,
+            reply_to_sender=req.replyToSender,
+            reply_to_received_at_utc=req.replyToReceivedAtUtc,
+        )
+    )
@@ -2,14 +2,16 @@ from __future__ import annotations
 
 import logging
 import re
+from contextlib import aclosing
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 import ollama
 
 from config import settings
-from shared.llm_json import run_llm_json
+from shared.llm_json import run_llm_json, stream_llm_json
 
+from features.email.contracts import COMPOSE_CONTRACT
 from features.email.schemas import ComposeEmailResponse
 from features.email.compose.prompts import compose_email_system_prompt
 from features.email.utils.email_text import build_email_context, make_email_input
@@ -288,9 +290,20 @@ def _build_user_prompt(
     return "\n".join(parts).strip()
 
 
-async def compose_email(
+@dataclass(frozen=True)
+class _ComposePlan:
+    prompt: str
+    clean_subject: str
+    tone: str
+    length: str
+    language_code: str
+    is_vague: bool
+    system_prompt: str = ""
+    user_prompt: str = ""
+
+
+def _plan_compose(
     *,
-    client: ollama.AsyncClient,
     prompt: str,
     subject: Optional[str],
     instructions: Optional[str],
@@ -298,11 +311,11 @@ async def compose_email(
     length: str,
     language: Optional[str],
     user_name: str,
-    reply_to_subject: Optional[str] = None,
-    reply_to_body: Optional[str] = None,
-    reply_to_sender: Optional[str] = None,
-    reply_to_received_at_utc: Optional[str] = None,
-) -> ComposeEmailResponse:
+    reply_to_subject: Optional[str],
+    reply_to_body: Optional[str],
+    reply_to_sender: Optional[str],
+    reply_to_received_at_utc: Optional[str],
+) -> _ComposePlan:
     prompt = (prompt or "").strip()
     instructions = (instructions or "").strip()
 
@@ -313,10 +326,13 @@ async def compose_email(
     clean_subject = _single_line(subject or "", max_len=80)
 
     if _is_too_vague(prompt):
-        out_subject = clean_subject or ("Vraagje" if language_code == "nl" else "Quick question")
-        return ComposeEmailResponse(
-            subject=_single_line(out_subject, max_len=80), 
-            body=_fallback_body_for_vague(language_code)
+        return _ComposePlan(
+            prompt=prompt,
+            clean_subject=clean_subject,
+            tone=normalized_tone,
+            length=normalized_length,
+            language_code=language_code,
+            is_vague=True,
         )
 
     reply_block = ""
@@ -357,40 +373,156 @@ async def compose_email(
         settings.ai_model,
     )
 
-    data, status = await run_llm_json(
-        client=client,
+    return _ComposePlan(
+        prompt=prompt,
+        clean_subject=clean_subject,
+        tone=normalized_tone,
+        length=normalized_length,
+        language_code=language_code,
+        is_vague=False,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
-        log_name="compose-email",
-        preview=False,
     )
 
+
+def _vague_response(plan: _ComposePlan) -> ComposeEmailResponse:
+    out_subject = plan.clean_subject or ("Vraagje" if plan.language_code == "nl" else "Quick question")
+    return ComposeEmailResponse(
+        subject=_single_line(out_subject, max_len=80),
+        body=_fallback_body_for_vague(plan.language_code)
+    )
+
+
+def _finalize_compose(plan: _ComposePlan, data: Optional[dict], status: str) -> ComposeEmailResponse:
+    language_code = plan.language_code
+
     if status != "ok" or not isinstance(data, dict):
         logger.warning("compose-email failed (status=%s) -> fallback", status)
-        out_subject = clean_subject or _fallback_subject(prompt, language_code)
-        fallback_body = _cleanup_text(_remove_placeholders(prompt))
-        fallback_body = _ensure_email_shape(fallback_body, normalized_tone, language_code)
+        out_subject = plan.clean_subject or _fallback_subject(plan.prompt, language_code)
+        fallback_body = _cleanup_text(_remove_placeholders(plan.prompt))
+        fallback_body = _ensure_email_shape(fallback_body, plan.tone, language_code)
         return ComposeEmailResponse(subject=_single_line(out_subject, max_len=80), body=fallback_body)
 
     final_subject = _single_line(str(data.get("subject") or "").strip(), max_len=80)
     final_body = str(data.get("body") or "").strip()
 
-    if clean_subject:
-        final_subject = clean_subject
+    if plan.clean_subject:
+        final_subject = plan.clean_subject
     elif not final_subject:
-        final_subject = _single_line(_fallback_subject(prompt, language_code), max_len=80)
+        final_subject = _single_line(_fallback_subject(plan.prompt, language_code), max_len=80)
 
     final_body = _remove_placeholders(final_body)
     final_body = _cleanup_text(final_body)
-    final_body = _strip_smalltalk(final_body, normalized_tone, language_code)
+    final_body = _strip_smalltalk(final_body, plan.tone, language_code)
 
     if language_code == "en" and _looks_dutch(final_body):
         language_code = "nl"
 
-    final_body = _ensure_email_shape(final_body, normalized_tone, language_code)
+    final_body = _ensure_email_shape(final_body, plan.tone, language_code)
 
     if not final_body:
-        fallback_body = _cleanup_text(_remove_placeholders(prompt))
-        final_body = _ensure_email_shape(fallback_body, normalized_tone, language_code)
+        fallback_body = _cleanup_text(_remove_placeholders(plan.prompt))
+        final_body = _ensure_email_shape(fallback_body, plan.tone, language_code)
+
+    return ComposeEmailResponse(subject=final_subject, body=final_body)
+
+
+async def compose_email(
+    *,
+    client: ollama.AsyncClient,
+    prompt: str,
+    subject: Optional[str],
+    instructions: Optional[str],
+    tone: str,
+    length: str,
+    language: Optional[str],
+    user_name: str,
+    reply_to_subject: Optional[str] = None,
+    reply_to_body: Optional[str] = None,
+    reply_to_sender: Optional[str] = None,
+    reply_to_received_at_utc: Optional[str] = None,
+) -> ComposeEmailResponse:
+    plan = _plan_compose(
+        prompt=prompt,
+        subject=subject,
+        instructions=instructions,
+        tone=tone,
+        length=length,
+        language=language,
+        user_name=user_name,
+        reply_to_subject=reply_to_subject,
+        reply_to_body=reply_to_body,
+        reply_to_sender=reply_to_sender,
+        reply_to_received_at_utc=reply_to_received_at_utc,
+    )
+
+    if plan.is_vague:
+        return _vague_response(plan)
+
+    data, status = await run_llm_json(
+        client=client,
+        system_prompt=plan.system_prompt,
+        user_prompt=plan.user_prompt,
+        log_name="compose-email",
+        contract=COMPOSE_CONTRACT,
+        preview=False,
+        priority="interactive",
+        num_predict=settings.num_predict_compose,
+    )
+
+    return _finalize_compose(plan, data, status)
 
-    return ComposeEmailResponse(subject=final_subject, body=final_body)
\ No newline at end of file
+
+async def stream_compose_email(
+    *,
+    client: ollama.AsyncClient,
+    prompt: str,
+    subject: Optional[str],
+    instructions: Optional[str],
+    tone: str,
+    length: str,
+    language: Optional[str],
+    user_name: str,
+    reply_to_subject: Optional[str] = None,
+    reply_to_body: Optional[str] = None,
+    reply_to_sender: Optional[str] = None,
+    reply_to_received_at_utc: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    SSE-variant: "delta" events met ruwe tekst van subject/body, daarna één "done" event
+    met dezelfde nabewerking als compose_email.
+    """
+    plan = _plan_compose(
+        prompt=prompt,
+        subject=subject,
+        instructions=instructions,
+        tone=tone,
+        length=length,
+        language=language,
+        user_name=user_name,
+        reply_to_subject=reply_to_subject,
+        reply_to_body=reply_to_body,
+        reply_to_sender=reply_to_sender,
+        reply_to_received_at_utc=reply_to_received_at_utc,
+    )
+
+    if plan.is_vague:
+        yield "done", _vague_response(plan).model_dump()
+        return
+
+    events = stream_llm_json(
+        client=client,
+        system_prompt=plan.system_prompt,
+        user_prompt=plan.user_prompt,
+        log_name="compose-email-stream",
+        contract=COMPOSE_CONTRACT,
+        stream_fields=("subject", "body"),
+        priority="interactive",
+        num_predict=settings.num_predict_compose,
+    )
+    async with aclosing(events):
+        async for event in events:
+            if event.status is None:
+                yield "delta", {"field": event.field, "text": event.text}
+            else:
+                yield "done", _finalize_compose(plan, event.data, event.status).model_dump()
@@ -17,4 +17,7 @@ ALLOWED_TASK_PRIORITIES = [
     "High",
     "Medium",
     "Low",
-]
\ No newline at end of file
+]
+
+# triage draait zonder model maar wel op CPU; grotere inboxen in meerdere requests
+TRIAGE_BATCH_MAX_ITEMS = 500
\ No newline at end of file
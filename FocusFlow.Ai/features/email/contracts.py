@@ -0,0 +1,74 @@
+from config import settings
+from shared.structured_output import JsonContract, Key, array, enum, nullable_string, number, string
+
+from features.email.constants import ALLOWED_ACTIONS, ALLOWED_CATEGORIES, ALLOWED_TASK_PRIORITIES
+
+# outputcontracten per feature; volgorde = volgorde waarin het model de velden schrijft
+# (category/actie eerst, zodat streaming en vroeg stoppen blijven werken)
+
+_CATEGORY = Key("category", "cat", enum(ALLOWED_CATEGORIES))
+_ACTION = Key("suggested_action", "act", enum(ALLOWED_ACTIONS))
+_KEY_REQUEST = Key("keyRequest", "req", string(200))
+_SUMMARY = Key("summary", "sum", string(settings.summary_max_chars))
+
+# AnalyzeEmailResponse.extractedTasks (TaskItem)
+_TASK_ITEM = JsonContract(
+    Key("description", "d", string(120)),
+    Key("priority", "p", enum(ALLOWED_TASK_PRIORITIES)),
+)
+
+# TaskProposal
+_TASK_PROPOSAL = JsonContract(
+    Key("title", "ti", string(80)),
+    Key("description", "de", string(160)),
+    Key("priority", "pr", enum(ALLOWED_TASK_PRIORITIES)),
+    Key("dueDate", "dd", nullable_string(10)),
+    Key("dueText", "dt", nullable_string(50)),
+    Key("confidence", "cf", number(0, 1)),
+    Key("sourceQuote", "q", string(120)),
+)
+
+_NEEDS_CLARIFICATION = Key("needsClarification", "nc", array(string(200), max_items=5))
+
+# priority_score/priority_signals zitten niet in het contract: de score is deterministisch
+ANALYSIS_CONTRACT = JsonContract(
+    _CATEGORY,
+    _ACTION,
+    _KEY_REQUEST,
+    _SUMMARY,
+    Key("evidence", "ev", array(string(90), max_items=3)),
+    Key("tasks", "t", array(max_items=5), items=_TASK_ITEM),
+)
+
+CHUNK_ANALYSIS_CONTRACT = JsonContract(
+    _CATEGORY,
+    _ACTION,
+    _KEY_REQUEST,
+    _SUMMARY,
+    Key("evidence", "ev", array(string(90), max_items=2)),
+    Key("tasks", "t", array(max_items=5), items=_TASK_ITEM),
+)
+
+CHUNK_REDUCE_CONTRACT = JsonContract(_CATEGORY, _ACTION, _KEY_REQUEST, _SUMMARY)
+
+TASKS_CONTRACT = JsonContract(
+    Key("tasks", "t", array(max_items=5), items=_TASK_PROPOSAL),
+    _NEEDS_CLARIFICATION,
+)
+
+PROCESS_CONTRACT = JsonContract(
+    _CATEGORY,
+    _ACTION,
+    _KEY_REQUEST,
+    _SUMMARY,
+    Key("evidence", "ev", array(string(90), max_items=3)),
+    Key("tasks", "t", array(max_items=5), items=_TASK_PROPOSAL),
+    _NEEDS_CLARIFICATION,
+)
+
+REPLY_CONTRACT = JsonContract(Key("reply", "r", string()))
+
+COMPOSE_CONTRACT = JsonContract(
+    Key("subject", "s", string(120)),
+    Key("body", "b", string()),
+)
@@ -0,0 +1,44 @@
+import logging
+from fastapi import APIRouter, Request
+
+from config import settings
+from features.email.schemas import ProcessEmailRequest, ProcessEmailResponse
+from features.email.process.service import process_email
+from shared.deadline import request_deadline
+from shared.disconnect import cancel_on_disconnect
+
+logger = logging.getLogger("focusflow.email.process.router")
+
+router = APIRouter(prefix="/email", tags=["email-process"])
+
+
+@router.post(
+    "/process",
+    response_model=ProcessEmailResponse,
+    summary="Analyze an email and extract tasks in one model call",
+    description="Combined /email/analyze + /email/extract-tasks for newly ingested mail.",
+)
+async def process_email_endpoint(req: ProcessEmailRequest, request: Request):
+    logger.info(
+        "request received (subject_len=%d body_len=%d sender=%s)",
+        len(req.subject or ""),
+        len(req.body or ""),
+        "yes" if req.sender else "no",
+    )
+
+    client = request.app.state.ollama_client
+
+    return await cancel_on_disconnect(
+        request,
+        process_email(
+            client=client,
+            subject=req.subject,
+            body=req.body,
+            sender=req.sender,
+            received_at_utc=req.receivedAtUtc,
+            thread_hint=req.threadHint,
+            user_name=settings.default_user_name,
+            deadline=request_deadline(request, req.deadlineMs),
+        ),
+        route="email-process",
+    )
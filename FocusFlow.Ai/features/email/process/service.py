@@ -0,0 +1,140 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import ollama
+
+from config import settings
+from shared.llm_json import run_llm_json
+from shared.model_router import model_router
+
+from features.email.contracts import ANALYSIS_CONTRACT, PROCESS_CONTRACT
+from features.email.schemas import ExtractTasksResponse, ProcessEmailResponse, TaskProposal
+from features.email.utils.email_text import build_email_context, is_effectively_empty, make_email_input
+from features.email.analysis.prompts import email_analysis_system_prompt
+from features.email.analysis.service import (
+    empty_response,
+    fallback_response as analysis_fallback_response,
+    map_to_response,
+    mark_partial,
+)
+from features.email.tasks.guards import should_skip_task_extraction
+from features.email.tasks.parsing import has_low_confidence, parse_questions, parse_tasks
+from features.email.tasks.service import fallback_response as tasks_fallback_response
+from features.email.utils.dates import make_reference_date_str
+from features.email.utils.model_route import route_email_model
+from features.email.utils.signals import scan_email_signals
+from features.email.process.prompts import email_process_system_prompt
+
+logger = logging.getLogger("focusflow.email.process")
+
+
+def _analysis_data(data: Dict[str, Any], proposals: List[TaskProposal]) -> Dict[str, Any]:
+    # analysis verwacht tasks als {description, priority}; neem de gevalideerde voorstellen over
+    merged = dict(data)
+    merged["tasks"] = [{"description": p.title, "priority": p.priority} for p in proposals]
+    return merged
+
+
+async def process_email(
+    *,
+    client: ollama.AsyncClient,
+    subject: str,
+    body: str,
+    user_name: str,
+    sender: Optional[str] = None,
+    received_at_utc: Optional[str] = None,
+    thread_hint: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> ProcessEmailResponse:
+    subject = subject or ""
+    body = body or ""
+
+    logger.info(
+        "process started (subject_len=%d body_len=%d sender=%s model=%s prompt=%s)",
+        len(subject),
+        len(body),
+        "yes" if sender else "no",
+        settings.ai_model,
+        settings.prompt_version,
+    )
+
+    if is_effectively_empty(subject, body):
+        return ProcessEmailResponse(analysis=empty_response(), tasks=ExtractTasksResponse())
+
+    email = make_email_input(
+        subject=subject,
+        body=body,
+        sender=sender,
+        received_at_utc=received_at_utc,
+        thread_hint=thread_hint,
+    )
+    user_prompt = build_email_context(email)
+
+    scan = scan_email_signals(subject, body)
+    skip_tasks = should_skip_task_extraction(subject, body, scan=scan)
+    if skip_tasks:
+        # zelfde prompt als /email/analyze => deelt ook de cache
+        system_prompt = email_analysis_system_prompt(user_name)
+    else:
+        ref_date_str = make_reference_date_str(received_at_utc)
+        system_prompt = email_process_system_prompt(user_name=user_name, reference_date_str=ref_date_str)
+
+    num_predict = settings.num_predict_analysis if skip_tasks else settings.num_predict_process
+    contract = ANALYSIS_CONTRACT if skip_tasks else PROCESS_CONTRACT
+    model = route_email_model(endpoint="email-process", subject=subject, body=body, scan=scan)
+    data, status = await run_llm_json(
+        client=client,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        log_name="email-process",
+        contract=contract,
+        preview=False,
+        cache=True,
+        num_predict=num_predict,
+        deadline=deadline,
+        model=model,
+    )
+
+    if data is None:
+        logger.warning("process failed (status=%s)", status)
+        return ProcessEmailResponse(
+            analysis=analysis_fallback_response(status, subject=subject, body=body, received_at_utc=received_at_utc),
+            tasks=tasks_fallback_response(status),
+        )
+
+    if skip_tasks:
+        analysis = map_to_response(data, subject=subject, body=body, received_at_utc=received_at_utc, scan=scan)
+        analysis = mark_partial(analysis, status, data=data, subject=subject, body=body)
+        return ProcessEmailResponse(analysis=analysis, tasks=ExtractTasksResponse())
+
+    if has_low_confidence(data.get("tasks")):
+        larger = model_router.escalation_for(model, endpoint="email-process", reason="low_confidence")
+        if larger is not None:
+            better, better_status = await run_llm_json(
+                client=client,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                log_name="email-process",
+                contract=contract,
+                cache=True,
+                num_predict=num_predict,
+                deadline=deadline,
+                model=larger,
+            )
+            if better_status == "ok" and better is not None:
+                data, status = better, better_status
+
+    proposals = parse_tasks(data.get("tasks", []))
+    questions = parse_questions(data.get("needsClarification", []))
+
+    analysis = map_to_response(
+        _analysis_data(data, proposals),
+        subject=subject,
+        body=body,
+        received_at_utc=received_at_utc,
+        scan=scan,
+    )
+    return ProcessEmailResponse(
+        analysis=mark_partial(analysis, status, data=data, subject=subject, body=body),
+        tasks=ExtractTasksResponse(tasks=proposals, needsClarification=questions, isPartial=status != "ok"),
+    )
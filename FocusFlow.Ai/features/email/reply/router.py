@@ -1,9 +1,12 @@
 ﻿import logging
 from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
 
 from config import settings
 from features.email.schemas import DraftReplyRequest, DraftReplyResponse
-from features.email.reply.service import draft_reply
+from features.email.reply.service import draft_reply, stream_draft_reply
+from shared.disconnect import cancel_on_disconnect
+from shared.sse import sse_response
 
 logger = logging.getLogger("focusflow.email.reply.router")
 
@@ -28,15 +31,53 @@ async def draft_reply_endpoint(req: DraftReplyRequest, request: Request):
 
     client = request.app.state.ollama_client
 
-    return await draft_reply(
-        client=client,
-        subject=req.subject,
-        body=req.body,
-        sender=req.sender,
-        received_at_utc=req.receivedAtUtc,
-        thread_hint=req.threadHint,
-        tone=req.tone,
-        length=req.length,
-        language=req.language,
-        user_name=settings.default_user_name,
+    return await cancel_on_disconnect(
+        request,
+        draft_reply(
+            client=client,
+            subject=req.subject,
+            body=req.body,
+            sender=req.sender,
+            received_at_utc=req.receivedAtUtc,
+            thread_hint=req.threadHint,
+            tone=req.tone,
+            length=req.length,
+            language=req.language,
+            user_name=settings.default_user_name,
+        ),
+        route="email-reply",
+    )
+
+
+@router.post("/reply/stream", response_class=StreamingResponse)
+@router.post(
+    "/draft-reply/stream",
+    response_class=StreamingResponse,
+    include_in_schema=False,
+)
+async def draft_reply_stream_endpoint(req: DraftReplyRequest, request: Request):
+    logger.info(
+        "stream request received (subject_len=%d body_len=%d tone=%s length=%s lang=%s)",
+        len(req.subject or ""),
+        len(req.body or ""),
+        req.tone,
+        req.length,
+        req.language or "auto",
+    )
+
+    client = request.app.state.ollama_client
+
+    return await sse_response(
+        stream_draft_reply(
+            client=client,
+            subject=req.subject,
+            body=req.body,
+            sender=req.sender,
+            received_at_utc=req.receivedAtUtc,
+            thread_hint=req.threadHint,
+            tone=req.tone,
+            length=req.length,
+            language=req.language,
+            user_name=settings.default_user_name,
+        )
     )
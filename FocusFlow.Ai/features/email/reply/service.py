@@ -1,11 +1,14 @@
 import logging
-from typing import Optional
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 import ollama
 
 from config import settings
-from shared.llm_json import run_llm_json
+from shared.llm_json import run_llm_json, stream_llm_json
 
+from features.email.contracts import REPLY_CONTRACT
 from features.email.schemas import DraftReplyResponse
 from features.email.utils.email_text import build_email_context, is_effectively_empty, make_email_input
 from features.email.utils.reply_format import finalize_reply_text, normalize_length, normalize_tone
@@ -18,19 +21,28 @@ def _fallback_response(_: str) -> DraftReplyResponse:
     return DraftReplyResponse(reply="")
 
 
-async def draft_reply(
+@dataclass(frozen=True)
+class _ReplyPlan:
+    tone: str
+    length: str
+    language: str
+    is_empty: bool
+    system_prompt: str = ""
+    user_prompt: str = ""
+
+
+def _plan_reply(
     *,
-    client: ollama.AsyncClient,
     subject: str,
     body: str,
     user_name: str,
     tone: str,
     length: str,
-    language: Optional[str] = None,
-    sender: Optional[str] = None,
-    received_at_utc: Optional[str] = None,
-    thread_hint: Optional[str] = None,
-) -> DraftReplyResponse:
+    language: Optional[str],
+    sender: Optional[str],
+    received_at_utc: Optional[str],
+    thread_hint: Optional[str],
+) -> _ReplyPlan:
     subject = subject or ""
     body = body or ""
     language = (language or "").strip()
@@ -51,7 +63,7 @@ async def draft_reply(
     )
 
     if is_effectively_empty(subject, body):
-        return DraftReplyResponse(reply="")
+        return _ReplyPlan(tone=tone, length=length, language=language, is_empty=True)
 
     email = make_email_input(
         subject=subject,
@@ -69,19 +81,111 @@ async def draft_reply(
     )
     user_prompt = build_email_context(email)
 
-    data, status = await run_llm_json(
-        client=client,
+    return _ReplyPlan(
+        tone=tone,
+        length=length,
+        language=language,
+        is_empty=False,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
-        log_name="draft-reply",
-        preview=False,
     )
 
+
+def _finalize_reply(plan: _ReplyPlan, data: Optional[dict], status: str) -> DraftReplyResponse:
     if status != "ok" or data is None:
         logger.warning("draft-reply failed (status=%s)", status)
         return _fallback_response(status)
 
     reply = (data.get("reply") or "").strip()
-    reply = finalize_reply_text(reply, length=length, language=language)
+    reply = finalize_reply_text(reply, length=plan.length, language=plan.language)
 
     return DraftReplyResponse(reply=reply)
+
+
+async def draft_reply(
+    *,
+    client: ollama.AsyncClient,
+    subject: str,
+    body: str,
+    user_name: str,
+    tone: str,
+    length: str,
+    language: Optional[str] = None,
+    sender: Optional[str] = None,
+    received_at_utc: Optional[str] = None,
+    thread_hint: Optional[str] = None,
+) -> DraftReplyResponse:
+    plan = _plan_reply(
+        subject=subject,
+        body=body,
+        user_name=user_name,
+        tone=tone,
+        length=length,
+        language=language,
+        sender=sender,
+        received_at_utc=received_at_utc,
+        thread_hint=thread_hint,
+    )
+
+    if plan.is_empty:
+        return DraftReplyResponse(reply="")
+
+    data, status = await run_llm_json(
+        client=client,
+        system_prompt=plan.system_prompt,
+        user_prompt=plan.user_prompt,
+        log_name="draft-reply",
+        contract=REPLY_CONTRACT,
+        preview=False,
+        priority="interactive",
+        num_predict=settings.num_predict_reply,
+    )
+
+    return _finalize_reply(plan, data, status)
+
+
+async def stream_draft_reply(
+    *,
+    client: ollama.AsyncClient,
+    subject: str,
+    body: str,
+    user_name: str,
+    tone: str,
+    length: str,
+    language: Optional[str] = None,
+    sender: Optional[str] = None,
+    received_at_utc: Optional[str] = None,
+    thread_hint: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    plan = _plan_reply(
+        subject=subject,
+        body=body,
+        user_name=user_name,
+        tone=tone,
+        length=length,
+        language=language,
+        sender=sender,
+        received_at_utc=received_at_utc,
+        thread_hint=thread_hint,
+    )
+
+    if plan.is_empty:
+        yield "done", DraftReplyResponse(reply="").model_dump()
+        return
+
+    events = stream_llm_json(
+        client=client,
+        system_prompt=plan.system_prompt,
+        user_prompt=plan.user_prompt,
+        log_name="draft-reply-stream",
+        contract=REPLY_CONTRACT,
+        stream_fields=("reply",),
+        priority="interactive",
+        num_predict=settings.num_predict_reply,
+    )
+    async with aclosing(events):
+        async for event in events:
+            if event.status is None:
+                yield "delta", {"field": event.field, "text": event.text}
+            else:
+                yield "done", _finalize_reply(plan, event.data, event.status).model_dump()
@@ -1,10 +1,12 @@
 ﻿from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Literal, Optional
+from typing import Annotated, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
+from features.email.constants import TRIAGE_BATCH_MAX_ITEMS
+
 # input structure
 
 @dataclass(frozen=True)
@@ -22,6 +24,12 @@ Tone = Literal["Neutral", "Friendly", "Formal"]
 Length = Literal["Short", "Medium", "Long"]
 TaskPriority = Literal["High", "Medium", "Low"]
 
+# tijdsbudget van de aanvrager (zie shared.deadline)
+DeadlineMs = Annotated[
+    Optional[int],
+    Field(ge=1, description="Optional time budget; on expiry a partial result is returned (header X-Deadline-Ms works too)"),
+]
+
 
 # Analyze (API)
 
@@ -31,6 +39,21 @@ class AnalyzeEmailRequest(BaseModel):
     sender: Optional[str] = Field(default=None)
     receivedAtUtc: Optional[str] = Field(default=None)
     threadHint: Optional[str] = Field(default=None)
+    deadlineMs: DeadlineMs = None
+    fields: Optional[List[str]] = Field(
+        default=None,
+        description="Optional response fields the caller needs (e.g. category, priorityScore); generation stops once they are filled",
+    )
+
+
+class AnalyzeBatchItem(AnalyzeEmailRequest):
+    id: str = Field(min_length=1, description="Caller's item id, echoed in the result line")
+
+
+class AnalyzeBatchRequest(BaseModel):
+    items: List[AnalyzeBatchItem] = Field(default_factory=list)
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Optional fan-out; capped by the server")
+    pack: bool = Field(default=False, description="Pack several short emails into one prompt")
 
 
 class TaskItem(BaseModel):
@@ -49,6 +72,16 @@ class AnalyzeEmailResponse(BaseModel):
     keyRequest: Optional[str] = None
     evidence: List[str] = Field(default_factory=list)
 
+    # deterministisch/onvolledig resultaat (deadline of model onbereikbaar); later opnieuw ophalen
+    isPartial: bool = False
+
+
+class AnalyzeBatchResult(BaseModel):
+    id: str
+    ok: bool = True
+    error: Optional[str] = None
+    result: AnalyzeEmailResponse
+
 
 # Draft reply
 
@@ -129,6 +162,7 @@ class ExtractTasksRequest(BaseModel):
     sender: Optional[str] = Field(default=None)
     receivedAtUtc: Optional[str] = Field(default=None)
     threadHint: Optional[str] = Field(default=None)
+    deadlineMs: DeadlineMs = None
 
 
 class TaskProposal(BaseModel):
@@ -146,3 +180,52 @@ class TaskProposal(BaseModel):
 class ExtractTasksResponse(BaseModel):
     tasks: List[TaskProposal] = Field(default_factory=list)
     needsClarification: List[str] = Field(default_factory=list)
+    isPartial: bool = False
+
+
+# Triage (deterministisch, zonder LLM)
+
+class TriageEmailRequest(BaseModel):
+    subject: str = Field(default="")
+    body: str = Field(default="")
+    sender: Optional[str] = Field(default=None)
+    receivedAtUtc: Optional[str] = Field(default=None)
+
+
+class TriageEmailResponse(BaseModel):
+    priorityScore: int
+    category: str
+    suggestedAction: str
+    signals: List[str] = Field(default_factory=list)
+
+
+class TriageBatchItem(TriageEmailRequest):
+    id: str = Field(min_length=1)
+
+
+class TriageBatchRequest(BaseModel):
+    items: List[TriageBatchItem] = Field(default_factory=list, max_length=TRIAGE_BATCH_MAX_ITEMS)
+
+
+class TriageBatchResult(TriageEmailResponse):
+    id: str
+
+
+class TriageBatchResponse(BaseModel):
+    results: List[TriageBatchResult] = Field(default_factory=list)
+
+
+# Process (analyze + extract-tasks in één call)
+
+class ProcessEmailRequest(BaseModel):
+    subject: str = Field(default="")
+    body: str = Field(default="")
+    sender: Optional[str] = Field(default=None)
+    receivedAtUtc: Optional[str] = Field(default=None)
+    threadHint: Optional[str] = Field(default=None)
+    deadlineMs: DeadlineMs = None
+
+
+class ProcessEmailResponse(BaseModel):
+    analysis: AnalyzeEmailResponse
+    tasks: ExtractTasksResponse
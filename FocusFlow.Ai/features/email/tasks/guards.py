@@ -1,25 +1,17 @@
-from typing import Iterable
+from typing import Optional
 
-_NO_ACTION_MARKERS = (
-    "geen actie vereist",
-    "geen actie nodig",
-    "no action required",
-    "no action needed",
-)
-
-_FYI_MARKERS = ("ter info", "for your information", "fyi")
-_ACTION_MARKERS = (
-    "gelieve", "kun je", "kan je", "please", "moet", "vergeet",
-    "deadline", "voor ", "tegen ", "uiterlijk", "by ", "before ", "asap",
-)
+from features.email.utils.signals import SignalScan, scan_email_signals, scan_signals
 
 
 def no_action_required(text: str) -> bool:
-    t = (text or "").lower()
-    return any(m in t for m in _NO_ACTION_MARKERS)
+    return scan_signals(text or "").no_action_required
 
 
 def looks_like_fyi_without_action(text: str) -> bool:
-    t = (text or "").lower()
-    return any(m in t for m in _FYI_MARKERS) and not any(a in t for a in _ACTION_MARKERS)
+    return scan_signals(text or "").fyi_without_action
+
 
+def should_skip_task_extraction(subject: str, body: str, scan: Optional[SignalScan] = None) -> bool:
+    if scan is None:
+        scan = scan_email_signals(subject, body)
+    return scan.no_action_required or scan.fyi_without_action
@@ -1,6 +1,7 @@
 import re
 from typing import Any, List, Optional
 
+from config import settings
 from shared.text_normalize import normalize_choice
 from features.email.constants import ALLOWED_TASK_PRIORITIES
 from features.email.schemas import TaskProposal
@@ -51,7 +52,7 @@ def parse_questions(raw_data: Any, limit: int = 5) -> List[str]:
 
     parsed_questions: List[str] = []
     for raw_item in raw_data:
-        question_text = (str(raw_item).strip() if raw_item is not None else "")
+        question_text = safe_truncate(raw_item, 200)
         if question_text:
             parsed_questions.append(question_text)
 
@@ -62,7 +63,7 @@ def parse_questions(raw_data: Any, limit: int = 5) -> List[str]:
 
 
 def _parse_single_task(task_data: dict) -> Optional[TaskProposal]:
-    title = (task_data.get("title") or "").strip()
+    title = safe_truncate(task_data.get("title"), 80)
     if not title:
         return None
 
@@ -80,7 +81,7 @@ def _parse_single_task(task_data: dict) -> Optional[TaskProposal]:
     if confidence_score < 0.60:
         return None
 
-    description = (task_data.get("description") or "").strip()
+    description = safe_truncate(task_data.get("description"), 160) or ""
     priority = normalize_choice(task_data.get("priority"), ALLOWED_TASK_PRIORITIES, "Medium")
 
     due_date: Optional[str] = None
@@ -128,3 +129,19 @@ def parse_tasks(raw_data: Any, limit: int = 5) -> List[TaskProposal]:
             break
 
     return valid_tasks
+
+
+def has_low_confidence(raw_tasks: Any) -> bool:
+    # op de ruwe modeloutput: parse_tasks laat onzekere taken al weg
+    if not isinstance(raw_tasks, list):
+        return False
+    for task in raw_tasks:
+        if not isinstance(task, dict):
+            continue
+        try:
+            confidence = float(task.get("confidence", 1.0))
+        except (TypeError, ValueError):
+            continue
+        if confidence < settings.model_escalate_confidence:
+            return True
+    return False
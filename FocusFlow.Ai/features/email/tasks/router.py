@@ -4,6 +4,8 @@ from fastapi import APIRouter, Request
 from config import settings
 from features.email.schemas import ExtractTasksRequest, ExtractTasksResponse
 from features.email.tasks.service import extract_tasks
+from shared.deadline import request_deadline
+from shared.disconnect import cancel_on_disconnect
 
 logger = logging.getLogger("focusflow.email.tasks.router")
 
@@ -21,12 +23,17 @@ async def extract_tasks_endpoint(req: ExtractTasksRequest, request: Request):
 
     client = request.app.state.ollama_client
 
-    return await extract_tasks(
-        client=client,
-        subject=req.subject,
-        body=req.body,
-        sender=req.sender,
-        received_at_utc=req.receivedAtUtc,
-        thread_hint=req.threadHint,
-        user_name=settings.default_user_name,
+    return await cancel_on_disconnect(
+        request,
+        extract_tasks(
+            client=client,
+            subject=req.subject,
+            body=req.body,
+            sender=req.sender,
+            received_at_utc=req.receivedAtUtc,
+            thread_hint=req.threadHint,
+            user_name=settings.default_user_name,
+            deadline=request_deadline(request, req.deadlineMs),
+        ),
+        route="email-extract-tasks",
     )
@@ -1,37 +1,34 @@
 import logging
-from datetime import datetime, timezone
 from typing import Optional
 
 import ollama
 
 from config import settings
 from shared.llm_json import run_llm_json
-
-from features.email.schemas import ExtractTasksResponse
+from shared.model_router import model_router
+
+from features.email.contracts import TASKS_CONTRACT
+from features.email.schemas import EmailInput, ExtractTasksResponse
+from features.email.utils.dates import make_reference_date_str
+from features.email.utils.chunking import (
+    dedupe,
+    gather_chunks,
+    interleave,
+    limit_chunks,
+    prepare_long_body,
+    split_into_chunks,
+)
 from features.email.utils.email_text import build_email_context, is_effectively_empty, make_email_input
+from features.email.utils.model_route import route_email_model
+from features.email.utils.signals import scan_email_signals
 from features.email.tasks.prompts import extract_tasks_system_prompt
-from features.email.tasks.guards import no_action_required, looks_like_fyi_without_action
-from features.email.tasks.parsing import parse_questions, parse_tasks
+from features.email.tasks.guards import should_skip_task_extraction
+from features.email.tasks.parsing import has_low_confidence, parse_questions, parse_tasks
 
 logger = logging.getLogger("focusflow.email.tasks")
 
 
-def _make_reference_date_str(received_at_utc: Optional[str]) -> str:
-    if received_at_utc:
-        try:
-            dt = datetime.fromisoformat(received_at_utc.replace("Z", "+00:00")).astimezone(timezone.utc)
-            return dt.strftime("%A %Y-%m-%d")
-        except Exception:
-            date_part = received_at_utc[:10] if len(received_at_utc) >= 10 else received_at_utc
-            try:
-                dt = datetime.fromisoformat(date_part).replace(tzinfo=timezone.utc)
-                return dt.strftime("%A %Y-%m-%d")
-            except Exception:
-                return date_part
-    return datetime.now(timezone.utc).strftime("%A %Y-%m-%d")
-
-
-def _fallback_response(kind: str) -> ExtractTasksResponse:
+def fallback_response(kind: str) -> ExtractTasksResponse:
     if kind == "timeout":
         return ExtractTasksResponse(
             tasks=[],
@@ -39,6 +36,11 @@ def _fallback_response(kind: str) -> ExtractTasksResponse:
         )
     if kind == "invalid_json":
         return ExtractTasksResponse(tasks=[], needsClarification=["Kon geen geldige taak-analyse maken."])
+    if kind == "deadline":
+        # budget op: geen taken, maar opnieuw ophalen kan
+        return ExtractTasksResponse(tasks=[], needsClarification=[], isPartial=True)
+    if kind == "unavailable":
+        return ExtractTasksResponse(tasks=[], needsClarification=["AI is tijdelijk niet beschikbaar. Probeer later opnieuw."])
     return ExtractTasksResponse(tasks=[], needsClarification=["Fout bij het analyseren van taken."])
 
 
@@ -51,6 +53,7 @@ async def extract_tasks(
     sender: Optional[str] = None,
     received_at_utc: Optional[str] = None,
     thread_hint: Optional[str] = None,
+    deadline: Optional[float] = None,
 ) -> ExtractTasksResponse:
     subject = subject or ""
     body = body or ""
@@ -60,10 +63,23 @@ async def extract_tasks(
     if is_effectively_empty(subject, body):
         return ExtractTasksResponse(tasks=[], needsClarification=[])
 
-    full_text = f"{subject}\n{body}"
-    if no_action_required(full_text) or looks_like_fyi_without_action(full_text):
+    scan = scan_email_signals(subject, body)
+    if should_skip_task_extraction(subject, body, scan=scan):
         return ExtractTasksResponse(tasks=[], needsClarification=[])
 
+    long_body = prepare_long_body(body)
+    if long_body is not None:
+        return await _extract_tasks_chunked(
+            client=client,
+            long_body=long_body,
+            subject=subject,
+            user_name=user_name,
+            sender=sender,
+            received_at_utc=received_at_utc,
+            thread_hint=thread_hint,
+            deadline=deadline,
+        )
+
     email = make_email_input(
         subject=subject,
         body=body,
@@ -72,22 +88,109 @@ async def extract_tasks(
         thread_hint=thread_hint,
     )
 
-    ref_date_str = _make_reference_date_str(received_at_utc)
+    ref_date_str = make_reference_date_str(received_at_utc)
     system_prompt = extract_tasks_system_prompt(user_name=user_name, reference_date_str=ref_date_str)
     user_prompt = build_email_context(email)
 
+    model = route_email_model(endpoint="extract-tasks", subject=subject, body=body, scan=scan)
     data, status = await run_llm_json(
         client=client,
         system_prompt=system_prompt,
         user_prompt=user_prompt,
         log_name="extract-tasks",
+        contract=TASKS_CONTRACT,
         preview=False,
+        cache=True,
+        num_predict=settings.num_predict_tasks,
+        deadline=deadline,
+        model=model,
     )
 
-    if status != "ok" or data is None:
+    if data is None:
         logger.warning("extract-tasks failed (status=%s)", status)
-        return _fallback_response(status)
+        return fallback_response(status)
+
+    if has_low_confidence(data.get("tasks")):
+        larger = model_router.escalation_for(model, endpoint="extract-tasks", reason="low_confidence")
+        if larger is not None:
+            better, better_status = await run_llm_json(
+                client=client,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                log_name="extract-tasks",
+                contract=TASKS_CONTRACT,
+                cache=True,
+                num_predict=settings.num_predict_tasks,
+                deadline=deadline,
+                model=larger,
+            )
+            if better_status == "ok" and better is not None:
+                data, status = better, better_status
 
     tasks = parse_tasks(data.get("tasks", []))
+
     questions = parse_questions(data.get("needsClarification", []))
-    return ExtractTasksResponse(tasks=tasks, needsClarification=questions)
+    # "repaired": enkel de volledig binnengekomen taken
+    return ExtractTasksResponse(tasks=tasks, needsClarification=questions, isPartial=status != "ok")
+
+
+async def _extract_tasks_chunked(
+    *,
+    client: ollama.AsyncClient,
+    long_body: str,
+    subject: str,
+    user_name: str,
+    sender: Optional[str],
+    received_at_utc: Optional[str],
+    thread_hint: Optional[str],
+    deadline: Optional[float] = None,
+) -> ExtractTasksResponse:
+    """
+    Lange mail: taken per stuk (parallel) extraheren en samenvoegen, zonder extra call.
+    """
+    chunks, cut = limit_chunks(split_into_chunks(long_body), log_name="extract-tasks")
+    logger.info("chunked extract-tasks (chunks=%d body_len=%d)", len(chunks), len(long_body))
+
+    ref_date_str = make_reference_date_str(received_at_utc)
+    system_prompt = extract_tasks_system_prompt(user_name=user_name, reference_date_str=ref_date_str)
+
+    async def _map(index: int, chunk: str):
+        part = f"Deel {index + 1} van {len(chunks)} van een lange e-mail"
+        email = EmailInput(
+            subject=subject,
+            body=chunk,
+            sender=sender,
+            received_at_utc=received_at_utc,
+            thread_hint=f"{thread_hint.strip()} ({part})" if thread_hint else part,
+        )
+        return await run_llm_json(
+            client=client,
+            system_prompt=system_prompt,
+            user_prompt=build_email_context(email),
+            log_name="extract-tasks-chunk",
+            contract=TASKS_CONTRACT,
+            cache=True,
+            num_predict=settings.num_predict_tasks,
+            deadline=deadline,
+        )
+
+    results = await gather_chunks(_map(i, c) for i, c in enumerate(chunks))
+    partials = [data for data, _ in results if data is not None]
+    if not partials:
+        status = results[0][1] if results else "error"
+        logger.warning("chunked extract-tasks failed (status=%s)", status)
+        return fallback_response(status)
+
+    tasks = dedupe(
+        interleave([parse_tasks(p.get("tasks", [])) for p in partials]),
+        key=lambda t: t.title,
+    )
+    questions = dedupe(
+        (q for p in partials for q in parse_questions(p.get("needsClarification", []))),
+        key=lambda q: q,
+    )
+    return ExtractTasksResponse(
+        tasks=tasks[:5],
+        needsClarification=questions[:5],
+        isPartial=cut or len(partials) < len(chunks),
+    )
@@ -0,0 +1,49 @@
+import logging
+from fastapi import APIRouter
+
+from features.email.schemas import (
+    TriageBatchRequest,
+    TriageBatchResponse,
+    TriageBatchResult,
+    TriageEmailRequest,
+    TriageEmailResponse,
+)
+from features.email.triage.service import triage_batch, triage_email
+
+logger = logging.getLogger("focusflow.email.triage.router")
+
+router = APIRouter(prefix="/email", tags=["email-triage"])
+
+
+@router.post(
+    "/triage",
+    response_model=TriageEmailResponse,
+    summary="Score an email without calling the model",
+    description="Rule-based priority, category and signals for inbox sorting and prefiltering.",
+)
+def triage_email_endpoint(req: TriageEmailRequest):
+    return triage_email(subject=req.subject, body=req.body, received_at_utc=req.receivedAtUtc)
+
+
+@router.post(
+    "/triage/batch",
+    response_model=TriageBatchResponse,
+    summary="Score many emails without calling the model",
+    description="Same rules as /email/triage in one pass over the batch; results keep input order.",
+)
+def triage_batch_endpoint(req: TriageBatchRequest):
+    # gewone def: FastAPI draait dit in de threadpool, zodat het scannen de event loop
+    # (LLM-calls, SSE-streams) niet blokkeert
+    logger.info("triage batch received (items=%d)", len(req.items))
+
+    scored = triage_batch(
+        [item.subject for item in req.items],
+        [item.body for item in req.items],
+        [item.receivedAtUtc for item in req.items],
+    )
+    return TriageBatchResponse(
+        results=[
+            TriageBatchResult(id=item.id, **result.model_dump())
+            for item, result in zip(req.items, scored)
+        ]
+    )
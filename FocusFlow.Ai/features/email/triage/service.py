@@ -0,0 +1,201 @@
+import logging
+from array import array
+from bisect import bisect_right
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Sequence
+
+from features.email.schemas import AnalyzeEmailResponse, TriageEmailResponse
+from features.email.utils import signals
+from features.email.utils.email_text import lead_summary
+from features.email.utils.scoring import score_bucket
+
+logger = logging.getLogger("focusflow.email.triage")
+
+# afgeleide bits bovenop die van de scanner
+_DEADLINE = 1 << 16
+_DUE_SOON = 1 << 17
+_FYI_ONLY = 1 << 18
+
+# namen volgen de priority_signals uit de analyse-prompt
+_SIGNAL_NAMES = (
+    (signals.URGENT, "URGENT_WORDS"),
+    (_DEADLINE, "DEADLINE_MENTIONED"),
+    (_DUE_SOON, "DUE_DATE_SOON"),
+    (signals.PAYMENT, "INVOICE_PAYMENT"),
+    (signals.BLOCKED, "ACCOUNT_BLOCKED"),
+    (signals.INCIDENT, "INCIDENT_OUTAGE"),
+    (signals.MEETING, "MEETING_SCHEDULE"),
+    (signals.CONFIRM, "FOLLOW_UP_NEEDED"),
+    (_FYI_ONLY, "FYI_ONLY"),
+    (signals.MARKETING, "SPAM_OR_MARKETING"),
+    (signals.NO_ACTION, "NO_ACTION_REQUIRED"),
+)
+
+_NO_DATE = 0
+_SEPARATOR = "\x00"
+
+
+def _reference_ordinal(received_at_utc: Optional[str], now: datetime) -> int:
+    if received_at_utc:
+        try:
+            return datetime.fromisoformat(received_at_utc.replace("Z", "+00:00")).astimezone(timezone.utc).toordinal()
+        except Exception:
+            pass
+    return now.toordinal()
+
+
+class _Corpus:
+    """
+    Alle teksten achter elkaar (gescheiden door NUL), zodat de scanner één keer over de
+    hele batch loopt; match-posities worden via de offset-array terug naar een mail gemapt.
+    """
+
+    def __init__(self, texts: Sequence[str]) -> None:
+        self.text = _SEPARATOR.join(texts)
+        self.starts = array("q")
+        pos = 0
+        for t in texts:
+            self.starts.append(pos)
+            pos += len(t) + 1
+
+    def doc_of(self, pos: int) -> int:
+        return bisect_right(self.starts, pos) - 1
+
+
+def _scan(
+    corpus: _Corpus,
+    ref_ordinals: array,
+    bits: array,
+    earliest_future: array,
+    latest: array,
+) -> None:
+    for start, found, raw_date in signals.iter_signals(corpus.text):
+        doc = corpus.doc_of(start)
+        bits[doc] |= found
+        if raw_date is None:
+            continue
+
+        ordinal = signals.date_ordinal(raw_date, date.fromordinal(ref_ordinals[doc]).year)
+        if ordinal is None:
+            continue
+        if ordinal >= ref_ordinals[doc] and (earliest_future[doc] == _NO_DATE or ordinal < earliest_future[doc]):
+            earliest_future[doc] = ordinal
+        if ordinal > latest[doc]:
+            latest[doc] = ordinal
+
+
+def _category_for(bits: int) -> str:
+    if bits & signals.PAYMENT:
+        return "Factuur"
+    if bits & signals.MARKETING:
+        return "Reclame"
+    if bits & (signals.MEETING | signals.BLOCKING | signals.CONFIRM | _DEADLINE):
+        return "Werk"
+    return "Overig"
+
+
+def _action_for(bits: int) -> str:
+    if bits & signals.BLOCKING:
+        return "Actie Vereist"
+    if bits & (signals.NO_ACTION | _FYI_ONLY | signals.MARKETING):
+        return "Lezen"
+    if bits & (signals.URGENT | _DUE_SOON | signals.PAYMENT):
+        return "Actie Vereist"
+    if bits & signals.MEETING:
+        return "Inplannen"
+    if bits & signals.CONFIRM:
+        return "Antwoorden"
+    return "Lezen"
+
+
+def _signal_names(bits: int) -> List[str]:
+    return [name for bit, name in _SIGNAL_NAMES if bits & bit]
+
+
+def triage_batch(
+    subjects: Sequence[str],
+    bodies: Sequence[str],
+    received_at_utc: Sequence[Optional[str]],
+) -> List[TriageEmailResponse]:
+    """
+    Deterministische triage voor veel mails tegelijk: één scanner-pass over de hele
+    batch, datums en signalen in arrays per mail.
+    """
+    texts = [f"{s or ''}\n{b or ''}".strip() for s, b in zip(subjects, bodies)]
+    n = len(texts)
+    if n == 0:
+        return []
+
+    now = datetime.now(timezone.utc)
+    parsed_refs: Dict[Optional[str], int] = {}
+    ref_ordinals = array("l")
+    for raw in received_at_utc:
+        if raw not in parsed_refs:
+            parsed_refs[raw] = _reference_ordinal(raw, now)
+        ref_ordinals.append(parsed_refs[raw])
+
+    corpus = _Corpus(texts)
+    bits = array("l", [0]) * n
+    earliest_future = array("l", [_NO_DATE]) * n
+    latest = array("l", [_NO_DATE]) * n
+    _scan(corpus, ref_ordinals, bits, earliest_future, latest)
+
+    results: List[TriageEmailResponse] = []
+    for i in range(n):
+        deadline = earliest_future[i] or latest[i]
+        days = deadline - ref_ordinals[i] if deadline else None
+
+        doc_bits = bits[i]
+        if doc_bits & signals.DEADLINE_WORD or days is not None:
+            doc_bits |= _DEADLINE
+        if days is not None and 0 <= days <= 3:
+            doc_bits |= _DUE_SOON
+        if doc_bits & signals.FYI and not doc_bits & signals.ACTION_MARKER:
+            doc_bits |= _FYI_ONLY
+
+        category = _category_for(doc_bits)
+        action = _action_for(doc_bits)
+        score = score_bucket(
+            blocking=bool(doc_bits & signals.BLOCKING),
+            urgent=bool(doc_bits & signals.URGENT),
+            deadline_days=days,
+            deadline_word=bool(doc_bits & signals.DEADLINE_WORD),
+            payment=bool(doc_bits & signals.PAYMENT),
+            confirm=bool(doc_bits & signals.CONFIRM),
+            meeting=bool(doc_bits & signals.MEETING),
+            category=category,
+            suggested_action=action,
+        )
+
+        results.append(
+            TriageEmailResponse(
+                priorityScore=score,
+                category=category,
+                suggestedAction=action,
+                signals=_signal_names(doc_bits),
+            )
+        )
+
+    return results
+
+
+def triage_email(*, subject: str, body: str, received_at_utc: Optional[str] = None) -> TriageEmailResponse:
+    return triage_batch([subject], [body], [received_at_utc])[0]
+
+
+def degraded_analysis(*, subject: str, body: str, received_at_utc: Optional[str] = None) -> AnalyzeEmailResponse:
+    """
+    Analyse zonder model (circuit open of deadline op): deterministische triage +
+    extractieve samenvatting, gemarkeerd als partial.
+    """
+    triage = triage_email(subject=subject, body=body, received_at_utc=received_at_utc)
+    return AnalyzeEmailResponse(
+        summary=lead_summary(subject, body),
+        priorityScore=triage.priorityScore,
+        category=triage.category,
+        suggestedAction=triage.suggestedAction,
+        extractedTasks=[],
+        keyRequest=None,
+        evidence=[],
+        isPartial=True,
+    )
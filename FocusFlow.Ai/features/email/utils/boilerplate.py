@@ -0,0 +1,128 @@
+import re
+from dataclasses import dataclass
+from typing import List
+
+from shared.token_estimate import estimate_tokens
+
+_URL_RX = re.compile(r"https?://([^\s/?#<>\"')\]]+)[^\s<>\"')\]]*", re.IGNORECASE)
+_BASE64_RX = re.compile(r"[A-Za-z0-9+/]{120,}={0,2}")
+_INLINE_SPACE_RX = re.compile(r"[ \t\u00a0]{2,}")
+
+_SHORT_URL_MAX = 40
+_MAX_SIGNATURE_LINES = 12
+
+# "-- " is de standaard handtekening-scheiding (RFC 3676)
+_SIGNATURE_DELIMITERS = ("--", "__")
+_MOBILE_SIGNATURES = (
+    "sent from my iphone",
+    "sent from my android",
+    "verzonden vanaf mijn iphone",
+    "verzonden vanaf mijn android",
+    "verstuurd vanaf mijn iphone",
+    "get outlook for",
+    "download outlook voor",
+)
+
+_FOOTER_MARKERS = (
+    "unsubscribe",
+    "schrijf je hier uit",
+    "hier uitschrijven",
+    "hier afmelden",
+    "uitschrijven voor deze nieuwsbrief",
+    "afmelden voor deze nieuwsbrief",
+    "view in browser",
+    "view this email in your browser",
+    "bekijk in je browser",
+    "bekijk deze e-mail in je browser",
+    "privacy policy",
+    "privacybeleid",
+    "manage your preferences",
+    "voorkeuren beheren",
+    "you are receiving this",
+    "je ontvangt deze",
+    "u ontvangt deze",
+)
+
+_DISCLAIMER_MARKERS = (
+    "disclaimer",
+    "this e-mail and any attachments",
+    "this email and any attachments",
+    "this message is intended only",
+    "intended solely for the",
+    "confidential and may be privileged",
+    "dit bericht is uitsluitend bestemd",
+    "dit e-mailbericht is uitsluitend bestemd",
+    "de informatie in dit bericht is vertrouwelijk",
+    "vertrouwelijk en uitsluitend bestemd",
+    "aan dit bericht kunnen geen rechten",
+)
+
+
+@dataclass(frozen=True)
+class CleanedText:
+    text: str
+    removed_chars: int
+    saved_tokens: int
+
+
+def _shorten_url(match: "re.Match[str]") -> str:
+    url = match.group(0)
+    if len(url) <= _SHORT_URL_MAX:
+        return url
+    domain = match.group(1).lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def _is_boilerplate_paragraph(paragraph: str) -> bool:
+    lowered = paragraph.lower()
+    return any(m in lowered for m in _FOOTER_MARKERS) or any(m in lowered for m in _DISCLAIMER_MARKERS)
+
+
+def _cut_signature(lines: List[str]) -> List[str]:
+    # alleen een korte staart afknippen; een lange rest is eerder inhoud dan een handtekening
+    for i in range(max(1, len(lines) - _MAX_SIGNATURE_LINES), len(lines)):
+        stripped = lines[i].strip()
+        if stripped in _SIGNATURE_DELIMITERS or stripped.lower().startswith(_MOBILE_SIGNATURES):
+            return lines[:i]
+    return lines
+
+
+def strip_boilerplate(text: str) -> CleanedText:
+    """
+    Haalt handtekeningen, disclaimers, uitschrijf-footers, base64-blobs en overbodige
+    witruimte uit een mailbody en kort lange (tracking-)URL's in tot hun domein.
+    De eerste alinea blijft altijd staan.
+    """
+    if not text:
+        return CleanedText(text="", removed_chars=0, saved_tokens=0)
+
+    cleaned = _URL_RX.sub(_shorten_url, text)
+    cleaned = _BASE64_RX.sub("[data]", cleaned)
+
+    lines = [_INLINE_SPACE_RX.sub(" ", line).rstrip() for line in cleaned.replace("\r\n", "\n").split("\n")]
+    lines = _cut_signature(lines)
+
+    paragraphs: List[str] = []
+    current: List[str] = []
+    for line in lines + [""]:
+        if line.strip():
+            current.append(line)
+        elif current:
+            paragraphs.append("\n".join(current))
+            current = []
+
+    # footers en disclaimers staan onderaan: enkel de tweede helft (na de eerste alinea) opkuisen
+    half = sum(len(p) for p in paragraphs) // 2
+    kept: List[str] = []
+    offset = 0
+    for index, paragraph in enumerate(paragraphs):
+        if index == 0 or offset < half or not _is_boilerplate_paragraph(paragraph):
+            kept.append(paragraph)
+        offset += len(paragraph)
+
+    result = "\n\n".join(kept)
+    return CleanedText(
+        text=result,
+        removed_chars=max(0, len(text) - len(result)),
+        saved_tokens=max(0, estimate_tokens(text) - estimate_tokens(result)),
+    )
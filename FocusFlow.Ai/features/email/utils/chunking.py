@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from itertools import zip_longest
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple, TypeVar
+
+from config import settings
+from shared.token_estimate import estimate_tokens, fit_to_tokens
+from features.email.utils.boilerplate import strip_boilerplate
+from features.email.utils.email_text import cut_reply_history, is_reply_boundary
+
+logger = logging.getLogger("focusflow.email.chunking")
+
+T = TypeVar("T")
+
+
+def prepare_long_body(body: str) -> Optional[str]:
+    """
+    Geeft de opgekuiste body terug als die niet in max_body_tokens past (=> chunked mode),
+    anders None (gewone single-call flow).
+    """
+    if not settings.chunking_enabled:
+        return None
+    text = strip_boilerplate(cut_reply_history(body or "")).text
+    if estimate_tokens(text) <= settings.max_body_tokens:
+        return None
+    return text
+
+
+def _segments(text: str) -> Iterable[str]:
+    # alinea's; een reply/forward-grens begint altijd een nieuw segment
+    current: List[str] = []
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if not stripped or is_reply_boundary(stripped):
+            if current:
+                yield "\n".join(current)
+                current = []
+            if stripped:
+                yield "\f" + line
+            continue
+        current.append(line)
+    if current:
+        yield "\n".join(current)
+
+
+def split_into_chunks(text: str, chunk_tokens: Optional[int] = None, max_chunks: Optional[int] = None) -> List[str]:
+    """
+    Verdeelt een lange body in stukken van hoogstens chunk_tokens, op alinea- en
+    reply-grenzen. Te lange alinea's worden op woordgrens opgesplitst.
+    Zonder max_chunks komen alle stukken terug; zie limit_chunks.
+    """
+    budget = chunk_tokens or settings.chunk_max_tokens
+
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+
+    def _flush() -> None:
+        nonlocal current, used
+        if current:
+            chunks.append("\n\n".join(current))
+        current, used = [], 0
+
+    for segment in _segments(text):
+        if segment.startswith("\f"):
+            _flush()
+            segment = segment[1:]
+
+        tokens = estimate_tokens(segment)
+        if used + tokens > budget:
+            _flush()
+
+        while tokens > budget:
+            head = fit_to_tokens(segment, budget) or segment[: budget]
+            chunks.append(head)
+            segment = segment[len(head):].lstrip()
+            tokens = estimate_tokens(segment)
+
+        if segment:
+            current.append(segment)
+            used += tokens
+
+    _flush()
+
+    return chunks[:max_chunks] if max_chunks else chunks
+
+
+def limit_chunks(chunks: List[str], *, log_name: str) -> Tuple[List[str], bool]:
+    """
+    Houdt de eerste chunk_max_count stukken. Geeft (stukken, afgekapt); wat afgekapt
+    werd, heeft het model nooit gezien => het resultaat is onvolledig (isPartial).
+    """
+    limit = settings.chunk_max_count
+    if len(chunks) <= limit:
+        return chunks, False
+    logger.warning("%s: long body split into %d chunks, keeping first %d", log_name, len(chunks), limit)
+    return chunks[:limit], True
+
+
+async def gather_chunks(calls: Iterable[Awaitable[T]]) -> List[T]:
+    """
+    Zoals asyncio.gather, maar faalt één stuk (bv. SchedulerOverloaded) of wordt de
+    aanroeper geannuleerd, dan worden de andere calls ook geannuleerd en geven ze hun
+    scheduler-slot terug.
+    """
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def interleave(groups: Iterable[List[T]]) -> List[T]:
+    # om beurten uit elke groep, zodat elk stuk bijdraagt aan een begrensde lijst
+    return [item for row in zip_longest(*groups) for item in row if item is not None]
+
+
+def dedupe(items: Iterable[T], key: Callable[[T], str]) -> List[T]:
+    seen = set()
+    out: List[T] = []
+    for item in items:
+        k = " ".join(key(item).lower().split())
+        if k and k not in seen:
+            seen.add(k)
+            out.append(item)
+    return out
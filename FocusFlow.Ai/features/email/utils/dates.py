@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def make_reference_date_str(received_at_utc: Optional[str]) -> str:
+    if received_at_utc:
+        try:
+            dt = datetime.fromisoformat(received_at_utc.replace("Z", "+00:00")).astimezone(timezone.utc)
+            return dt.strftime("%A %Y-%m-%d")
+        except Exception:
+            date_part = received_at_utc[:10] if len(received_at_utc) >= 10 else received_at_utc
+            try:
+                dt = datetime.fromisoformat(date_part).replace(tzinfo=timezone.utc)
+                return dt.strftime("%A %Y-%m-%d")
+            except Exception:
+                return date_part
+    return datetime.now(timezone.utc).strftime("%A %Y-%m-%d")
@@ -1,17 +1,17 @@
+import logging
 import re
 from typing import Optional
 
 from config import settings
 from features.email.schemas import EmailInput
+from features.email.utils.boilerplate import strip_boilerplate
+from shared.token_estimate import fit_to_tokens
 
-_REPLY_CUT_PATTERNS = [
-    re.compile(r"^\s*-{2,}\s*Original Message\s*-{2,}\s*$", re.IGNORECASE | re.MULTILINE),
-    re.compile(r"^\s*From:\s.+$", re.IGNORECASE | re.MULTILINE),
-    re.compile(r"^\s*Sent:\s.+$", re.IGNORECASE | re.MULTILINE),
-    re.compile(r"^\s*To:\s.+$", re.IGNORECASE | re.MULTILINE),
-    re.compile(r"^\s*Subject:\s.+$", re.IGNORECASE | re.MULTILINE),
-    re.compile(r"^\s*Op\s.+\sschreef\s.+:$", re.IGNORECASE | re.MULTILINE),  
-]
+logger = logging.getLogger("focusflow.email.preprocess")
+
+# reply/forward-headers: "From: ...", "Sent: ...", "To: ...", "Subject: ..."
+_HEADER_PREFIXES = ("from:", "sent:", "to:", "subject:")
+_HEADER_PREFIX_MAX = max(len(p) for p in _HEADER_PREFIXES)
 
 _MIN_CUTOFF_AT = 200
 
@@ -36,28 +36,92 @@ def is_effectively_empty(subject: str, body: str, min_body_chars: int = 10) -> b
     return (not subject) and (len(body) < min_body_chars)
 
 
-def trim_body_for_processing(body: str) -> str:
-    if not body:
-        return ""
+def _is_header_line(line: str) -> bool:
+    head = line[:_HEADER_PREFIX_MAX + 2].lower()
+    for prefix in _HEADER_PREFIXES:
+        # "<prefix>\s.+": witruimte en minstens één teken erna
+        if head.startswith(prefix) and len(line) > len(prefix) + 1 and line[len(prefix)].isspace():
+            return True
+    return False
+
+
+def _is_original_message_line(line: str) -> bool:
+    # "--- Original Message ---"
+    if not (line.startswith("--") and line.endswith("--")):
+        return False
+    return line.strip("-").strip().lower() == "original message"
+
+
+def _is_wrote_line(line: str) -> bool:
+    # "Op <datum> schreef <naam> <adres>:" zonder backtracking: één find-lus per regel
+    if not line.endswith(":") or len(line) < 15:
+        return False
+    if line[:2].lower() != "op" or not line[2].isspace():
+        return False
+
+    lowered = line.lower()
+    k = lowered.find("schreef", 5)
+    while k != -1:
+        if k + 10 > len(line):
+            return False
+        if line[k - 1].isspace() and line[k + 7].isspace():
+            return True
+        k = lowered.find("schreef", k + 1)
+    return False
+
+
+def is_reply_boundary(line: str) -> bool:
+    return _is_header_line(line) or _is_original_message_line(line) or _is_wrote_line(line)
+
+
+def _find_reply_cut(text: str, scan_limit: int) -> Optional[int]:
+    """
+    Eén lineaire pass over de regels: geeft het begin van de vroegste reply/forward-grens
+    na _MIN_CUTOFF_AT, en stopt zodra scan_limit voorbij is (daarna wordt toch afgekapt).
+    """
+    pos = 0
+    end = len(text)
+    while pos < end and pos < scan_limit:
+        nl = text.find("\n", pos)
+        if nl == -1:
+            nl = end
+
+        if pos > _MIN_CUTOFF_AT:
+            line = text[pos:nl].strip()
+            if line and is_reply_boundary(line):
+                return pos
+
+        pos = nl + 1
+    return None
 
-    text = body.strip()
 
-    cut_at = None
-    for rx in _REPLY_CUT_PATTERNS:
-        m = rx.search(text)
-        if m and m.start() > _MIN_CUTOFF_AT:
-            cut_at = m.start()
-            break
+def cut_reply_history(body: str) -> str:
+    text = (body or "").strip()
 
+    cut_at = _find_reply_cut(text, settings.max_body_chars)
     if cut_at is not None:
         text = text[:cut_at].rstrip()
 
+    return text
+
+
+def _limit_body(text: str) -> str:
+    # eerst de harde tekengrens (goedkoop), dan het tokenbudget op wat overblijft
     if len(text) > settings.max_body_chars:
         text = _truncate_with_ellipsis(text, settings.max_body_chars)
 
+    fitted = fit_to_tokens(text, settings.max_body_tokens)
+    if len(fitted) < len(text):
+        return fitted.rstrip("…") + "…"
     return text
 
 
+def trim_body_for_processing(body: str) -> str:
+    if not body:
+        return ""
+    return _limit_body(cut_reply_history(body))
+
+
 def limit_summary(summary: str) -> str:
     text = (summary or "").strip() or "Geen samenvatting"
     if len(text) > settings.summary_max_chars:
@@ -65,6 +129,25 @@ def limit_summary(summary: str) -> str:
     return text
 
 
+_GREETINGS = ("hallo", "hoi", "hey", "hi", "hello", "beste", "dag", "goedemorgen", "goedemiddag", "dear")
+_SENTENCE_RX = re.compile(r"(?<=[.!?])\s+")
+
+
+def lead_summary(subject: str, body: str, max_sentences: int = 2) -> str:
+    """
+    Extractieve samenvatting zonder model: de eerste zinnen van de opgekuiste body
+    (aanhef overgeslagen), anders het onderwerp.
+    """
+    text = strip_boilerplate(cut_reply_history(body or "")).text
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    if lines and len(lines[0]) <= 40 and lines[0].lower().startswith(_GREETINGS):
+        lines = lines[1:]
+
+    sentences = _SENTENCE_RX.split(" ".join(lines))
+    summary = " ".join(s for s in sentences[:max_sentences] if s).strip()
+    return limit_summary(summary or (subject or "").strip())
+
+
 def build_email_context(email: EmailInput) -> str:
     lines = [
         f"Van: {email.sender or ''}".strip(),
@@ -89,10 +172,20 @@ def make_email_input(
     received_at_utc: Optional[str],
     thread_hint: Optional[str],
 ) -> EmailInput:
-    
+    text = cut_reply_history(body or "")
+
+    cleaned = strip_boilerplate(text)
+    if cleaned.removed_chars:
+        logger.info(
+            "boilerplate stripped (chars=%d -> %d, saved_tokens~%d)",
+            len(text),
+            len(cleaned.text),
+            cleaned.saved_tokens,
+        )
+
     return EmailInput(
         subject=subject or "",
-        body=trim_body_for_processing(body or ""),
+        body=_limit_body(cleaned.text),
         sender=sender,
         received_at_utc=received_at_utc,
         thread_hint=thread_hint,
@@ -0,0 +1,57 @@
+import re
+from typing import Optional
+
+from shared.model_router import model_router
+from shared.token_estimate import estimate_tokens
+from features.email.utils import signals
+from features.email.utils.boilerplate import strip_boilerplate
+from features.email.utils.email_text import trim_body_for_processing
+
+_WORD_RX = re.compile(r"[a-zà-ÿ]+")
+_NL_WORDS = frozenset((
+    "de", "het", "een", "en", "van", "ik", "je", "jij", "u", "we", "wij", "is", "niet", "dat",
+    "voor", "met", "op", "graag", "kun", "kan", "alvast", "groeten", "bedankt", "zijn", "ook",
+))
+_EN_WORDS = frozenset((
+    "the", "a", "an", "and", "of", "i", "you", "we", "is", "not", "that", "for", "with", "on",
+    "please", "can", "could", "thanks", "regards", "are", "be", "to", "this", "it", "your",
+))
+_LANGUAGE_SAMPLE_CHARS = 2000
+_MIN_LANGUAGE_HITS = 3
+
+# als deze signalen er zijn, is de categorie/actie al duidelijk zonder model
+_SETTLED = signals.MARKETING | signals.NO_ACTION | signals.PAYMENT | signals.BLOCKING
+
+
+def guess_language(text: str) -> Optional[str]:
+    """
+    "nl" of "en" op basis van stopwoorden in het begin van de tekst; None als er te
+    weinig aanwijzingen zijn (dan kiest de router het grote model).
+    """
+    nl = en = 0
+    for word in _WORD_RX.findall((text or "")[:_LANGUAGE_SAMPLE_CHARS].lower()):
+        nl += word in _NL_WORDS
+        en += word in _EN_WORDS
+    if max(nl, en) < _MIN_LANGUAGE_HITS:
+        return None
+    return "nl" if nl >= en else "en"
+
+
+def route_email_model(
+    *,
+    endpoint: str,
+    subject: str,
+    body: str,
+    scan: Optional[signals.SignalScan] = None,
+) -> str:
+    if model_router.small is None:
+        return model_router.large
+    text = strip_boilerplate(trim_body_for_processing(body or "")).text
+    if scan is None:
+        scan = signals.scan_email_signals(subject, body)
+    return model_router.choose(
+        endpoint=endpoint,
+        input_tokens=estimate_tokens(subject or "") + estimate_tokens(text),
+        language=guess_language(f"{subject or ''}\n{text}"),
+        triage_settled=scan.has(_SETTLED) or scan.fyi_without_action,
+    )
@@ -0,0 +1,44 @@
+from typing import Optional
+
+
+def score_bucket(
+    *,
+    blocking: bool,
+    urgent: bool,
+    deadline_days: Optional[int],
+    deadline_word: bool,
+    payment: bool,
+    confirm: bool,
+    meeting: bool,
+    category: str,
+    suggested_action: str,
+) -> int:
+    """
+    Deterministische prioriteit in buckets (0/25/50/75/100) uit de signalen van de
+    scanner; gedeeld door de analyse en de regelgebaseerde triage.
+    """
+    if blocking:
+        return 100 if urgent else 75
+
+    if urgent:
+        return 75
+
+    if deadline_days is not None:
+        if deadline_days <= 1:
+            return 100 if deadline_word else 75
+        if deadline_days <= 3:
+            return 75
+        return 50
+
+    if category == "Factuur" or payment:
+        if confirm:
+            return 75
+        return 50
+
+    if suggested_action == "Inplannen" or meeting:
+        return 50
+
+    if suggested_action == "Antwoorden":
+        return 50
+
+    return 50
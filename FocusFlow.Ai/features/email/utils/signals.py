@@ -0,0 +1,211 @@
+import re
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Pattern, Tuple
+
+# signal bits
+URGENT = 1 << 0
+BLOCKED = 1 << 1
+INCIDENT = 1 << 2
+PAYMENT = 1 << 3
+CONFIRM = 1 << 4
+MEETING = 1 << 5
+DEADLINE_WORD = 1 << 6
+MARKETING = 1 << 7
+NO_ACTION = 1 << 8
+FYI = 1 << 9
+ACTION_MARKER = 1 << 10
+DATE = 1 << 11
+
+BLOCKING = BLOCKED | INCIDENT
+
+_FAMILIES: Tuple[Tuple[int, Tuple[str, ...]], ...] = (
+    (URGENT, ("asap", "dringend", "urgent", "met spoed", "nu", "vandaag")),
+    (BLOCKED, ("geblokkeerd", "blocked")),
+    (INCIDENT, ("incident", "storing", "down", "niet werken")),
+    (PAYMENT, ("factuur", "invoice", "betaling", "betaal", "betaalherinnering")),
+    (CONFIRM, ("kun je bevestigen", "graag bevestiging", "confirm")),
+    (MEETING, ("meeting", "call", "afstemmen", "sync", "inplannen", "voorstel")),
+    (DEADLINE_WORD, ("voor", "tegen", "uiterlijk", "deadline")),
+    (MARKETING, (
+        "unsubscribe", "uitschrijven", "afmelden", "nieuwsbrief", "newsletter",
+        "korting", "aanbieding", "promotie", "promo", "sale",
+    )),
+    (NO_ACTION, ("geen actie vereist", "geen actie nodig", "no action required", "no action needed")),
+    (FYI, ("ter info", "for your information", "fyi")),
+    (ACTION_MARKER, (
+        "gelieve", "kun je", "kan je", "please", "moet*", "vergeet",
+        "deadline", "voor", "tegen", "uiterlijk", "by", "before", "asap",
+    )),
+)
+
+
+def _compile_families():
+    words: Dict[str, int] = {}
+    prefixes: Dict[str, int] = {}
+    phrases: Dict[str, List[Tuple[Pattern[str], int]]] = {}
+
+    for bit, keywords in _FAMILIES:
+        for keyword in keywords:
+            parts = keyword.split()
+            if len(parts) > 1:
+                rx = re.compile(r"\s+".join(map(re.escape, parts)) + r"\b", re.IGNORECASE)
+                phrases.setdefault(parts[0], []).append((rx, bit))
+            elif keyword.endswith("*"):
+                prefixes[keyword[:-1]] = prefixes.get(keyword[:-1], 0) | bit
+            else:
+                words[keyword] = words.get(keyword, 0) | bit
+
+    return words, prefixes, {k: tuple(v) for k, v in phrases.items()}
+
+
+def _trie_pattern(words) -> str:
+    """
+    Alternatie als prefix-trie (a(?:sap|fmelden)|b...), zodat de regex-engine per
+    positie hoogstens één tak volgt in plaats van elk keyword apart te proberen.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def _build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + _build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return _build(trie)
+
+
+_WORDS, _PREFIXES, _PHRASES = _compile_families()
+_PREFIX_STARTS = tuple(_PREFIXES)
+
+# kandidaat-tokens: datums, of woorden die met een (eerste) keyword beginnen;
+# de lookahead laat de engine alle andere posities in één tekenklasse-check overslaan
+_FIRST_WORDS = set(_WORDS) | set(_PREFIXES) | set(_PHRASES)
+_TOKEN_RX = re.compile(
+    r"(?i)\b(?=[\d" + "".join(sorted({re.escape(w[0]) for w in _FIRST_WORDS})) + r"])"
+    r"(?:\d{4}-\d{2}-\d{2}\b|\d{1,2}[/\-]\d{1,2}(?:[/\-]\d{2,4})?\b|" + _trie_pattern(_FIRST_WORDS) + r"\w*)"
+)
+_DATE_SEP_RX = re.compile(r"[/\-]")
+
+# (jaar of None, maand, dag); een datum zonder jaar valt in het jaar van de referentie
+RawDate = Tuple[Optional[int], int, int]
+
+
+@dataclass(frozen=True)
+class SignalScan:
+    bits: int
+    positions: Tuple[Tuple[int, int], ...]  # (bit, offset) per match
+    dates: Tuple[RawDate, ...]
+
+    def has(self, mask: int) -> bool:
+        return bool(self.bits & mask)
+
+    @property
+    def no_action_required(self) -> bool:
+        return self.has(NO_ACTION)
+
+    @property
+    def fyi_without_action(self) -> bool:
+        return self.has(FYI) and not self.has(ACTION_MARKER)
+
+
+def _parse_date_token(token: str) -> RawDate:
+    parts = _DATE_SEP_RX.split(token)
+    if len(parts[0]) == 4:
+        return int(parts[0]), int(parts[1]), int(parts[2])
+
+    year = None
+    if len(parts) == 3:
+        year = int(parts[2])
+        if year < 100:
+            year += 2000
+    return year, int(parts[1]), int(parts[0])
+
+
+def _extra_bits(text: str, start: int, word: str) -> int:
+    bits = 0
+    for prefix, bit in _PREFIXES.items():
+        if word.startswith(prefix):
+            bits |= bit
+    for rx, bit in _PHRASES.get(word, ()):
+        if rx.match(text, start):
+            bits |= bit
+    return bits
+
+
+def iter_signals(text: str) -> Iterator[Tuple[int, int, Optional[RawDate]]]:
+    """
+    Eén pass over de tekst: kandidaat-tokens worden via dict-lookups aan families
+    gekoppeld (frases alleen gecontroleerd vanaf hun eerste woord). Geeft (offset, bits, datum).
+    """
+    words = _WORDS
+    phrases = _PHRASES
+    prefix_starts = _PREFIX_STARTS
+
+    for m in _TOKEN_RX.finditer(text):
+        token = m.group()
+        if token[0].isdigit() and ("-" in token or "/" in token):
+            yield m.start(), DATE, _parse_date_token(token)
+            continue
+
+        word = token.lower()
+        bits = words.get(word, 0)
+        if word in phrases or word.startswith(prefix_starts):
+            bits |= _extra_bits(text, m.start(), word)
+        if bits:
+            yield m.start(), bits, None
+
+
+def scan_signals(text: str) -> SignalScan:
+    bits = 0
+    positions: List[Tuple[int, int]] = []
+    dates: List[RawDate] = []
+
+    for start, found, raw_date in iter_signals(text or ""):
+        bits |= found
+        positions.append((found, start))
+        if raw_date is not None:
+            dates.append(raw_date)
+
+    return SignalScan(bits=bits, positions=tuple(positions), dates=tuple(dates))
+
+
+def scan_email_signals(subject: str, body: str) -> SignalScan:
+    # services scannen één keer per mail en geven het resultaat door (scan=...)
+    return scan_signals(f"{subject or ''}\n{body or ''}".strip())
+
+
+def date_ordinal(raw: RawDate, ref_year: int) -> Optional[int]:
+    year, month, day = raw
+    try:
+        return date(ref_year if year is None else year, month, day).toordinal()
+    except ValueError:
+        return None
+
+
+def deadline_days(dates: Tuple[RawDate, ...], ref: date) -> Optional[int]:
+    """
+    Dagen tot de vroegste datum op of na ref; zijn er alleen datums in het verleden,
+    dan telt de laatste daarvan.
+    """
+    ref_ordinal = ref.toordinal()
+    earliest_future: Optional[int] = None
+    latest: Optional[int] = None
+
+    for raw in dates:
+        ordinal = date_ordinal(raw, ref.year)
+        if ordinal is None:
+            continue
+        if ordinal >= ref_ordinal and (earliest_future is None or ordinal < earliest_future):
+            earliest_future = ordinal
+        if latest is None or ordinal > latest:
+            latest = ordinal
+
+    deadline = earliest_future if earliest_future is not None else latest
+    return None if deadline is None else deadline - ref_ordinal
@@ -0,0 +1,23 @@
+from typing import Dict
+
+from features.email.analysis.prompts import email_analysis_system_prompt
+from features.email.compose.prompts import compose_email_system_prompt
+from features.email.process.prompts import email_process_system_prompt
+from features.email.reply.prompts import draft_reply_system_prompt
+from features.email.tasks.prompts import extract_tasks_system_prompt
+from features.email.utils.dates import make_reference_date_str
+
+
+def email_warmup_prompts(user_name: str) -> Dict[str, str]:
+    """
+    System prompts van de email-features met de standaardinstellingen, om bij het
+    laden van een model op te warmen (zie shared.residency).
+    """
+    reference_date = make_reference_date_str(None)
+    return {
+        "email-analysis": email_analysis_system_prompt(user_name),
+        "extract-tasks": extract_tasks_system_prompt(user_name=user_name, reference_date_str=reference_date),
+        "email-process": email_process_system_prompt(user_name=user_name, reference_date_str=reference_date),
+        "draft-reply": draft_reply_system_prompt(user_name=user_name, tone="Neutral", length="Medium", language=""),
+        "compose-email": compose_email_system_prompt(user_name=user_name),
+    }
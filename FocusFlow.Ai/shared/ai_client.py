@@ -1,20 +1,211 @@
 import asyncio
+import hashlib
+import json
 import logging
-import ollama
+import re
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 from config import settings
+from shared.backends import BackendCapabilities, InferenceBackend
+from shared.circuit_breaker import llm_breaker
+from shared.deadline import DeadlineExceeded, call_timeout
+from shared.hedging import llm_hedging
+from shared.scheduler import Priority, llm_scheduler
+from shared.single_flight import llm_flights
+from shared.token_estimate import estimate_tokens, fit_to_tokens
 
 logger = logging.getLogger("focusflow.shared.ai_client")
 
+JsonFormat = Union[str, Dict[str, Any]]
 
-async def warmup_ollama_model(client: ollama.AsyncClient) -> None:
-    system_prompt = "You are a helpful assistant."
+CONTINUE_PROMPT = (
+    "Je antwoord werd afgebroken. Ga exact verder vanaf het laatste teken, "
+    "zonder iets te herhalen en zonder uitleg."
+)
+_CONTINUATION_FENCE_RX = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", flags=re.IGNORECASE)
+_OVERLAP_WINDOW = 200
+_MIN_OVERLAP = 8
+
+
+class ContextTiers:
+    """
+    Kiest num_ctx uit een vaste set tiers. Eenmaal groter gegaan blijft de tier staan
+    (zolang die past), zodat wisselende promptgroottes Ollama niet telkens laten herladen.
+    """
+
+    def __init__(self, tiers) -> None:
+        self._tiers = sorted(set(tiers)) or [2048]
+        self._current = self._tiers[0]
+
+    @property
+    def base(self) -> int:
+        return self._tiers[0]
+
+    @property
+    def largest(self) -> int:
+        return self._tiers[-1]
+
+    @property
+    def current(self) -> int:
+        return self._current
+
+    def pick(self, needed_tokens: int) -> int:
+        if needed_tokens <= self._current:
+            return self._current
+        for tier in self._tiers:
+            if tier >= needed_tokens:
+                self._current = tier
+                return tier
+        self._current = self.largest
+        return self.largest
+
+
+context_tiers = ContextTiers(settings.llm_num_ctx_tiers)
+
+
+def _budget_prompt(
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    num_predict: Optional[int],
+    log_name: str,
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Budgetteert system prompt + context + verwachte output. Past het niet in de grootste
+    tier, dan wordt de user prompt (mailcontext, body achteraan) hier ingekort in plaats
+    van stil door Ollama afgekapt.
+    """
+    num_predict = num_predict or settings.num_predict_default
+    fixed = estimate_tokens(system_prompt) + num_predict + settings.llm_prompt_overhead_tokens
+    user_tokens = estimate_tokens(user_prompt)
+
+    if fixed + user_tokens > context_tiers.largest:
+        available = max(0, context_tiers.largest - fixed)
+        logger.warning(
+            "%s prompt too large (~%d tokens, ctx=%d) -> user prompt cut to ~%d tokens",
+            log_name,
+            fixed + user_tokens,
+            context_tiers.largest,
+            available,
+        )
+        user_prompt = fit_to_tokens(user_prompt, available)
+        user_tokens = available
+
+    num_ctx = context_tiers.pick(fixed + user_tokens)
+    return user_prompt, {"num_ctx": num_ctx, "num_predict": num_predict}
+
+
+def _continuation_request(
+    messages: List[Dict[str, str]],
+    partial: str,
+    options: Dict[str, Any],
+    log_name: str,
+) -> Optional[Tuple[List[Dict[str, str]], Dict[str, Any]]]:
+    """
+    Vervolgcall voor een afgekapt antwoord: het halve antwoord als assistant-bericht,
+    daarna de vraag om verder te schrijven. None als het gesprek dan niet meer in de
+    grootste contexttier past.
+    """
+    num_predict = options.get("num_predict") or settings.num_predict_default
+    needed = (
+        sum(estimate_tokens(m["content"]) for m in messages)
+        + estimate_tokens(partial)
+        + estimate_tokens(CONTINUE_PROMPT)
+        + num_predict
+        + settings.llm_prompt_overhead_tokens
+    )
+    if needed > context_tiers.largest:
+        logger.warning("%s truncated but no room to continue (~%d tokens)", log_name, needed)
+        return None
+
+    follow_up = messages + [
+        {"role": "assistant", "content": partial},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+    return follow_up, {**options, "num_ctx": context_tiers.pick(needed)}
+
+
+def _stitch(partial: str, continuation: str) -> str:
+    # het model herhaalt soms het einde van het vorige stuk of zet er een fence rond
+    continuation = _CONTINUATION_FENCE_RX.sub("", continuation)
+    for size in range(min(len(partial), len(continuation), _OVERLAP_WINDOW), _MIN_OVERLAP - 1, -1):
+        if partial.endswith(continuation[:size]):
+            return continuation[size:]
+    return continuation
+
+
+def _content_of(response: Any) -> str:
+    return (response.get("message") or {}).get("content", "") or ""
+
+
+async def _chat_to_completion(
+    client: InferenceBackend,
+    *,
+    model: str,
+    messages: List[Dict[str, str]],
+    format: JsonFormat,
+    options: Dict[str, Any],
+    log_name: str,
+) -> str:
+    """
+    Eén chat-call; stopt het model op num_predict of de contextlimiet (done_reason
+    "length"), dan volgen maximaal llm_max_continuations vervolgcalls en worden de
+    stukken aan elkaar gezet. Vervolgcalls gaan zonder format: een JSON-format laat
+    het model opnieuw met een object beginnen.
+    """
+    response = await client.chat(model=model, messages=messages, format=format, options=options)
+    text = _content_of(response)
+
+    for round_no in range(1, settings.llm_max_continuations + 1):
+        if response.get("done_reason") != "length":
+            break
+        follow_up = _continuation_request(messages, text, options, log_name)
+        if follow_up is None:
+            break
+        logger.info("%s truncated (len=%d) -> continuation %d", log_name, len(text), round_no)
+        follow_messages, follow_options = follow_up
+        response = await client.chat(model=model, messages=follow_messages, options=follow_options)
+        text += _stitch(text, _content_of(response))
+
+    return text
+
+
+def capabilities_of(client: Any) -> BackendCapabilities:
+    return getattr(client, "capabilities", None) or BackendCapabilities()
+
+
+async def warmup_model(
+    client: InferenceBackend,
+    *,
+    models: Optional[Sequence[str]] = None,
+    system_prompts: Sequence[str] = (),
+) -> List[str]:
+    """
+    Laadt de modellen met een call van één token. Met system_prompts wordt elke prompt
+    één keer geëvalueerd, zodat Ollama die prefix al in de KV-cache heeft.
+    Geeft de modellen terug waarvoor de warm-up lukte.
+    """
     user_prompt = "ping"
+    prompts = list(system_prompts) or ["You are a helpful assistant."]
+
+    # ook het kleine model laden, anders betaalt de eerste gerouteerde call de laadtijd
+    if models is None:
+        models = [settings.ai_model] + ([settings.ai_model_small] if settings.ai_model_small else [])
+
+    warmed = []
+    for model in models:
+        results = [await _warm_one(client, model, system_prompt, user_prompt) for system_prompt in prompts]
+        if any(results):
+            warmed.append(model)
+    return warmed
 
+
+async def _warm_one(client: InferenceBackend, model: str, system_prompt: str, user_prompt: str) -> bool:
     try:
         async def _warm_call() -> None:
             await client.chat(
-                model=settings.ai_model,
+                model=model,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
@@ -23,36 +214,280 @@ async def warmup_ollama_model(client: ollama.AsyncClient) -> None:
                     "temperature": 0.0,
                     "top_p": 1.0,
                     "num_predict": 1,  
+                    # zelfde tier als de echte calls, anders laadt Ollama het model opnieuw
+                    "num_ctx": context_tiers.current,
                 },
             )
         await asyncio.wait_for(_warm_call(), timeout=max(settings.ollama_timeout_seconds, 60))
+        return True
 
     except Exception as e:
-        logger.warning("warmup failed: %s", e)
+        logger.warning("warmup failed (model=%s): %s", model, e)
+        return False
+
+
+def _flight_key(*, model: str, system_prompt: str, user_prompt: str, fmt: JsonFormat, options: Dict[str, Any]) -> str:
+    payload = json.dumps([model, system_prompt, user_prompt, fmt, options], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 async def ask_model_for_json(
-    client: ollama.AsyncClient,
+    client: InferenceBackend,
     *,
     system_prompt: str,
     user_prompt: str,
     temperature: float = 0.1,
     top_p: float = 0.9,
+    priority: Priority = "standard",
+    num_predict: Optional[int] = None,
+    endpoint: Optional[str] = None,
+    deadline: Optional[float] = None,
+    model: Optional[str] = None,
+    format: JsonFormat = "json",
+    on_late_result: Optional[Callable[[str], None]] = None,
 ) -> str:
+    """
+    format: "json" of een JSON-schema (structured output, als de backend dat kan).
+    on_late_result: krijgt de output als de aanvrager al weg was (timeout/deadline) maar
+    de gedeelde call daarna toch nog afwerkt, bv. om die alsnog te cachen.
+    """
+    model = model or settings.ai_model
+    user_prompt, limits = _budget_prompt(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        num_predict=num_predict,
+        log_name="ask_model_for_json",
+    )
+    options = {"temperature": temperature, "top_p": top_p, **limits}
+
+    async def _attempt() -> str:
+        async with llm_scheduler.slot(priority):
+            if not llm_flights.waiters(key):
+                # alle aanvragers waren al weg voor de call aan de beurt was
+                raise DeadlineExceeded()
+            # breaker pas na de slot: wachten in de wachtrij of op een gedeelde call is
+            # geen uitkomst van het model, en elke echte inference telt precies één keer
+            probe = llm_breaker.before_call()
+            try:
+                result = await asyncio.wait_for(
+                    _chat_to_completion(
+                        client,
+                        model=model,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt},
+                        ],
+                        format=format,
+                        options=options,
+                        log_name=endpoint or "ask_model_for_json",
+                    ),
+                    timeout=settings.ollama_timeout_seconds,
+                )
+            except asyncio.CancelledError:
+                if probe:
+                    llm_breaker.release_probe()
+                raise
+            except TimeoutError:
+                logger.warning("ask_model_for_json timeout after %ss", settings.ollama_timeout_seconds)
+                llm_breaker.record_failure(probe=probe)
+                raise
+            except Exception:
+                llm_breaker.record_failure(probe=probe)
+                raise
+            llm_breaker.record_success()
+            return result
+
     async def _call() -> str:
-        response = await client.chat(
-            model=settings.ai_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-            format="json",
-            options={"temperature": temperature, "top_p": top_p},
+        # batchwerk wordt niet gehedged; een hedge neemt alleen een vrije slot
+        return await llm_hedging.run(
+            endpoint if priority != "batch" else None,
+            _attempt,
+            can_hedge=llm_scheduler.has_free_slot,
         )
-        return (response.get("message") or {}).get("content", "") or ""
 
+    key = _flight_key(
+        model=model,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        fmt=format,
+        options=options,
+    )
+
+    timeout = call_timeout(deadline, settings.ollama_timeout_seconds)
+    llm_breaker.check()
     try:
-        return await asyncio.wait_for(_call(), timeout=settings.ollama_timeout_seconds)
+        # de call loopt na een timeout van de aanvrager door (begrensd door de eigen
+        # timeout in _attempt), zodat een retry erop kan aansluiten
+        return await llm_flights.do(key, _call, timeout=timeout, keep_on_timeout=True)
     except TimeoutError:
-        logger.warning("ask_model_for_json timeout after %ss", settings.ollama_timeout_seconds)
+        if on_late_result is not None:
+            llm_flights.when_done(key, on_late_result)
+        if timeout < settings.ollama_timeout_seconds:
+            raise DeadlineExceeded() from None
         raise
+
+
+async def stream_model_json(
+    client: InferenceBackend,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.1,
+    top_p: float = 0.9,
+    priority: Priority = "interactive",
+    num_predict: Optional[int] = None,
+    deadline: Optional[float] = None,
+    model: Optional[str] = None,
+    format: JsonFormat = "json",
+) -> AsyncIterator[str]:
+    """
+    Streamt de JSON-output van het model als tekststukjes. De slot blijft bezet tot de
+    stream klaar of gesloten is; sluiten breekt ook de HTTP-stream naar de backend af.
+    Een backend zonder streaming levert het volledige antwoord als één stuk.
+    """
+    if not capabilities_of(client).streaming:
+        yield await ask_model_for_json(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            top_p=top_p,
+            priority=priority,
+            num_predict=num_predict,
+            deadline=deadline,
+            model=model,
+            format=format,
+        )
+        return
+
+    user_prompt, limits = _budget_prompt(
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        num_predict=num_predict,
+        log_name="stream_model_json",
+    )
+
+    call_timeout(deadline, settings.ollama_timeout_seconds)
+    llm_breaker.check()
+    pieces = _stream_pieces(
+        client,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        options={"temperature": temperature, "top_p": top_p, **limits},
+        priority=priority,
+        deadline=deadline,
+        model=model or settings.ai_model,
+        format=format,
+    )
+    async with aclosing(pieces):
+        async for piece in pieces:
+            yield piece
+
+
+async def _stream_pieces(
+    client: InferenceBackend,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    options: Dict[str, Any],
+    priority: Priority,
+    deadline: Optional[float],
+    model: str,
+    format: JsonFormat,
+) -> AsyncIterator[str]:
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+
+    async with llm_scheduler.slot(priority):
+        # breaker pas na de slot, zoals in ask_model_for_json
+        probe = llm_breaker.before_call()
+        rounds = _stream_rounds(
+            client,
+            messages=messages,
+            options=options,
+            deadline=deadline,
+            model=model,
+            format=format,
+        )
+        try:
+            async with aclosing(rounds):
+                async for piece in rounds:
+                    yield piece
+        except (asyncio.CancelledError, GeneratorExit, DeadlineExceeded):
+            if probe:
+                llm_breaker.release_probe()
+            raise
+        except Exception:
+            llm_breaker.record_failure(probe=probe)
+            raise
+        llm_breaker.record_success()
+
+
+async def _stream_rounds(
+    client: InferenceBackend,
+    *,
+    messages: List[Dict[str, str]],
+    options: Dict[str, Any],
+    deadline: Optional[float],
+    model: str,
+    format: JsonFormat,
+) -> AsyncIterator[str]:
+    sent = ""
+    call_messages, call_options, call_format = messages, options, format
+    for round_no in range(settings.llm_max_continuations + 1):
+        if round_no:
+            # zie _chat_to_completion: vervolgstuk zonder format
+            follow_up = _continuation_request(messages, sent, options, "stream_model_json")
+            if follow_up is None:
+                break
+            logger.info("stream_model_json truncated (len=%d) -> continuation %d", len(sent), round_no)
+            call_messages, call_options = follow_up
+            call_format = None
+
+        stream = await client.chat(
+            model=model,
+            messages=call_messages,
+            format=call_format,
+            options=call_options,
+            stream=True,
+        )
+        done_reason = None
+        # begin van een vervolgstuk ophouden tot een eventuele herhaling weg te knippen is
+        head: Optional[str] = "" if round_no else None
+        try:
+            while True:
+                timeout = call_timeout(deadline, settings.ollama_timeout_seconds)
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    if timeout < settings.ollama_timeout_seconds:
+                        raise DeadlineExceeded() from None
+                    logger.warning("stream_model_json stalled for %ss", timeout)
+                    raise
+
+                done_reason = chunk.get("done_reason") or done_reason
+                piece = _content_of(chunk)
+                if head is not None:
+                    head += piece
+                    if len(head) < _OVERLAP_WINDOW:
+                        continue
+                    piece, head = _stitch(sent, head), None
+                if piece:
+                    sent += piece
+                    yield piece
+        finally:
+            close_fn = getattr(stream, "aclose", None)
+            if close_fn is not None:
+                await close_fn()
+
+        if head:
+            piece = _stitch(sent, head)
+            if piece:
+                sent += piece
+                yield piece
+        if done_reason != "length":
+            break
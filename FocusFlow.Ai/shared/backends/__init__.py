@@ -0,0 +1,52 @@
+from typing import Optional
+
+from shared.backends.base import BackendCapabilities, InferenceBackend
+from shared.backends.fake_backend import FakeBackend
+from shared.backends.pool import HostPool
+
+
+def create_backend(settings) -> InferenceBackend:
+    """
+    Backend volgens settings.llm_backend ("ollama" | "openai" | "fake").
+    Imports gebeuren pas hier, zodat een ontbrekend pakket alleen die backend raakt.
+    """
+    kind = (settings.llm_backend or "ollama").lower()
+
+    if kind == "ollama":
+        from shared.backends.ollama_backend import OllamaBackend
+
+        def _ollama(host: Optional[str]) -> OllamaBackend:
+            return OllamaBackend(
+                host=host,
+                max_connections=settings.ollama_max_connections_per_host,
+                max_keepalive=settings.ollama_max_keepalive_per_host,
+                keep_alive=settings.ollama_keep_alive,
+                keep_alive_per_model=settings.ollama_keep_alive_per_model,
+            )
+
+        hosts = list(dict.fromkeys(settings.ollama_hosts))
+        if len(hosts) <= 1:
+            return _ollama(hosts[0] if hosts else settings.ollama_host)
+        return HostPool(
+            {host: _ollama(host) for host in hosts},
+            eject_after_failures=settings.pool_eject_after_failures,
+            eject_seconds=settings.pool_eject_seconds,
+            timeout_seconds=settings.pool_host_timeout_seconds,
+        )
+
+    if kind == "openai":
+        from shared.backends.openai_backend import OpenAICompatibleBackend
+        return OpenAICompatibleBackend(
+            base_url=settings.openai_base_url,
+            api_key=settings.openai_api_key,
+            json_schema=settings.openai_json_schema,
+            timeout_seconds=max(settings.ollama_timeout_seconds, 60),
+        )
+
+    if kind == "fake":
+        return FakeBackend()
+
+    raise ValueError(f"Onbekende llm_backend: {settings.llm_backend!r}")
+
+
+__all__ = ["BackendCapabilities", "FakeBackend", "HostPool", "InferenceBackend", "create_backend"]
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Protocol, Union
+
+ChatResponse = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class BackendCapabilities:
+    json_schema: bool = False      # format mag een JSON-schema zijn i.p.v. "json"
+    streaming: bool = True
+    native_batching: bool = False  # server batcht parallelle requests zelf (continuous batching)
+    num_ctx: bool = False          # contextgrootte is per request instelbaar
+    residency: bool = False        # loaded_models() geeft de modellen die nu in geheugen zitten
+
+
+class InferenceBackend(Protocol):
+    """
+    Chat-interface in de vorm van ollama.AsyncClient.chat: antwoord is
+    {"message": {"content": ...}, "done_reason": ...}, met stream=True een async
+    iterator van zulke stukken.
+    """
+
+    name: str
+    capabilities: BackendCapabilities
+
+    async def chat(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        ...
+
+    async def aclose(self) -> None:
+        ...
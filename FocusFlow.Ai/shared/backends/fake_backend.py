@@ -0,0 +1,61 @@
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from shared.backends.base import BackendCapabilities, ChatResponse
+
+Responder = Callable[[List[Dict[str, str]]], Union[str, Dict[str, Any]]]
+
+
+class FakeBackend:
+    """
+    Lokale backend voor tests en ontwikkeling zonder model: antwoordt via responder
+    (of een vaste tekst) en houdt elke call bij. max_output_chars bootst num_predict na:
+    langere antwoorden worden afgekapt met done_reason "length".
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        responder: Union[Responder, str, None] = None,
+        *,
+        capabilities: Optional[BackendCapabilities] = None,
+        chunk_size: int = 8,
+        max_output_chars: Optional[int] = None,
+    ) -> None:
+        self._responder = responder if responder is not None else "{}"
+        self._chunk_size = max(1, chunk_size)
+        self._max_output_chars = max_output_chars
+        self.capabilities = capabilities or BackendCapabilities(json_schema=True, streaming=True)
+        self.calls: List[Dict[str, Any]] = []
+        self.closed = False
+
+    def _content(self, messages: List[Dict[str, str]]) -> str:
+        reply = self._responder(messages) if callable(self._responder) else self._responder
+        return reply if isinstance(reply, str) else json.dumps(reply, ensure_ascii=False)
+
+    async def chat(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        self.calls.append({"model": model, "messages": messages, "format": format, "options": options or {}, "stream": stream})
+        content = self._content(messages)
+        done_reason = "stop"
+        if self._max_output_chars is not None and len(content) > self._max_output_chars:
+            content, done_reason = content[:self._max_output_chars], "length"
+        if not stream:
+            return {"message": {"content": content}, "done_reason": done_reason}
+        return self._stream(content, done_reason)
+
+    async def _stream(self, content: str, done_reason: str) -> AsyncIterator[ChatResponse]:
+        for i in range(0, len(content), self._chunk_size):
+            yield {"message": {"content": content[i:i + self._chunk_size]}}
+        yield {"message": {"content": ""}, "done_reason": done_reason}
+
+    async def aclose(self) -> None:
+        self.closed = True
@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import ollama
+
+from shared.backends.base import BackendCapabilities, ChatResponse
+
+
+class OllamaBackend:
+    name = "ollama"
+    capabilities = BackendCapabilities(
+        json_schema=True,
+        streaming=True,
+        native_batching=False,
+        num_ctx=True,
+        residency=True,
+    )
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        *,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keep_alive: Optional[str] = None,
+        keep_alive_per_model: Optional[Dict[str, str]] = None,
+    ) -> None:
+        kwargs: Dict[str, Any] = {}
+        if max_connections or max_keepalive:
+            # extra kwargs gaan naar de onderliggende httpx.AsyncClient
+            import httpx
+            kwargs["limits"] = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+            )
+        self.host = host
+        self._keep_alive = keep_alive
+        self._keep_alive_per_model = dict(keep_alive_per_model or {})
+        self._client = ollama.AsyncClient(host=host, **kwargs) if host else ollama.AsyncClient(**kwargs)
+
+    async def chat(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        kwargs: Dict[str, Any] = {"model": model, "messages": messages, "options": options or {}}
+        if format is not None:
+            kwargs["format"] = format
+        keep_alive = self._keep_alive_per_model.get(model, self._keep_alive)
+        if keep_alive is not None:
+            kwargs["keep_alive"] = keep_alive
+        if stream:
+            kwargs["stream"] = True
+        return await self._client.chat(**kwargs)
+
+    async def loaded_models(self) -> List[str]:
+        response = await self._client.ps()
+        return [m.get("model") or m.get("name") for m in response.get("models") or []]
+
+    async def aclose(self) -> None:
+        close_fn = getattr(self._client, "aclose", None) or getattr(self._client, "close", None)
+        if close_fn is not None:
+            res = close_fn()
+            if asyncio.iscoroutine(res):
+                await res
@@ -0,0 +1,110 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+import httpx
+
+from shared.backends.base import BackendCapabilities, ChatResponse
+from shared.structured_output import strict_schema
+
+logger = logging.getLogger("focusflow.shared.backends.openai")
+
+# Ollama-opties -> OpenAI-velden; num_ctx ligt bij deze servers vast bij het opstarten
+_OPTION_FIELDS = {"temperature": "temperature", "top_p": "top_p", "num_predict": "max_tokens", "seed": "seed"}
+
+
+class OpenAICompatibleBackend:
+    """
+    Voor servers met een OpenAI-compatibele /v1/chat/completions (llama.cpp server,
+    vLLM, ...). Die batchen parallelle requests zelf, dus meer slots loont daar.
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        api_key: Optional[str] = None,
+        json_schema: bool = True,
+        timeout_seconds: float = 60,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=timeout_seconds,
+            transport=transport,
+        )
+        self.capabilities = BackendCapabilities(
+            json_schema=json_schema,
+            streaming=True,
+            native_batching=True,
+            num_ctx=False,
+        )
+
+    def _payload(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]],
+        options: Optional[Dict[str, Any]],
+        stream: bool,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {"model": model, "messages": messages, "stream": stream}
+        for key, field in _OPTION_FIELDS.items():
+            if options and options.get(key) is not None:
+                payload[field] = options[key]
+
+        if isinstance(format, dict) and self.capabilities.json_schema:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": strict_schema(format), "strict": True},
+            }
+        elif format is not None:
+            payload["response_format"] = {"type": "json_object"}
+        return payload
+
+    async def chat(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        payload = self._payload(model, messages, format, options, stream)
+        if stream:
+            return self._stream(payload)
+
+        response = await self._http.post("/chat/completions", json=payload)
+        response.raise_for_status()
+        choice = (response.json().get("choices") or [{}])[0]
+        return {
+            "message": {"content": (choice.get("message") or {}).get("content") or ""},
+            "done_reason": choice.get("finish_reason"),
+        }
+
+    async def _stream(self, payload: Dict[str, Any]) -> AsyncIterator[ChatResponse]:
+        async with self._http.stream("POST", "/chat/completions", json=payload) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    return
+                try:
+                    choice = (json.loads(data).get("choices") or [{}])[0]
+                except ValueError:
+                    logger.warning("invalid stream chunk: %s", data[:120])
+                    continue
+                yield {
+                    "message": {"content": (choice.get("delta") or {}).get("content") or ""},
+                    "done_reason": choice.get("finish_reason"),
+                }
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
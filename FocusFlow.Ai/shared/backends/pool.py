@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, replace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
+
+from shared.backends.base import BackendCapabilities, ChatResponse, InferenceBackend
+
+logger = logging.getLogger("focusflow.shared.backends.pool")
+
+
+@dataclass
+class _Host:
+    name: str
+    backend: InferenceBackend
+    in_flight: int = 0
+    ewma_latency: float = 1.0
+    requests: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False
+
+    def score(self) -> float:
+        # verwachte wachttijd als deze call erbij komt
+        return (self.in_flight + 1) * self.ewma_latency
+
+
+class HostPool:
+    """
+    Verdeelt calls over meerdere backends (bv. Ollama-hosts): elke call gaat naar de
+    gezonde host met de laagste (in-flight + 1) * recente latency. Na N opeenvolgende
+    fouten wordt een host een tijd uitgesloten; daarna mag één call hem terug testen.
+    Een call (of streamstuk) die langer dan timeout_seconds duurt telt als fout en als
+    latency-meting. Annulering van buitenaf (verloren hedge, client weg) is geen fout.
+    """
+
+    name = "pool"
+
+    def __init__(
+        self,
+        backends: Dict[str, InferenceBackend],
+        *,
+        eject_after_failures: int = 3,
+        eject_seconds: float = 30.0,
+        timeout_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not backends:
+            raise ValueError("HostPool heeft minstens één backend nodig")
+        self._hosts: List[_Host] = [_Host(name=n, backend=b) for n, b in backends.items()]
+        self._eject_after = max(1, eject_after_failures)
+        self._eject_seconds = eject_seconds
+        self._timeout = timeout_seconds
+        self._clock = clock
+        first = self._hosts[0].backend
+        # geen loaded_models() op de pool zelf: residency volgt elke host apart op (zie hosts())
+        caps = getattr(first, "capabilities", None) or BackendCapabilities()
+        self.capabilities: BackendCapabilities = replace(caps, residency=False)
+
+    def _pick(self) -> _Host:
+        now = self._clock()
+
+        # uitgesloten host waarvan de wachttijd voorbij is: één call mag hem testen
+        for host in self._hosts:
+            if host.consecutive_failures >= self._eject_after and host.ejected_until <= now and not host.probing:
+                host.probing = True
+                logger.info("probing host %s", host.name)
+                return host
+
+        healthy = [h for h in self._hosts if h.consecutive_failures < self._eject_after]
+        if healthy:
+            return min(healthy, key=_Host.score)
+
+        # niets gezond: liever de host die het eerst terugkomt dan falen
+        return min(self._hosts, key=lambda h: h.ejected_until)
+
+    def _on_success(self, host: _Host, elapsed: float) -> None:
+        if host.consecutive_failures >= self._eject_after:
+            logger.info("host %s back in rotation", host.name)
+        host.consecutive_failures = 0
+        host.probing = False
+        host.ejected_until = 0.0
+        host.ewma_latency = 0.8 * host.ewma_latency + 0.2 * elapsed if host.requests else elapsed
+        host.requests += 1
+
+    def _on_cancelled(self, host: _Host, elapsed: float) -> None:
+        # onvolledige meting: de call duurde minstens elapsed => EWMA enkel omhoog
+        host.probing = False
+        host.ewma_latency = max(host.ewma_latency, 0.8 * host.ewma_latency + 0.2 * elapsed)
+
+    def _on_timeout(self, host: _Host, elapsed: float) -> None:
+        logger.warning("host %s timed out after %.1fs", host.name, elapsed)
+        host.ewma_latency = 0.8 * host.ewma_latency + 0.2 * elapsed if host.requests else elapsed
+        self._on_failure(host)
+
+    def _on_failure(self, host: _Host) -> None:
+        host.failures += 1
+        host.consecutive_failures += 1
+        host.probing = False
+        if host.consecutive_failures >= self._eject_after:
+            host.ejected_until = self._clock() + self._eject_seconds
+            logger.warning(
+                "host %s ejected for %ss after %d failures",
+                host.name,
+                self._eject_seconds,
+                host.consecutive_failures,
+            )
+
+    async def chat(
+        self,
+        *,
+        model: str,
+        messages: List[Dict[str, str]],
+        format: Optional[Union[str, Dict[str, Any]]] = None,
+        options: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+    ) -> Union[ChatResponse, AsyncIterator[ChatResponse]]:
+        host = self._pick()
+        host.in_flight += 1
+        started = self._clock()
+        try:
+            result = await asyncio.wait_for(
+                host.backend.chat(
+                    model=model,
+                    messages=messages,
+                    format=format,
+                    options=options,
+                    stream=stream,
+                ),
+                timeout=self._timeout,
+            )
+        except asyncio.CancelledError:
+            host.in_flight -= 1
+            self._on_cancelled(host, self._clock() - started)
+            raise
+        except TimeoutError:
+            host.in_flight -= 1
+            self._on_timeout(host, self._clock() - started)
+            raise
+        except Exception:
+            host.in_flight -= 1
+            self._on_failure(host)
+            raise
+
+        if not stream:
+            host.in_flight -= 1
+            self._on_success(host, self._clock() - started)
+            return result
+        return self._tracked_stream(host, result, started)
+
+    async def _tracked_stream(
+        self,
+        host: _Host,
+        stream: AsyncIterator[ChatResponse],
+        started: float,
+    ) -> AsyncIterator[ChatResponse]:
+        # in-flight telt tot de stream klaar of gesloten is
+        ok = False
+        try:
+            while True:
+                chunk_started = self._clock()
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=self._timeout)
+                except StopAsyncIteration:
+                    break
+                except TimeoutError:
+                    self._on_timeout(host, self._clock() - chunk_started)
+                    raise
+                yield chunk
+            ok = True
+        except (asyncio.CancelledError, GeneratorExit):
+            self._on_cancelled(host, self._clock() - started)
+            raise
+        except TimeoutError:
+            raise
+        except Exception:
+            self._on_failure(host)
+            raise
+        finally:
+            host.in_flight -= 1
+            if ok:
+                self._on_success(host, self._clock() - started)
+            else:
+                host.probing = False
+            close_fn = getattr(stream, "aclose", None)
+            if close_fn is not None:
+                await close_fn()
+
+    def hosts(self) -> List[Tuple[str, InferenceBackend]]:
+        return [(h.name, h.backend) for h in self._hosts]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = self._clock()
+        return [
+            {
+                "host": h.name,
+                "inFlight": h.in_flight,
+                "ewmaLatencySeconds": round(h.ewma_latency, 3),
+                "requests": h.requests,
+                "failures": h.failures,
+                "healthy": h.ejected_until <= now and h.consecutive_failures < self._eject_after,
+                "ejectedForSeconds": max(0.0, round(h.ejected_until - now, 1)),
+            }
+            for h in self._hosts
+        ]
+
+    async def aclose(self) -> None:
+        for host in self._hosts:
+            try:
+                await host.backend.aclose()
+            except Exception as e:
+                logger.warning("error while closing host %s: %s", host.name, e)
+
@@ -0,0 +1,115 @@
+import logging
+import time
+from typing import Callable, Dict, Literal
+
+from config import settings
+
+logger = logging.getLogger("focusflow.shared.circuit_breaker")
+
+BreakerState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpen(Exception):
+    def __init__(self, retry_after_seconds: float) -> None:
+        super().__init__("Model tijdelijk niet beschikbaar")
+        self.retry_after_seconds = retry_after_seconds
+
+
+class CircuitBreaker:
+    """
+    Na failure_threshold opeenvolgende timeouts/fouten gaat de breaker open: calls falen
+    dan meteen (CircuitOpen) in plaats van telkens de volledige timeout te wachten.
+    Na reset_seconds mag één probe door (half-open); slaagt die, dan sluit de breaker.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = max(1, failure_threshold)
+        self._reset_seconds = reset_seconds
+        self._clock = clock
+        self._state: BreakerState = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._rejected = 0
+        self._opened = 0
+
+    @property
+    def state(self) -> BreakerState:
+        if self._state == "open" and self._clock() - self._opened_at >= self._reset_seconds:
+            return "half_open"
+        return self._state
+
+    def check(self) -> None:
+        # snelle weigering vóór de wachtrij; neemt geen probe (dat doet before_call)
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probing):
+            self._rejected += 1
+            raise CircuitOpen(self._retry_after())
+
+    def before_call(self) -> bool:
+        """
+        Vlak voor een echte inference. Geeft True terug als deze call de probe is; alleen
+        die call geeft de probe door aan record_failure of release_probe.
+        """
+        state = self.state
+        if state == "closed":
+            return False
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            logger.info("circuit half-open -> probe request")
+            return True
+        self._rejected += 1
+        raise CircuitOpen(self._retry_after())
+
+    def record_success(self) -> None:
+        if self._state != "closed":
+            logger.info("circuit closed (model reachable again)")
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._probing = False
+
+    def record_failure(self, *, probe: bool = False) -> None:
+        self._consecutive_failures += 1
+        if probe:
+            self._probing = False
+        if probe or (self._state == "closed" and self._consecutive_failures >= self._threshold):
+            self._state = "open"
+            self._opened_at = self._clock()
+            self._opened += 1
+            logger.warning(
+                "circuit open after %d failures -> degraded mode for %ss",
+                self._consecutive_failures,
+                self._reset_seconds,
+            )
+
+    def release_probe(self) -> None:
+        # probe afgebroken zonder uitkomst (bv. client weg): volgende call mag opnieuw proberen
+        self._probing = False
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._reset_seconds - (self._clock() - self._opened_at))
+
+    def reset(self) -> None:
+        self._state = "closed"
+        self._consecutive_failures = 0
+        self._probing = False
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self._consecutive_failures,
+            "opened": self._opened,
+            "rejected": self._rejected,
+        }
+
+
+llm_breaker = CircuitBreaker(
+    failure_threshold=settings.breaker_failure_threshold,
+    reset_seconds=settings.breaker_reset_seconds,
+)
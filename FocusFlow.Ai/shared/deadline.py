@@ -0,0 +1,47 @@
+import time
+from typing import Optional
+
+from fastapi import Request
+
+DEADLINE_HEADER = "X-Deadline-Ms"
+
+
+class DeadlineExceeded(TimeoutError):
+    """Het tijdsbudget van de aanvrager is op (geen modelfout)."""
+
+
+def deadline_after_ms(budget_ms: Optional[int]) -> Optional[float]:
+    if budget_ms is None or budget_ms <= 0:
+        return None
+    return time.monotonic() + budget_ms / 1000.0
+
+
+def request_deadline(request: Request, budget_ms: Optional[int] = None) -> Optional[float]:
+    """
+    Absolute deadline (time.monotonic) uit het body-veld deadlineMs of de header
+    X-Deadline-Ms; het veld wint. Geen of ongeldige waarde => geen deadline.
+    """
+    if budget_ms is None:
+        raw = request.headers.get(DEADLINE_HEADER)
+        if raw:
+            try:
+                budget_ms = int(raw)
+            except ValueError:
+                budget_ms = None
+    return deadline_after_ms(budget_ms)
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def call_timeout(deadline: Optional[float], default: float) -> float:
+    # timeout voor één call: de globale timeout, ingekort tot wat er van het budget rest
+    left = time_left(deadline)
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded()
+    return min(default, left)
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from config import settings
+
+logger = logging.getLogger("focusflow.shared.hedging")
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """
+    Houdt per endpoint een venster van recente latencies bij. Is een call na de
+    geobserveerde p90 nog niet klaar, dan start een tweede poging (andere host/slot);
+    de eerste die klaar is wint, de andere wordt geannuleerd. Een budget (fractie van
+    alle calls) voorkomt dat hedging de gemiddelde load verdubbelt.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        percentile: float = 0.9,
+        min_samples: int = 20,
+        window: int = 200,
+        max_ratio: float = 0.1,
+    ) -> None:
+        self.enabled = enabled
+        self._percentile = percentile
+        self._min_samples = max(1, min_samples)
+        self._window = window
+        self._max_ratio = max_ratio
+        self._samples: Dict[str, Deque[float]] = {}
+        self._calls = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def delay_for(self, endpoint: str) -> Optional[float]:
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < self._min_samples:
+            return None
+        ordered = sorted(samples)
+        idx = min(len(ordered) - 1, math.ceil(self._percentile * len(ordered)) - 1)
+        return ordered[idx]
+
+    def _may_hedge(self) -> bool:
+        return self._hedged < self._max_ratio * self._calls
+
+    async def run(
+        self,
+        endpoint: Optional[str],
+        attempt: Callable[[], Awaitable[T]],
+        *,
+        can_hedge: Callable[[], bool] = lambda: True,
+    ) -> T:
+        loop = asyncio.get_running_loop()
+        self._calls += 1
+        delay = self.delay_for(endpoint) if self.enabled and endpoint else None
+
+        started = loop.time()
+        primary = asyncio.ensure_future(attempt())
+        tasks = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self._may_hedge() and can_hedge():
+                    self._hedged += 1
+                    logger.info("hedging %s after %.2fs", endpoint, delay)
+                    tasks.append(asyncio.ensure_future(attempt()))
+
+            winner = await self._first_success(tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if winner is not primary:
+            self._hedge_wins += 1
+        if endpoint:
+            self.record(endpoint, loop.time() - started)
+        return winner.result()
+
+    @staticmethod
+    async def _first_success(tasks) -> "asyncio.Future[T]":
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is None:
+                    return task
+                error = error or task.exception()
+        raise error or asyncio.CancelledError()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "calls": self._calls,
+            "hedged": self._hedged,
+            "hedgeWins": self._hedge_wins,
+            "p90Seconds": {
+                endpoint: round(delay, 3)
+                for endpoint in self._samples
+                if (delay := self.delay_for(endpoint)) is not None
+            },
+        }
+
+
+llm_hedging = HedgePolicy(
+    enabled=settings.hedge_enabled,
+    percentile=settings.hedge_percentile,
+    min_samples=settings.hedge_min_samples,
+    max_ratio=settings.hedge_max_ratio,
+)
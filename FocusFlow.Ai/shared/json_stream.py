@@ -0,0 +1,228 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class StringFieldStreamer:
+    """
+    Volgt een gestreamd JSON-object en geeft de gedecodeerde tekst van gekozen
+    top-level stringvelden terug zodra die binnenkomt (bv. "body" of "reply").
+    """
+
+    def __init__(self, fields: Iterable[str]) -> None:
+        self._fields = set(fields)
+        self._depth = 0
+        self._in_string = False
+        self._escape: Optional[str] = None
+        self._pending_high: Optional[int] = None
+        self._expect_key = False
+        self._key_buf: List[str] = []
+        self._last_key: Optional[str] = None
+        self._string_role: Optional[str] = None  # "key" | "value" | "stream" | None
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        out: List[Tuple[str, str]] = []
+        emitted: List[str] = []
+
+        for ch in chunk:
+            if self._in_string:
+                decoded = self._consume_string_char(ch)
+                if decoded is None:
+                    continue
+                if decoded is _END:
+                    if self._string_role == "stream" and emitted:
+                        out.append((self._last_key, "".join(emitted)))
+                        emitted = []
+                    self._end_string()
+                    continue
+                if self._string_role == "stream":
+                    emitted.append(decoded)
+                elif self._string_role == "key":
+                    self._key_buf.append(decoded)
+                continue
+
+            if ch == '"':
+                self._start_string()
+            elif ch in "{[":
+                self._depth += 1
+                self._expect_key = ch == "{" and self._depth == 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif ch == "," and self._depth == 1:
+                self._expect_key = True
+            elif ch == ":" and self._depth == 1:
+                self._expect_key = False
+
+        if emitted:
+            out.append((self._last_key, "".join(emitted)))
+        return out
+
+    def _start_string(self) -> None:
+        self._in_string = True
+        if self._depth != 1:
+            self._string_role = None
+        elif self._expect_key:
+            self._string_role = "key"
+            self._key_buf = []
+        elif self._last_key in self._fields:
+            self._string_role = "stream"
+        else:
+            self._string_role = "value"
+
+    def _end_string(self) -> None:
+        if self._string_role == "key":
+            self._last_key = "".join(self._key_buf)
+        self._in_string = False
+        self._string_role = None
+
+    def _consume_string_char(self, ch: str):
+        if self._escape is not None:
+            if self._escape == "":
+                if ch == "u":
+                    self._escape = "u"
+                    return None
+                self._escape = None
+                return _SIMPLE_ESCAPES.get(ch, ch)
+
+            self._escape += ch
+            if len(self._escape) < 5:
+                return None
+            code = int(self._escape[1:], 16) if _is_hex(self._escape[1:]) else 0xFFFD
+            self._escape = None
+            return self._decode_code_unit(code)
+
+        if ch == "\\":
+            self._escape = ""
+            return None
+        if ch == '"':
+            return _END
+        return ch
+
+    def _decode_code_unit(self, code: int) -> Optional[str]:
+        if 0xD800 <= code <= 0xDBFF:
+            self._pending_high = code
+            return None
+        if 0xDC00 <= code <= 0xDFFF and self._pending_high is not None:
+            high, self._pending_high = self._pending_high, None
+            return chr(0x10000 + ((high - 0xD800) << 10) + (code - 0xDC00))
+        self._pending_high = None
+        return chr(code)
+
+
+_END = object()
+
+
+def _is_hex(text: str) -> bool:
+    return all(c in "0123456789abcdefABCDEF" for c in text)
+
+
+class IncrementalJsonParser:
+    """
+    Incrementele parser voor een gestreamd JSON-object: geeft elk top-level veld terug
+    (key, value) zodra de waarde volledig binnen is, zonder op de rest te wachten.
+    """
+
+    def __init__(self) -> None:
+        self._buf: List[str] = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._value_kind: Optional[str] = None  # "string" | "container" | "scalar"
+        self.fields: Dict[str, Any] = {}
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buf)
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        out: List[Tuple[str, Any]] = []
+
+        for ch in chunk:
+            i = self._pos
+            self._pos += 1
+            self._buf.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._on_string_end(i, out)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._expect_key:
+                        self._key_start = i
+                    elif self._value_start is None and self._key is not None:
+                        self._value_start = i
+                        self._value_kind = "string"
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+                elif self._depth == 2 and self._value_start is None and self._key is not None:
+                    self._value_start = i
+                    self._value_kind = "container"
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_kind == "container":
+                    self._complete(i + 1, out)
+                elif self._depth == 0 and self._value_kind == "scalar":
+                    self._complete(i, out)
+            elif self._depth == 1:
+                if ch == ",":
+                    if self._value_kind == "scalar":
+                        self._complete(i, out)
+                    self._expect_key = True
+                elif ch == ":":
+                    self._expect_key = False
+                elif not ch.isspace() and self._value_start is None and self._key is not None:
+                    self._value_start = i
+                    self._value_kind = "scalar"
+
+        return out
+
+    def _on_string_end(self, i: int, out: List[Tuple[str, Any]]) -> None:
+        if self._depth != 1:
+            return
+        if self._expect_key and self._key_start is not None:
+            try:
+                self._key = json.loads(self.text[self._key_start:i + 1])
+            except ValueError:
+                self._key = None
+            self._key_start = None
+        elif self._value_kind == "string":
+            self._complete(i + 1, out)
+
+    def _complete(self, end: int, out: List[Tuple[str, Any]]) -> None:
+        key, start = self._key, self._value_start
+        self._key = None
+        self._value_start = None
+        self._value_kind = None
+        if key is None or start is None:
+            return
+        try:
+            value = json.loads(self.text[start:end])
+        except ValueError:
+            return
+        self.fields[key] = value
+        out.append((key, value))
@@ -1,6 +1,7 @@
 import json
 import re
-from typing import Any, Dict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
 
 
 _FENCE_RX = re.compile(r"^```json\s*|\s*```$", flags=re.IGNORECASE)
@@ -31,3 +32,186 @@ def parse_json_object(text: str) -> Dict[str, Any]:
         raise ValueError("Modelantwoord is JSON maar geen object")
     return obj
 
+
+@dataclass(frozen=True)
+class RepairedJson:
+    data: Dict[str, Any]
+    complete: Tuple[str, ...]  # top-level velden die volledig binnen waren
+    partial: Tuple[str, ...]   # afgekapt maar bruikbaar (tekst tot de knip, afgewerkte lijstitems)
+
+
+_LITERAL_RX = re.compile(r"-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null")
+_LITERALS = {"true": True, "false": False, "null": None}
+_DELIMITERS = ",}] \t\r\n"
+
+
+_MISSING = object()
+
+
+class _Truncated(Exception):
+    # salvaged: wat er van de afgebroken waarde bruikbaar is (of _MISSING)
+    salvaged: Any = _MISSING
+
+
+class _TolerantParser:
+    """
+    Recursive-descent parser die afgekapte output en slordigheden verdraagt: trailing
+    of dubbele komma's worden overgeslagen, een afgebroken string/lijst/object wordt
+    gesloten. Binnen lijsten valt een onvolledig item weg; op top-level blijft een
+    afgekapte string of lijst staan (als partial gemeld).
+    """
+
+    def __init__(self, text: str) -> None:
+        self.s = text
+        self.i = 0
+        self.complete: List[str] = []
+        self.partial: List[str] = []
+
+    def _ws(self) -> None:
+        while self.i < len(self.s) and self.s[self.i] in " \t\r\n":
+            self.i += 1
+        if self.i >= len(self.s):
+            raise _Truncated()
+
+    def parse_top(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        self.i = self.s.index("{") + 1
+        try:
+            while True:
+                self._ws()
+                ch = self.s[self.i]
+                if ch == "}":
+                    return out
+                if ch == ",":
+                    self.i += 1
+                    continue
+                key = self._key()
+                try:
+                    value = self._value()
+                except _Truncated as cut:
+                    if cut.salvaged is not _MISSING:
+                        out[key] = cut.salvaged
+                        self.partial.append(key)
+                    raise
+                out[key] = value
+                self.complete.append(key)
+        except (_Truncated, ValueError, json.JSONDecodeError):
+            # alles vóór de knip of de onleesbare plek blijft
+            return out
+
+    def _key(self) -> str:
+        if self.s[self.i] != '"':
+            # ongequote key: tot aan de dubbele punt
+            end = self.s.find(":", self.i)
+            if end == -1:
+                raise _Truncated()
+            key = self.s[self.i:end].strip().strip("'")
+            self.i = end + 1
+            return key
+        key = self._string()
+        self._ws()
+        if self.s[self.i] != ":":
+            raise ValueError(f"':' verwacht op positie {self.i}")
+        self.i += 1
+        return key
+
+    def _value(self) -> Any:
+        self._ws()
+        ch = self.s[self.i]
+        if ch == "{":
+            return self._object()
+        if ch == "[":
+            return self._array()
+        if ch == '"':
+            return self._string()
+        m = _LITERAL_RX.match(self.s, self.i)
+        end = m.end() if m else self.i
+        if m is None or end >= len(self.s) or self.s[end] not in _DELIMITERS:
+            # afgekapt literal (bv. "tru", "0.") loopt tot het einde van de tekst
+            if not any(c in _DELIMITERS for c in self.s[self.i:]):
+                raise _Truncated()
+            raise ValueError(f"onverwacht teken {ch!r} op positie {self.i}")
+        self.i = end
+        token = m.group()
+        if token in _LITERALS:
+            return _LITERALS[token]
+        return float(token) if any(c in token for c in ".eE") else int(token)
+
+    def _object(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        self.i += 1
+        try:
+            while True:
+                self._ws()
+                ch = self.s[self.i]
+                if ch == "}":
+                    self.i += 1
+                    return out
+                if ch == ",":
+                    self.i += 1
+                    continue
+                key = self._key()
+                out[key] = self._value()
+        except _Truncated as cut:
+            # een half object is niet te vertrouwen (ontbrekende verplichte velden)
+            cut.salvaged = _MISSING
+            raise
+
+    def _array(self) -> List[Any]:
+        out: List[Any] = []
+        self.i += 1
+        try:
+            while True:
+                self._ws()
+                ch = self.s[self.i]
+                if ch == "]":
+                    self.i += 1
+                    return out
+                if ch == ",":
+                    self.i += 1
+                    continue
+                out.append(self._value())
+        except _Truncated as cut:
+            # afgewerkte items blijven bruikbaar, het afgebroken item valt weg
+            cut.salvaged = out
+            raise
+
+    def _string(self) -> str:
+        start = self.i + 1
+        j = start
+        while j < len(self.s):
+            ch = self.s[j]
+            if ch == "\\":
+                j += 2
+                continue
+            if ch == '"':
+                self.i = j + 1
+                return json.loads(self.s[start - 1:self.i])
+            j += 1
+
+        # afgekapt midden in een string: sluit af (zonder half escape-teken)
+        body = self.s[start:]
+        if (len(body) - len(body.rstrip("\\"))) % 2:
+            body = body[:-1]
+        cut = _Truncated()
+        try:
+            cut.salvaged = json.loads(f'"{body}"')
+        except json.JSONDecodeError:
+            cut.salvaged = _MISSING
+        raise cut
+
+
+def repair_json_object(text: str) -> Optional[RepairedJson]:
+    """
+    Redt wat bruikbaar is uit kapotte of afgekapte modeloutput (bv. gestopt door
+    num_predict). None als er geen enkel veld te redden valt.
+    """
+    cleaned = strip_json_fences(text)
+    if "{" not in cleaned:
+        return None
+
+    parser = _TolerantParser(cleaned)
+    data = parser.parse_top()
+    if not data:
+        return None
+    return RepairedJson(data=data, complete=tuple(parser.complete), partial=tuple(parser.partial))
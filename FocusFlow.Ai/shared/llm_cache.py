@@ -0,0 +1,230 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger("focusflow.shared.llm_cache")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+def make_cache_key(
+    *,
+    model: str,
+    prompt_version: str,
+    system_prompt: str,
+    user_prompt: str,
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    payload = json.dumps(
+        [model, prompt_version, system_prompt, user_prompt, params or {}],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _SqliteTier:
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " payload TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, float]]:
+        row = self._conn.execute(
+            "SELECT payload, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            return None
+        self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+        return row[0], row[1]
+
+    def set(self, key: str, payload: str, size: int, expires_at: float, now: float) -> int:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, payload, size, expires_at, last_used) VALUES (?, ?, ?, ?, ?)",
+            (key, payload, size, expires_at, now),
+        )
+        return self._evict(now)
+
+    def _evict(self, now: float) -> int:
+        evicted = self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,)).rowcount or 0
+        total = self.total_bytes()
+        if total <= self._max_bytes:
+            return evicted
+
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_used ASC").fetchall():
+            if total <= self._max_bytes:
+                break
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        return evicted
+
+    def total_bytes(self) -> int:
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return int(row[0] or 0)
+
+    def count(self) -> int:
+        return int(self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0])
+
+    def clear(self) -> int:
+        return self._conn.execute("DELETE FROM llm_cache").rowcount or 0
+
+
+class LlmResultCache:
+    """
+    Tiered cache voor geparste LLM-resultaten: in-process LRU (met TTL en byte-limiet),
+    optioneel aangevuld met een SQLite-tier op schijf.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool,
+        ttl_seconds: int,
+        max_bytes: int,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_bytes: int = 0,
+    ) -> None:
+        self.enabled = enabled
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+        self._disk: Optional[_SqliteTier] = None
+        if enabled and sqlite_path:
+            try:
+                self._disk = _SqliteTier(sqlite_path, sqlite_max_bytes)
+            except Exception:
+                logger.warning("sqlite cache tier unavailable (%s)", sqlite_path, exc_info=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, size, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats.hits += 1
+                    return json.loads(payload)
+                self._drop(key)
+                self._stats.expirations += 1
+
+            if self._disk is not None:
+                row = self._disk.get(key, now)
+                if row is not None:
+                    payload, expires_at = row
+                    self._put_memory(key, payload, expires_at)
+                    self._stats.disk_hits += 1
+                    return json.loads(payload)
+
+            self._stats.misses += 1
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+
+        payload = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        now = time.time()
+        expires_at = now + self._ttl
+        with self._lock:
+            self._put_memory(key, payload, expires_at)
+            self._stats.stores += 1
+            if self._disk is not None:
+                self._stats.evictions += self._disk.set(key, payload, _entry_size(key, payload), expires_at, now)
+
+    def clear(self) -> Dict[str, int]:
+        with self._lock:
+            memory_entries = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            disk_entries = self._disk.clear() if self._disk is not None else 0
+        return {"memoryEntries": memory_entries, "diskEntries": disk_entries}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            out: Dict[str, Any] = {
+                "enabled": self.enabled,
+                "ttlSeconds": self._ttl,
+                "memoryEntries": len(self._entries),
+                "memoryBytes": self._bytes,
+                "memoryMaxBytes": self._max_bytes,
+                "disk": None,
+                "hits": self._stats.hits,
+                "diskHits": self._stats.disk_hits,
+                "misses": self._stats.misses,
+                "stores": self._stats.stores,
+                "evictions": self._stats.evictions,
+                "expirations": self._stats.expirations,
+            }
+            if self._disk is not None:
+                out["disk"] = {"entries": self._disk.count(), "bytes": self._disk.total_bytes()}
+        return out
+
+    def _put_memory(self, key: str, payload: str, expires_at: float) -> None:
+        size = _entry_size(key, payload)
+        if size > self._max_bytes:
+            return
+
+        if key in self._entries:
+            self._drop(key)
+
+        self._entries[key] = (payload, size, expires_at)
+        self._bytes += size
+
+        while self._bytes > self._max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+def _entry_size(key: str, payload: str) -> int:
+    return len(key) + len(payload.encode("utf-8"))
+
+
+llm_cache = LlmResultCache(
+    enabled=settings.llm_cache_enabled,
+    ttl_seconds=settings.llm_cache_ttl_seconds,
+    max_bytes=settings.llm_cache_max_bytes,
+    sqlite_path=settings.llm_cache_sqlite_path,
+    sqlite_max_bytes=settings.llm_cache_sqlite_max_bytes,
+)
@@ -1,14 +1,26 @@
 import asyncio
 import logging
-from typing import Any, Dict, Optional, Tuple, Literal
+from contextlib import aclosing
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple, Literal
 
 from config import settings
-from shared.ai_client import ask_model_for_json
-from shared.json_tools import parse_json_object
+from shared.ai_client import JsonFormat, ask_model_for_json, capabilities_of, stream_model_json
+from shared.circuit_breaker import CircuitOpen
+from shared.deadline import DeadlineExceeded
+from shared.json_stream import IncrementalJsonParser, StringFieldStreamer
+from shared.json_tools import RepairedJson, parse_json_object, repair_json_object
+from shared.llm_cache import llm_cache, make_cache_key
+from shared.model_router import model_router
+from shared.scheduler import Priority, SchedulerOverloaded
+from shared.structured_output import JsonContract
 
 logger = logging.getLogger("focusflow.shared.llm_json")
 
-LlmStatus = Literal["ok", "timeout", "invalid_json", "error"]
+# "unavailable": circuit breaker open, er is geen call gedaan
+# "deadline": tijdsbudget van de aanvrager op (zie shared.deadline)
+# "repaired": kapotte/afgekapte JSON, data bevat de geredde velden (zie json_tools.repair_json_object)
+LlmStatus = Literal["ok", "timeout", "invalid_json", "error", "unavailable", "deadline", "repaired"]
 
 
 def _preview(text: str, max_len: int = 260) -> str:
@@ -17,6 +29,96 @@ def _preview(text: str, max_len: int = 260) -> str:
     return t[:max_len]
 
 
+def _cache_key(system_prompt: str, user_prompt: str, model: Optional[str] = None) -> str:
+    return make_cache_key(
+        model=model or settings.ai_model,
+        prompt_version=settings.prompt_version,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        params={"format": "json"},
+    )
+
+
+def _salvage(raw: str, log_name: str, contract: Optional[JsonContract]) -> Optional[RepairedJson]:
+    repaired = repair_json_object(raw)
+    if repaired is None:
+        return None
+    name = contract.full_name if contract is not None else (lambda key: key)
+    logger.warning(
+        "%s returned malformed JSON, salvaged fields=%s partial=%s",
+        log_name,
+        ",".join(name(k) for k in repaired.complete) or "-",
+        ",".join(name(k) for k in repaired.partial) or "-",
+    )
+    return repaired
+
+
+def _structured(client: Any, system_prompt: str, contract: Optional[JsonContract]) -> Tuple[str, JsonFormat, Optional[JsonContract]]:
+    """
+    Met een contract en een backend die JSON-schema's aankan: schema als format en een
+    uitleg van de korte keys achteraan de system prompt. Anders gewoon format="json".
+    """
+    if contract is None or not settings.llm_structured_output or not capabilities_of(client).json_schema:
+        return system_prompt, "json", None
+    return f"{system_prompt}\n\n{contract.prompt_hint()}", contract.schema(), contract
+
+
+async def _ask_json_object(
+    client: Any,
+    *,
+    system_prompt: str,
+    user_prompt: str,
+    log_name: str,
+    priority: Priority,
+    num_predict: Optional[int],
+    deadline: Optional[float],
+    model: str,
+    fmt: JsonFormat,
+    contract: Optional[JsonContract],
+    on_late_result: Optional[Callable[[str], None]] = None,
+) -> Tuple[Optional[Dict[str, Any]], Optional[RepairedJson]]:
+    """
+    Geeft (data, salvage): data als de output strikt parst, anders de geredde velden
+    (zie run_llm_json voor wat daarmee gebeurt). Pas als er niets te redden valt volgt
+    een nieuwe poging op hetzelfde model.
+    """
+    temperature = 0.1
+    for attempt in range(1 + max(0, settings.json_retry_attempts)):
+        if attempt:
+            # opnieuw, maar deterministischer: meestal was het een slordige sampling
+            temperature = min(temperature, settings.json_retry_temperature)
+            logger.info(
+                "%s retrying for valid JSON (attempt=%d temperature=%s)",
+                log_name,
+                attempt + 1,
+                temperature,
+            )
+
+        raw = await ask_model_for_json(
+            client,
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            temperature=temperature,
+            priority=priority,
+            num_predict=num_predict,
+            endpoint=log_name,
+            deadline=deadline,
+            model=model,
+            format=fmt,
+            on_late_result=on_late_result,
+        )
+
+        try:
+            return parse_json_object(raw), None
+        except Exception:
+            repaired = _salvage(raw, log_name, contract)
+            if repaired is not None:
+                return None, repaired
+            logger.warning("%s returned invalid JSON", log_name, exc_info=True)
+
+    return None, None
+
+
 async def run_llm_json(
     *,
     client: Any,
@@ -24,32 +126,108 @@ async def run_llm_json(
     user_prompt: str,
     log_name: str,
     preview: bool = False,
+    cache: bool = False,
+    priority: Priority = "standard",
+    num_predict: Optional[int] = None,
+    deadline: Optional[float] = None,
+    model: Optional[str] = None,
+    contract: Optional[JsonContract] = None,
 ) -> Tuple[Optional[Dict[str, Any]], LlmStatus]:
+    """
+    model: gekozen via shared.model_router (None = settings.ai_model). Blijft de JSON van
+    het kleine model ongeldig, dan volgt één poging op het grote model.
+    contract: outputcontract van de feature; data komt altijd terug met de volledige veldnamen.
+    Status "repaired": onvolledige data uit kapotte JSON; wordt niet gecachet.
 
+    Volgorde bij output die niet strikt parst:
+    1. kan het kleine model escaleren, dan eerst het grote model (ook als er iets te
+       redden viel: het kleine model is net gekozen omdat het goedkoop is, niet omdat
+       het betrouwbaar is);
+    2. anders de geredde velden, zonder nieuwe generatie;
+    3. een nieuwe poging met lagere temperature alleen als er niets te redden viel.
+    De geredde output van het kleine model blijft reserve als het grote niets beter geeft.
+    """
+    model = model or settings.ai_model
+    system_prompt, fmt, contract = _structured(client, system_prompt, contract)
 
     if preview:
         logger.info("%s system preview: %s", log_name, _preview(system_prompt))
         logger.info("%s user preview: %s", log_name, _preview(user_prompt))
 
-    try:
-        raw = await ask_model_for_json(
-            client,
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-        )
+    cache_key: Optional[str] = None
+    if cache and llm_cache.enabled:
+        cache_key = _cache_key(system_prompt, user_prompt, model)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("%s served from cache", log_name)
+            return cached, "ok"
 
+    def _cache_late(raw: str) -> None:
+        # aanvrager was al weg (deadline), de call werkte toch af: een retry vindt het in de cache
         try:
             data = parse_json_object(raw)
         except Exception:
-            logger.warning("%s returned invalid JSON", log_name, exc_info=True)
-            return None, "invalid_json"
+            return
+        llm_cache.set(cache_key, contract.expand(data) if contract is not None else data)
+        logger.info("%s late result cached", log_name)
+
+    try:
+        async def _ask(with_model: str) -> Tuple[Optional[Dict[str, Any]], Optional[RepairedJson]]:
+            return await _ask_json_object(
+                client,
+                system_prompt=system_prompt,
+                user_prompt=user_prompt,
+                log_name=log_name,
+                priority=priority,
+                num_predict=num_predict,
+                deadline=deadline,
+                model=with_model,
+                fmt=fmt,
+                contract=contract,
+                on_late_result=_cache_late if cache_key is not None else None,
+            )
 
-        if not isinstance(data, dict):
-            logger.warning("%s returned non-object JSON", log_name)
+        data, salvage = await _ask(model)
+        if data is None:
+            larger = model_router.escalation_for(model, endpoint=log_name, reason="invalid_json")
+            if larger is not None:
+                try:
+                    data, larger_salvage = await _ask(larger)
+                except (CircuitOpen, DeadlineExceeded):
+                    if salvage is None:
+                        raise
+                    logger.info("%s escalation stopped -> salvaged output of %s", log_name, model)
+                else:
+                    salvage = larger_salvage or salvage
+
+        repaired = data is None and salvage is not None
+        if repaired:
+            data = salvage.data
+        if data is None:
             return None, "invalid_json"
 
+        if contract is not None:
+            data = contract.expand(data)
+
+        if repaired:
+            return data, "repaired"
+
+        if cache_key is not None:
+            llm_cache.set(cache_key, data)
+
         return data, "ok"
 
+    except SchedulerOverloaded:
+        raise
+
+    except CircuitOpen:
+        logger.info("%s skipped: circuit open", log_name)
+        return None, "unavailable"
+
+    except DeadlineExceeded:
+        logger.info("%s stopped: caller deadline reached", log_name)
+        return None, "deadline"
+
     except asyncio.TimeoutError:
         logger.warning(
             "%s timeout after %ss",
@@ -62,3 +240,121 @@ async def run_llm_json(
     except Exception:
         logger.exception("%s failed", log_name)
         return None, "error"
+
+
+@dataclass(frozen=True)
+class LlmStreamEvent:
+    """
+    Tussentijds event: field + text (stuk van een gestreamd stringveld)
+    of field + value (volledig afgewerkt top-level veld, bij emit_fields=True).
+    Laatste event: status (+ data als status "ok" of "repaired").
+    """
+    field: Optional[str] = None
+    text: str = ""
+    value: Any = None
+    data: Optional[Dict[str, Any]] = None
+    status: Optional[LlmStatus] = None
+
+
+async def stream_llm_json(
+    *,
+    client: Any,
+    system_prompt: str,
+    user_prompt: str,
+    log_name: str,
+    stream_fields: Iterable[str] = (),
+    emit_fields: bool = False,
+    cache: bool = False,
+    priority: Priority = "interactive",
+    num_predict: Optional[int] = None,
+    deadline: Optional[float] = None,
+    model: Optional[str] = None,
+    contract: Optional[JsonContract] = None,
+) -> AsyncIterator[LlmStreamEvent]:
+    system_prompt, fmt, contract = _structured(client, system_prompt, contract)
+
+    cache_key: Optional[str] = None
+    if cache and llm_cache.enabled:
+        cache_key = _cache_key(system_prompt, user_prompt, model)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            logger.info("%s served from cache", log_name)
+            yield LlmStreamEvent(data=cached, status="ok")
+            return
+
+    # het model schrijft korte keys; events gaan naar buiten met de volledige namen
+    stream_fields = list(stream_fields)
+    full_name = (lambda key: key)
+    if contract is not None:
+        full_name = contract.full_name
+        stream_fields += [contract.compact_name(f) for f in stream_fields]
+    streamer = StringFieldStreamer(stream_fields)
+    fields_parser = IncrementalJsonParser() if emit_fields else None
+    parts = []
+    status: LlmStatus = "ok"
+
+    pieces = stream_model_json(
+        client,
+        system_prompt=system_prompt,
+        user_prompt=user_prompt,
+        priority=priority,
+        num_predict=num_predict,
+        deadline=deadline,
+        model=model,
+        format=fmt,
+    )
+    try:
+        # aclosing: stopt de consument vroeg, dan wordt ook de stream naar het model gesloten
+        async with aclosing(pieces):
+            async for piece in pieces:
+                parts.append(piece)
+                for field, text in streamer.feed(piece):
+                    yield LlmStreamEvent(field=full_name(field), text=text)
+                if fields_parser is not None:
+                    for field, value in fields_parser.feed(piece):
+                        if contract is not None:
+                            value = contract.expand_value(field, value)
+                        yield LlmStreamEvent(field=full_name(field), value=value)
+
+    except SchedulerOverloaded:
+        raise
+
+    except CircuitOpen:
+        logger.info("%s stream skipped: circuit open", log_name)
+        status = "unavailable"
+
+    except DeadlineExceeded:
+        logger.info("%s stream stopped: caller deadline reached", log_name)
+        status = "deadline"
+
+    except asyncio.TimeoutError:
+        logger.warning("%s stream timeout after %ss", log_name, settings.ollama_timeout_seconds)
+        status = "timeout"
+
+    except Exception:
+        logger.exception("%s stream failed", log_name)
+        status = "error"
+
+    if status != "ok":
+        yield LlmStreamEvent(status=status)
+        return
+
+    raw = "".join(parts)
+    try:
+        data = parse_json_object(raw)
+    except Exception:
+        repaired = _salvage(raw, log_name, contract)
+        if repaired is None:
+            logger.warning("%s stream returned invalid JSON", log_name, exc_info=True)
+            yield LlmStreamEvent(status="invalid_json")
+            return
+        data = repaired.data
+        status = "repaired"
+
+    if contract is not None:
+        data = contract.expand(data)
+
+    if cache_key is not None and status == "ok":
+        llm_cache.set(cache_key, data)
+
+    yield LlmStreamEvent(data=data, status=status)
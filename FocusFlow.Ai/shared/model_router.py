@@ -0,0 +1,66 @@
+import logging
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger("focusflow.shared.model_router")
+
+
+class ModelRouter:
+    """
+    Kiest per call het kleine of het grote model. Klein als: er een klein model is
+    ingesteld, het endpoint daarvoor in aanmerking komt, de taal ondersteund is en de
+    (ingekorte) input kort genoeg is; is de categorie al deterministisch bepaald, dan
+    mag de input dubbel zo lang zijn. Anders het grote model (settings.ai_model).
+    """
+
+    def __init__(self) -> None:
+        self._routed: Dict[str, int] = {}
+        self._escalations: Dict[str, int] = {}
+
+    @property
+    def large(self) -> str:
+        return settings.ai_model
+
+    @property
+    def small(self) -> Optional[str]:
+        return settings.ai_model_small or None
+
+    def is_small(self, model: Optional[str]) -> bool:
+        return bool(model) and model != self.large and model == self.small
+
+    def choose(
+        self,
+        *,
+        endpoint: str,
+        input_tokens: int,
+        language: Optional[str] = None,
+        triage_settled: bool = False,
+    ) -> str:
+        model = self.large
+        if self.small and endpoint in settings.model_small_endpoints and language in settings.model_small_languages:
+            limit = settings.model_small_max_tokens * (2 if triage_settled else 1)
+            if input_tokens <= limit:
+                model = self.small
+
+        self._routed[model] = self._routed.get(model, 0) + 1
+        return model
+
+    def escalation_for(self, model: Optional[str], *, endpoint: str, reason: str) -> Optional[str]:
+        # grote model als tweede kans; None als er niets te escaleren valt
+        if not self.is_small(model):
+            return None
+        self._escalations[reason] = self._escalations.get(reason, 0) + 1
+        logger.info("%s escalating %s -> %s (%s)", endpoint, model, self.large, reason)
+        return self.large
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "small": self.small,
+            "large": self.large,
+            "routed": dict(self._routed),
+            "escalations": dict(self._escalations),
+        }
+
+
+model_router = ModelRouter()
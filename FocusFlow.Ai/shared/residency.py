@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import settings
+from shared.ai_client import capabilities_of, warmup_model
+from shared.scheduler import SchedulerOverloaded, llm_scheduler
+
+logger = logging.getLogger("focusflow.shared.residency")
+
+
+def _canonical(model: str) -> str:
+    # Ollama meldt "llama3.2:latest" voor een model dat als "llama3.2" gevraagd werd
+    return model if ":" in model else f"{model}:latest"
+
+
+def _targets(client: Any) -> List[Tuple[str, Any]]:
+    # een HostPool wordt per host opgewarmd en opgevolgd (warm-up via de pool komt op een willekeurige host)
+    hosts = getattr(client, "hosts", None)
+    if callable(hosts):
+        return hosts()
+    return [(getattr(client, "name", "backend"), client)]
+
+
+@dataclass
+class _ModelState:
+    hosts: Dict[str, bool] = field(default_factory=dict)  # host -> geladen
+    warmups: int = 0
+    evictions: int = 0
+    last_warm_seconds: Optional[float] = None
+    last_checked: Optional[float] = None
+
+    @property
+    def resident(self) -> bool:
+        return bool(self.hosts) and all(self.hosts.values())
+
+
+class ModelResidency:
+    """
+    Houdt de modellen uit de routing-set (ai_model + ai_model_small) geladen. start()
+    warmt ze op de achtergrond op, samen met de system prompts van de features; daarna
+    kijkt dezelfde taak om de poll_seconds welke modellen de backend nog in geheugen
+    heeft en warmt uitgeladen modellen opnieuw op (als batchwerk, via de scheduler).
+    Bij een HostPool gebeurt dat per host; een model is pas resident als elke host het heeft.
+    Backends zonder residency-capability worden alleen bij de start opgewarmd.
+
+    Readiness hangt alleen af van de eerste geslaagde warm-up (zonder residency: de
+    warm-up is klaar). Een later uitgeladen model of een onbereikbare backend maakt de
+    service niet opnieuw unready: dan antwoordt die degraded (zie de circuit breaker),
+    en staat de toestand informatief in stats(). Zonder backend (disable) meteen ready.
+    """
+
+    def __init__(self, *, poll_seconds: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self._poll_seconds = poll_seconds
+        self._clock = clock
+        self._prompts: Dict[str, str] = {}
+        self._models: Dict[str, _ModelState] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._enabled = True
+        self._warmed = False
+        self._tracked = False
+        self._ready = False
+
+    def models(self) -> List[str]:
+        return list(dict.fromkeys(m for m in (settings.ai_model, settings.ai_model_small) if m))
+
+    def register_prompts(self, prompts: Dict[str, str]) -> None:
+        # naam -> system prompt; opgewarmd bij elke (her)lading van een model
+        self._prompts.update(prompts)
+
+    def _state(self, model: str) -> _ModelState:
+        return self._models.setdefault(model, _ModelState())
+
+    async def _warm(self, host: str, client: Any, model: str) -> bool:
+        prompts = list(self._prompts.values()) if settings.residency_warm_prompts else []
+        started = self._clock()
+        warmed = await warmup_model(client, models=[model], system_prompts=prompts)
+        state = self._state(model)
+        state.warmups += 1
+        state.last_warm_seconds = round(self._clock() - started, 3)
+        state.hosts[host] = model in warmed
+        return state.hosts[host]
+
+    def start(self, client: Any) -> None:
+        # op de achtergrond: de app start meteen, /health meldt "warming" tot het klaar is
+        self._task = asyncio.create_task(self._run(client))
+
+    async def warm_up(self, client: Any) -> None:
+        targets = _targets(client)
+        self._tracked = self._poll_seconds > 0 and any(capabilities_of(b).residency for _, b in targets)
+
+        async def _warm_host(host: str, backend: Any) -> None:
+            for model in self.models():
+                await self._warm(host, backend, model)
+
+        # hosts parallel, modellen per host na elkaar
+        await asyncio.gather(*(_warm_host(host, backend) for host, backend in targets))
+        self._warmed = True
+        self._mark_ready()
+        logger.info(
+            "models warmed (%s, hosts=%d, prompts=%d)",
+            ",".join(f"{m}={'ok' if self._state(m).resident else 'failed'}" for m in self.models()),
+            len(targets),
+            len(self._prompts),
+        )
+
+    async def _run(self, client: Any) -> None:
+        try:
+            await self.warm_up(client)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("warm-up failed")
+            self._warmed = True
+
+        while self._tracked:
+            await asyncio.sleep(self._poll_seconds)
+            try:
+                await self.check(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("residency check failed")
+
+    async def check(self, client: Any) -> None:
+        await asyncio.gather(
+            *(
+                self._check_host(host, backend)
+                for host, backend in _targets(client)
+                if capabilities_of(backend).residency
+            )
+        )
+        self._mark_ready()
+
+    def _all_resident(self) -> bool:
+        return all(self._state(m).resident for m in self.models())
+
+    def _mark_ready(self) -> None:
+        # eenmaal ready blijft ready; zonder residency valt er na de warm-up niets op te volgen
+        if self._warmed and (not self._tracked or self._all_resident()):
+            self._ready = True
+
+    async def _check_host(self, host: str, client: Any) -> None:
+        now = self._clock()
+        try:
+            loaded = {_canonical(m) for m in await client.loaded_models() if m}
+        except Exception as e:
+            # host onbereikbaar: niets is gegarandeerd geladen
+            logger.warning("loaded models unavailable on %s: %s", host, e)
+            for model in self.models():
+                self._state(model).hosts[host] = False
+            return
+
+        for model in self.models():
+            state = self._state(model)
+            state.last_checked = now
+            if _canonical(model) in loaded:
+                state.hosts[host] = True
+                continue
+
+            if state.hosts.get(host):
+                state.evictions += 1
+                logger.info("model %s was unloaded on %s -> re-warming", model, host)
+            try:
+                async with llm_scheduler.slot("batch"):
+                    await self._warm(host, client, model)
+            except SchedulerOverloaded:
+                # druk genoeg; volgende ronde opnieuw
+                state.hosts[host] = False
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def disable(self) -> None:
+        # geen (bruikbare) backend: readiness hangt niet van de modellen af
+        self._enabled = False
+
+    def is_ready(self) -> bool:
+        return not self._enabled or self._ready
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.is_ready(),
+            "resident": self._all_resident(),
+            "enabled": self._enabled,
+            "pollSeconds": self._poll_seconds,
+            "warmPrompts": sorted(self._prompts),
+            "models": {
+                model: {
+                    "resident": state.resident,
+                    "hosts": dict(state.hosts),
+                    "keepAlive": settings.ollama_keep_alive_per_model.get(model, settings.ollama_keep_alive),
+                    "warmups": state.warmups,
+                    "evictions": state.evictions,
+                    "lastWarmSeconds": state.last_warm_seconds,
+                }
+                for model, state in ((m, self._state(m)) for m in self.models())
+            },
+        }
+
+    def reset(self) -> None:
+        self._models.clear()
+        self._enabled = True
+        self._warmed = False
+        self._tracked = False
+        self._ready = False
+
+
+model_residency = ModelResidency(poll_seconds=settings.residency_poll_seconds)
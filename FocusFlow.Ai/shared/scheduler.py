@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Literal
+
+from config import settings
+
+logger = logging.getLogger("focusflow.shared.scheduler")
+
+Priority = Literal["interactive", "standard", "batch"]
+
+PRIORITY_ORDER: tuple = ("interactive", "standard", "batch")
+
+
+class SchedulerOverloaded(Exception):
+    def __init__(self, priority: str, retry_after_seconds: int) -> None:
+        super().__init__(f"Wachtrij '{priority}' is vol")
+        self.priority = priority
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdmissionScheduler:
+    """
+    Centrale toegang tot de modelslots: hoogstens max_concurrency calls tegelijk,
+    wachtende calls worden per prioriteitsklasse bediend (interactive > standard > batch).
+    Een volle wachtrij geeft meteen SchedulerOverloaded in plaats van op te stapelen.
+    """
+
+    def __init__(self, *, max_concurrency: int, queue_limits: Dict[str, int]) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._queue_limits = dict(queue_limits)
+        self._queues: Dict[str, Deque["asyncio.Future[None]"]] = {p: deque() for p in PRIORITY_ORDER}
+        self._active = 0
+        self._avg_hold_seconds = 5.0
+        self._admitted: Dict[str, int] = {p: 0 for p in PRIORITY_ORDER}
+        self._rejected: Dict[str, int] = {p: 0 for p in PRIORITY_ORDER}
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = "standard") -> AsyncIterator[None]:
+        await self._acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            held = time.monotonic() - started
+            self._avg_hold_seconds = 0.8 * self._avg_hold_seconds + 0.2 * held
+            self._release()
+
+    def has_free_slot(self) -> bool:
+        return self._active < self._max_concurrency and not any(self._queues.values())
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "maxConcurrency": self._max_concurrency,
+            "active": self._active,
+            "avgHoldSeconds": round(self._avg_hold_seconds, 3),
+            "queues": {
+                p: {
+                    "depth": len(self._queues[p]),
+                    "limit": self._queue_limits.get(p, 0),
+                    "admitted": self._admitted[p],
+                    "rejected": self._rejected[p],
+                }
+                for p in PRIORITY_ORDER
+            },
+        }
+
+    async def _acquire(self, priority: str) -> None:
+        if priority not in self._queues:
+            priority = "standard"
+
+        if self._active < self._max_concurrency and not any(self._queues.values()):
+            self._active += 1
+            self._admitted[priority] += 1
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self._queue_limits.get(priority, 0):
+            self._rejected[priority] += 1
+            retry_after = self._retry_after_seconds()
+            logger.warning(
+                "queue full (priority=%s depth=%d active=%d) -> shed, retry after %ss",
+                priority,
+                len(queue),
+                self._active,
+                retry_after,
+            )
+            raise SchedulerOverloaded(priority, retry_after)
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # slot was al doorgegeven; geef hem meteen terug
+                self._release()
+            raise
+
+        self._admitted[priority] += 1
+
+    def _release(self) -> None:
+        for priority in PRIORITY_ORDER:
+            queue = self._queues[priority]
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    # slot direct overdragen: _active blijft gelijk
+                    waiter.set_result(None)
+                    return
+        self._active -= 1
+
+    def _retry_after_seconds(self) -> int:
+        waiting = sum(len(q) for q in self._queues.values()) + 1
+        estimate = self._avg_hold_seconds * waiting / self._max_concurrency
+        return max(1, math.ceil(estimate))
+
+
+llm_scheduler = AdmissionScheduler(
+    max_concurrency=settings.ollama_parallel_slots,
+    queue_limits={
+        "interactive": settings.queue_limit_interactive,
+        "standard": settings.queue_limit_standard,
+        "batch": settings.queue_limit_batch,
+    },
+)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+logger = logging.getLogger("focusflow.shared.single_flight")
+
+T = TypeVar("T")
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Future[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Registry van lopende calls: identieke gelijktijdige aanvragen delen één onderliggende taak.
+    Elke waiter houdt zijn eigen timeout; de gedeelde taak wordt pas geannuleerd als niemand
+    er nog op wacht. Met keep_on_timeout loopt de taak na een timeout van de laatste waiter
+    door (de factory heeft dan zelf een timeout), zodat een retry er nog op kan aansluiten.
+    """
+
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+        self._started = 0
+        self._coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[T]],
+        *,
+        timeout: Optional[float] = None,
+        keep_on_timeout: bool = False,
+    ) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda t, k=key, f=flight: self._forget(k, f))
+            self._started += 1
+        else:
+            self._coalesced += 1
+            logger.info("joined in-flight call (waiters=%d)", flight.waiters + 1)
+
+        flight.waiters += 1
+        timed_out = False
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout=timeout)
+        except TimeoutError:
+            timed_out = keep_on_timeout
+            raise
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done() and not timed_out:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+                # pas terug als de call echt afgebroken is (slot vrij, backend-stream dicht)
+                await asyncio.wait({flight.task})
+
+    def when_done(self, key: str, callback: Callable[[Any], None]) -> bool:
+        # callback(result) zodra de lopende call slaagt; False als er geen call (meer) loopt
+        flight = self._flights.get(key)
+        if flight is None:
+            return False
+
+        def _done(task: "asyncio.Future[Any]") -> None:
+            if not task.cancelled() and task.exception() is None:
+                callback(task.result())
+
+        flight.task.add_done_callback(_done)
+        return True
+
+    def waiters(self, key: str) -> int:
+        flight = self._flights.get(key)
+        return flight.waiters if flight is not None else 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "inFlight": len(self._flights),
+            "started": self._started,
+            "coalesced": self._coalesced,
+        }
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # voorkom "exception was never retrieved" als alle waiters al weg zijn
+            flight.task.exception()
+
+
+llm_flights = SingleFlight()
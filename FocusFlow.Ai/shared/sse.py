@@ -0,0 +1,35 @@
+import json
+from typing import Any, AsyncIterator, Tuple
+
+from fastapi.responses import StreamingResponse
+
+SseEvent = Tuple[str, Any]
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def sse_response(events: AsyncIterator[SseEvent]) -> StreamingResponse:
+    # eerste event al ophalen: admission-fouten (429) komen zo nog als gewone response terug
+    try:
+        first = await events.__anext__()
+    except StopAsyncIteration:
+        first = None
+
+    async def _body() -> AsyncIterator[str]:
+        if first is None:
+            return
+        try:
+            yield format_sse(*first)
+            async for event, data in events:
+                yield format_sse(event, data)
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(
+        _body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
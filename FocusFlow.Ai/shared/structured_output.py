@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class Key:
+    name: str                               # veld zoals de feature het leest
+    compact: str                            # key in de modeloutput
+    schema: Dict[str, Any]
+    items: Optional["JsonContract"] = None  # lijst van objecten met eigen keys
+
+
+class JsonContract:
+    """
+    Outputcontract van een feature: JSON-schema met korte keys (gaat als format naar de
+    backend, zodat het model geen keys kan verzinnen of tekst rond de JSON zetten) en de
+    mapping terug naar de veldnamen die de feature verwacht.
+    """
+
+    def __init__(self, *keys: Key) -> None:
+        self._keys = keys
+        self._by_compact = {k.compact: k for k in keys}
+        self._by_name = {k.name: k for k in keys}
+
+    def schema(self) -> Dict[str, Any]:
+        properties: Dict[str, Any] = {}
+        for key in self._keys:
+            if key.items is not None:
+                properties[key.compact] = {**key.schema, "type": "array", "items": key.items.schema()}
+            else:
+                properties[key.compact] = key.schema
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [k.compact for k in self._keys],
+            "additionalProperties": False,
+        }
+
+    def prompt_hint(self) -> str:
+        lines = ["Gebruik in de JSON uitsluitend deze korte keys (korte key = veld hierboven):"]
+        for key in self._keys:
+            lines.append(f"- {key.compact} = {key.name}")
+            if key.items is not None:
+                inner = ", ".join(f"{k.compact} = {k.name}" for k in key.items._keys)
+                lines.append(f"  elk item in {key.compact}: {inner}")
+        return "\n".join(lines)
+
+    def compact_name(self, name: str) -> str:
+        key = self._by_name.get(name)
+        return key.compact if key is not None else name
+
+    def full_name(self, compact: str) -> str:
+        key = self._by_compact.get(compact)
+        return key.name if key is not None else compact
+
+    def expand_value(self, compact: str, value: Any) -> Any:
+        key = self._by_compact.get(compact)
+        if key is None or key.items is None or not isinstance(value, list):
+            return value
+        return [key.items.expand(v) if isinstance(v, dict) else v for v in value]
+
+    def expand(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # onbekende keys (bv. volledige namen van een backend zonder schema) blijven staan
+        return {self.full_name(k): self.expand_value(k, v) for k, v in data.items()}
+
+
+# limieten die strict structured output (OpenAI) weigert of negeert; de features
+# handhaven ze zelf na het parsen (limit_summary, clamp, [:n])
+_LIMIT_KEYWORDS = frozenset(
+    {"maxLength", "minLength", "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "maxItems", "minItems"}
+)
+
+
+def strict_schema(schema: Any) -> Any:
+    """Kopie van het schema zonder limiet-keywords (zie _LIMIT_KEYWORDS)."""
+    if isinstance(schema, list):
+        return [strict_schema(v) for v in schema]
+    if not isinstance(schema, dict):
+        return schema
+
+    out: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key in _LIMIT_KEYWORDS:
+            continue
+        if key == "properties":
+            # namen van properties zijn geen keywords
+            out[key] = {name: strict_schema(sub) for name, sub in value.items()}
+        elif key in ("enum", "required"):
+            out[key] = value
+        else:
+            out[key] = strict_schema(value)
+    return out
+
+
+def string(max_length: Optional[int] = None) -> Dict[str, Any]:
+    return {"type": "string", **({"maxLength": max_length} if max_length else {})}
+
+
+def nullable_string(max_length: Optional[int] = None) -> Dict[str, Any]:
+    return {"anyOf": [string(max_length), {"type": "null"}]}
+
+
+def enum(values: Sequence[str]) -> Dict[str, Any]:
+    return {"type": "string", "enum": list(values)}
+
+
+def number(minimum: float, maximum: float) -> Dict[str, Any]:
+    return {"type": "number", "minimum": minimum, "maximum": maximum}
+
+
+def array(items: Optional[Dict[str, Any]] = None, max_items: Optional[int] = None) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"type": "array"}
+    if items is not None:
+        out["items"] = items
+    if max_items:
+        out["maxItems"] = max_items
+    return out
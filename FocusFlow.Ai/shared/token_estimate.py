@@ -0,0 +1,39 @@
+import math
+import re
+
+from config import settings
+
+# woorden en losse leestekens; een lang woord telt als meerdere (sub)tokens
+_PIECE_RX = re.compile(r"\w+|[^\w\s]")
+_CHARS_PER_SUBWORD = 5
+
+
+def _piece_tokens(piece: str) -> int:
+    return 1 + (len(piece) - 1) // _CHARS_PER_SUBWORD
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Benadering van het aantal Llama-tokens (BPE) voor NL/EN-mailtekst, met een
+    veiligheidsmarge (settings.token_estimate_margin) want onderschatten is duurder.
+    """
+    if not text:
+        return 0
+    raw = sum(_piece_tokens(p) for p in _PIECE_RX.findall(text))
+    return math.ceil(raw * settings.token_estimate_margin)
+
+
+def fit_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Langste prefix van text (afgekapt op een woordgrens) dat binnen max_tokens valt.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens / settings.token_estimate_margin
+    used = 0
+    for m in _PIECE_RX.finditer(text):
+        used += _piece_tokens(m.group())
+        if used > budget:
+            return text[:m.start()].rstrip()
+    return text
@@ -16,4 +16,11 @@ def anyio_backend():
 def _set_test_app_state():
     # Mock de ollama_client
     from main import app
-    app.state.ollama_client = object()
\ No newline at end of file
+    app.state.ollama_client = object()
+
+
+@pytest.fixture(autouse=True)
+def _reset_llm_breaker():
+    # fouten uit een vorige test mogen de breaker niet open laten staan
+    from shared.circuit_breaker import llm_breaker
+    llm_breaker.reset()
@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+
+from config import Settings
+from shared.backends import FakeBackend, HostPool, create_backend
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _FailingBackend(FakeBackend):
+    def __init__(self) -> None:
+        super().__init__('{"ok": true}')
+        self.failing = True
+
+    async def chat(self, **kwargs):
+        if self.failing:
+            self.calls.append(kwargs)
+            raise ConnectionError("host down")
+        return await super().chat(**kwargs)
+
+
+async def _ask(pool: HostPool):
+    return await pool.chat(model="m", messages=[{"role": "user", "content": "x"}])
+
+
+def test_create_backend_builds_pool_for_multiple_hosts():
+    backend = create_backend(Settings(llm_backend="ollama", ollama_hosts=["http://a:11434", "http://b:11434"]))
+    assert isinstance(backend, HostPool)
+    assert [h["host"] for h in backend.stats()] == ["http://a:11434", "http://b:11434"]
+
+
+@pytest.mark.anyio
+async def test_pool_routes_to_least_loaded_host():
+    a, b = FakeBackend('{"h": "a"}'), FakeBackend('{"h": "b"}')
+    pool = HostPool({"a": a, "b": b})
+
+    # a is trager => b krijgt de volgende call
+    for host, latency in zip(pool._hosts, (2.0, 1.0)):
+        host.ewma_latency, host.requests = latency, 1
+    await _ask(pool)
+    assert len(b.calls) == 1 and not a.calls
+
+    # veel werk in-flight op b => a wint
+    pool._hosts[1].in_flight = 5
+    await _ask(pool)
+    assert len(a.calls) == 1
+
+
+@pytest.mark.anyio
+async def test_pool_ejects_failing_host_and_probes_it_back():
+    clock = _Clock()
+    bad, good = _FailingBackend(), FakeBackend('{"ok": true}')
+    pool = HostPool({"bad": bad, "good": good}, eject_after_failures=2, eject_seconds=10, clock=clock)
+    pool._hosts[1].ewma_latency, pool._hosts[1].requests = 5.0, 1  # zonder ejectie zou "bad" gekozen worden
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            await _ask(pool)
+    assert not pool.stats()[0]["healthy"]
+
+    await _ask(pool)
+    assert len(bad.calls) == 2 and len(good.calls) == 1
+
+    # na de ejectietijd krijgt "bad" één probe; slaagt die, dan is hij terug gezond
+    clock.now += 11
+    bad.failing = False
+    await _ask(pool)
+    assert len(bad.calls) == 3
+    assert pool.stats()[0]["healthy"]
+    assert pool.stats()[0]["inFlight"] == 0
+
+
+@pytest.mark.anyio
+async def test_pool_counts_stream_until_closed():
+    backend = FakeBackend('{"a": 1}', chunk_size=2)
+    pool = HostPool({"a": backend})
+
+    stream = await pool.chat(model="m", messages=[], stream=True)
+    assert pool.stats()[0]["inFlight"] == 1
+    pieces = [chunk async for chunk in stream]
+
+    assert pieces
+    assert pool.stats()[0]["inFlight"] == 0
+    assert pool.stats()[0]["requests"] == 1
+
+
+class _HangingBackend(FakeBackend):
+    async def chat(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(3600)
+
+
+@pytest.mark.anyio
+async def test_hanging_host_times_out_and_is_ejected():
+    hung, ok = _HangingBackend(), FakeBackend('{"ok": true}')
+    pool = HostPool({"hung": hung, "ok": ok}, eject_after_failures=1, timeout_seconds=0.05)
+    # de hangende host lijkt eerst de snelste
+    pool._hosts[0].ewma_latency, pool._hosts[0].requests = 0.01, 1
+    pool._hosts[1].ewma_latency, pool._hosts[1].requests = 1.0, 1
+
+    with pytest.raises(TimeoutError):
+        await _ask(pool)
+
+    stats = {h["host"]: h for h in pool.stats()}
+    assert stats["hung"]["failures"] == 1
+    assert not stats["hung"]["healthy"]
+    assert stats["hung"]["ewmaLatencySeconds"] > 0.01
+    assert stats["hung"]["inFlight"] == 0
+
+    await _ask(pool)
+    assert len(ok.calls) == 1 and len(hung.calls) == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_call_is_not_a_failure():
+    slow = _HangingBackend()
+    pool = HostPool({"slow": slow}, eject_after_failures=1)
+
+    task = asyncio.ensure_future(_ask(pool))
+    await asyncio.sleep(0.02)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    stats = pool.stats()[0]
+    assert stats["failures"] == 0 and stats["healthy"] and stats["inFlight"] == 0
@@ -0,0 +1,100 @@
+import json
+
+import httpx
+import pytest
+
+from config import Settings
+from shared.ai_client import ask_model_for_json, stream_model_json
+from shared.backends import BackendCapabilities, FakeBackend, create_backend
+from shared.backends.openai_backend import OpenAICompatibleBackend
+from shared.llm_json import run_llm_json
+from features.email.contracts import PROCESS_CONTRACT
+
+
+def test_create_backend_follows_settings():
+    assert create_backend(Settings(llm_backend="fake")).name == "fake"
+
+    backend = create_backend(Settings(llm_backend="openai", openai_base_url="http://llm:8080/v1"))
+    assert backend.name == "openai"
+    assert backend.capabilities.native_batching
+
+    with pytest.raises(ValueError):
+        create_backend(Settings(llm_backend="onbekend"))
+
+
+@pytest.mark.anyio
+async def test_fake_backend_serves_run_llm_json():
+    backend = FakeBackend(lambda messages: {"echo": messages[1]["content"]})
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Geef JSON.",
+        user_prompt="hallo",
+        log_name="test-fake",
+    )
+
+    assert status == "ok"
+    assert data == {"echo": "hallo"}
+    assert backend.calls[0]["format"] == "json"
+    assert "num_ctx" in backend.calls[0]["options"]
+
+
+@pytest.mark.anyio
+async def test_stream_falls_back_to_single_call_without_streaming_capability():
+    backend = FakeBackend('{"a": 1}', capabilities=BackendCapabilities(streaming=False))
+
+    pieces = [p async for p in stream_model_json(backend, system_prompt="s", user_prompt="u")]
+
+    assert pieces == ['{"a": 1}']
+    assert backend.calls[0]["stream"] is False
+
+
+@pytest.mark.anyio
+async def test_openai_backend_maps_options_and_parses_responses():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content)
+        seen.append(payload)
+        if payload["stream"]:
+            chunks = [
+                {"choices": [{"delta": {"content": '{"a"'}}]},
+                {"choices": [{"delta": {"content": ": 1}"}, "finish_reason": "stop"}]},
+            ]
+            body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+            return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+        return httpx.Response(200, json={"choices": [{"message": {"content": '{"a": 1}'}, "finish_reason": "stop"}]})
+
+    backend = OpenAICompatibleBackend(base_url="http://llm/v1", transport=httpx.MockTransport(handler))
+
+    raw = await ask_model_for_json(backend, system_prompt="s", user_prompt="u", num_predict=64)
+    assert json.loads(raw) == {"a": 1}
+    assert seen[0]["max_tokens"] == 64
+    assert seen[0]["response_format"] == {"type": "json_object"}
+    assert "num_ctx" not in seen[0]
+
+    pieces = [p async for p in stream_model_json(backend, system_prompt="s", user_prompt="u")]
+    assert "".join(pieces) == '{"a": 1}'
+
+    await backend.aclose()
+
+
+@pytest.mark.anyio
+async def test_openai_strict_schema_drops_limit_keywords():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(json.loads(request.content))
+        return httpx.Response(200, json={"choices": [{"message": {"content": "{}"}, "finish_reason": "stop"}]})
+
+    backend = OpenAICompatibleBackend(base_url="http://llm/v1", transport=httpx.MockTransport(handler))
+    schema = PROCESS_CONTRACT.schema()
+    await ask_model_for_json(backend, system_prompt="s", user_prompt="u", format=schema)
+    await backend.aclose()
+
+    sent = json.dumps(seen[0]["response_format"]["json_schema"]["schema"])
+    assert seen[0]["response_format"]["json_schema"]["strict"] is True
+    for keyword in ("maxLength", "minimum", "maximum", "maxItems"):
+        assert keyword in json.dumps(schema)
+        assert keyword not in sent
+    assert json.loads(sent)["required"] == schema["required"]
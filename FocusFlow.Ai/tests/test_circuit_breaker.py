@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from config import settings
+from main import app
+from shared.ai_client import ask_model_for_json
+from shared.backends import FakeBackend
+from shared.circuit_breaker import CircuitBreaker, CircuitOpen, llm_breaker
+from shared.deadline import DeadlineExceeded, deadline_after_ms
+from shared.llm_cache import llm_cache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _DownBackend(FakeBackend):
+    async def chat(self, **kwargs):
+        self.calls.append(kwargs)
+        raise ConnectionError("connection refused")
+
+
+class _HangingBackend(FakeBackend):
+    async def chat(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(10)
+
+
+def test_breaker_opens_after_threshold_and_half_opens_with_single_probe():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+    clock.now = 11
+    assert breaker.state == "half_open"
+    assert breaker.before_call() is True  # probe
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+    with pytest.raises(CircuitOpen):
+        breaker.check()
+
+    breaker.record_failure(probe=True)  # probe faalt => weer open
+    assert breaker.state == "open"
+
+    clock.now = 22
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_only_the_probe_call_hands_back_the_probe():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    assert breaker.before_call() is False  # gesloten: geen probe
+    breaker.record_failure()
+
+    clock.now = 11
+    assert breaker.before_call() is True
+    # een oudere call die nu pas faalt, laat de lopende probe staan
+    breaker.record_failure()
+    with pytest.raises(CircuitOpen):
+        breaker.before_call()
+
+
+@pytest.mark.anyio
+async def test_breaker_sees_one_outcome_per_inference_not_per_waiter(monkeypatch):
+    monkeypatch.setattr(settings, "ollama_timeout_seconds", 0.2)
+    backend = _HangingBackend()
+
+    results = await asyncio.gather(
+        *(
+            ask_model_for_json(backend, system_prompt="S", user_prompt="U", deadline=deadline_after_ms(50))
+            for _ in range(3)
+        ),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, DeadlineExceeded) for r in results)
+    # verlopen budgetten van wachtende aanvragers zijn geen modelfouten
+    assert llm_breaker.stats()["consecutiveFailures"] == 0
+
+    # de gedeelde call loopt door tot de eigen modeltimeout: één inference, één fout
+    await asyncio.sleep(0.3)
+    assert len(backend.calls) == 1
+    assert llm_breaker.stats()["consecutiveFailures"] == 1
+
+
+@pytest.mark.anyio
+async def test_open_breaker_serves_degraded_analysis_immediately():
+    llm_cache.clear()
+    backend = _DownBackend()
+    app.state.ollama_client = backend
+    payload = {
+        "subject": "Storing productie",
+        "body": "Hallo team,\nDe server is down sinds vanochtend. Graag dringend herstarten. Daarna even bevestigen.",
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for i in range(settings.breaker_failure_threshold):
+            await client.post("/email/analyze", json={**payload, "subject": f"Storing {i}"})
+        calls_when_open = len(backend.calls)
+
+        health = (await client.get("/health")).json()
+        started = time.perf_counter()
+        res = await client.post("/email/analyze", json=payload)
+        elapsed = time.perf_counter() - started
+
+    assert health["llm"]["breaker"]["state"] == "open"
+    assert len(backend.calls) == calls_when_open
+    assert elapsed < 0.5
+
+    data = res.json()
+    assert data["priorityScore"] == 100
+    assert data["summary"].startswith("De server is down")
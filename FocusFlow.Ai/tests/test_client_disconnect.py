@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from main import app
+from shared.backends import FakeBackend
+from shared.disconnect import disconnect_metrics
+from shared.llm_cache import llm_cache
+from shared.scheduler import llm_scheduler
+
+
+class _SlowBackend(FakeBackend):
+    def __init__(self) -> None:
+        super().__init__('{"category": "Werk"}')
+        self.cancelled = False
+
+    async def chat(self, **kwargs):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return await super().chat(**kwargs)
+
+
+async def _call_and_disconnect(path: str, payload: dict, disconnect_after: float):
+    body = json.dumps(payload).encode()
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"host", b"test")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+@pytest.mark.anyio
+async def test_disconnect_cancels_inference_and_frees_slot():
+    llm_cache.clear()
+    backend = _SlowBackend()
+    app.state.ollama_client = backend
+    before = disconnect_metrics.stats()
+
+    sent = await asyncio.wait_for(
+        _call_and_disconnect("/email/analyze", {"subject": "Vraag", "body": "Kun je het rapport nakijken?"}, 0.1),
+        timeout=2,
+    )
+
+    assert sent[0]["status"] == 499
+    assert backend.cancelled
+    assert llm_scheduler.stats()["active"] == 0
+    after = disconnect_metrics.stats()
+    assert after["cancelled"] == before["cancelled"] + 1
+    assert after["wastedSeconds"] > before["wastedSeconds"]
+
+
+@pytest.mark.anyio
+async def test_connected_client_gets_normal_response():
+    llm_cache.clear()
+    app.state.ollama_client = FakeBackend('{"category": "Werk", "summary": "Rapport nakijken."}')
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze", json={"subject": "Vraag", "body": "Kun je het rapport nakijken?"})
+
+    assert res.status_code == 200
+    assert res.json()["summary"] == "Rapport nakijken."
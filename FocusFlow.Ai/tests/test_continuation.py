@@ -0,0 +1,87 @@
+import json
+
+import httpx
+import pytest
+
+from main import app
+from config import settings
+from shared.ai_client import CONTINUE_PROMPT, ask_model_for_json
+from shared.backends import FakeBackend
+from shared.llm_cache import llm_cache
+
+BODY = (
+    "Beste Jan,\n\nKunnen we de vergadering van dinsdag naar woensdag verplaatsen? "
+    "Dinsdag heb ik een klantbezoek dat de hele namiddag in beslag neemt. "
+    "Woensdag ben ik de hele dag vrij, dus een tijdstip dat jou past is goed.\n\n"
+    "Met vriendelijke groeten,\nKarsten"
+)
+MODEL_OUTPUT = json.dumps({"subject": "Vergadering verplaatsen", "body": BODY}, ensure_ascii=False)
+PAYLOAD = {"prompt": "Vraag of de vergadering van dinsdag naar woensdag kan.", "tone": "Neutral", "language": "nl"}
+
+
+def _responder(messages):
+    if messages[-1]["content"] != CONTINUE_PROMPT:
+        return MODEL_OUTPUT
+    # verder vanaf het halve antwoord, met een stukje herhaling zoals een echt model soms doet
+    done = len(messages[-2]["content"])
+    return MODEL_OUTPUT[done - 12:]
+
+
+@pytest.mark.anyio
+async def test_truncated_compose_is_continued_instead_of_regenerated(monkeypatch):
+    llm_cache.clear()
+    monkeypatch.setattr(settings, "llm_max_continuations", 4)
+    backend = FakeBackend(_responder, max_output_chars=150)
+    app.state.ollama_client = backend
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/compose", json=PAYLOAD)
+
+    assert res.status_code == 200
+    assert res.json()["body"].rstrip().endswith("Karsten")
+    assert len(backend.calls) == 3
+    follow_up = backend.calls[1]
+    assert follow_up["format"] is None
+    assert [m["role"] for m in follow_up["messages"]] == ["system", "user", "assistant", "user"]
+
+
+@pytest.mark.anyio
+async def test_truncated_stream_is_continued_without_duplicate_text(monkeypatch):
+    llm_cache.clear()
+    monkeypatch.setattr(settings, "llm_max_continuations", 4)
+    app.state.ollama_client = FakeBackend(_responder, max_output_chars=150)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/compose/stream", json=PAYLOAD)
+
+    blocks = [dict(line.split(": ", 1) for line in b.splitlines()) for b in res.text.strip().split("\n\n")]
+    deltas = [json.loads(b["data"]) for b in blocks if b["event"] == "delta"]
+    assert "".join(d["text"] for d in deltas if d["field"] == "body") == BODY
+    assert blocks[-1]["event"] == "done"
+
+
+@pytest.mark.anyio
+async def test_continuation_rounds_are_capped(monkeypatch):
+    llm_cache.clear()
+    monkeypatch.setattr(settings, "llm_max_continuations", 1)
+    monkeypatch.setattr(settings, "json_retry_attempts", 0)
+    backend = FakeBackend(_responder, max_output_chars=60)
+    app.state.ollama_client = backend
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/compose", json=PAYLOAD)
+
+    assert res.status_code == 200
+    assert len(backend.calls) == 2
+    # één vervolgstuk in het gesprek, en de mail is niet volledig teruggekomen
+    assert [m["role"] for m in backend.calls[1]["messages"]] == ["system", "user", "assistant", "user"]
+    assert not res.json()["body"].rstrip().endswith("Karsten")
+
+    backend.calls.clear()
+    raw = await ask_model_for_json(backend, system_prompt="s", user_prompt="kort")
+    assert len(backend.calls) == 2
+    # twee stukken van 60 tekens, de 12 herhaalde tekens weggeknipt; de rest is afgekapt
+    assert raw == MODEL_OUTPUT[:60 + 60 - 12]
@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from main import app
+from shared.backends import FakeBackend
+from shared.circuit_breaker import llm_breaker
+from shared.llm_cache import llm_cache
+
+PAYLOAD = {
+    "subject": "Factuur januari",
+    "body": "Beste,\nGelieve de factuur van januari dringend te betalen. Alvast bedankt.\nGroeten",
+    "receivedAtUtc": "2026-01-10T08:00:00Z",
+}
+
+
+class _SlowBackend(FakeBackend):
+    async def chat(self, **kwargs):
+        await asyncio.sleep(2)
+        return await super().chat(**kwargs)
+
+
+@pytest.mark.anyio
+async def test_deadline_header_returns_partial_analysis_in_time():
+    llm_cache.clear()
+    app.state.ollama_client = _SlowBackend('{"category": "Factuur"}')
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        started = time.perf_counter()
+        res = await client.post("/email/analyze", json=PAYLOAD, headers={"X-Deadline-Ms": "150"})
+        elapsed = time.perf_counter() - started
+
+    assert res.status_code == 200
+    assert elapsed < 1.0
+    data = res.json()
+    assert data["isPartial"] is True
+    assert data["category"] == "Factuur"
+    assert data["priorityScore"] in (0, 25, 50, 75, 100)
+    assert data["summary"].startswith("Gelieve de factuur")
+    # een verlopen budget is geen modelfout
+    assert llm_breaker.stats()["consecutiveFailures"] == 0
+
+
+@pytest.mark.anyio
+async def test_deadline_field_marks_tasks_partial_and_fast_calls_stay_complete():
+    llm_cache.clear()
+    app.state.ollama_client = _SlowBackend('{"tasks": []}')
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        slow = await client.post("/email/extract-tasks", json={**PAYLOAD, "deadlineMs": 100})
+
+        app.state.ollama_client = FakeBackend('{"category": "Factuur", "summary": "Factuur betalen."}')
+        fast = await client.post("/email/analyze", json={**PAYLOAD, "deadlineMs": 5000})
+
+    assert slow.json() == {"tasks": [], "needsClarification": [], "isPartial": True}
+    assert fast.json()["isPartial"] is False
+    assert fast.json()["summary"] == "Factuur betalen."
+
+
+class _SomewhatSlowBackend(FakeBackend):
+    async def chat(self, **kwargs):
+        await asyncio.sleep(0.3)
+        return await super().chat(**kwargs)
+
+
+@pytest.mark.anyio
+async def test_generation_past_the_deadline_is_cached_for_the_retry():
+    llm_cache.clear()
+    backend = _SomewhatSlowBackend('{"category": "Factuur", "summary": "Factuur betalen."}')
+    app.state.ollama_client = backend
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = await client.post("/email/analyze", json=PAYLOAD, headers={"X-Deadline-Ms": "100"})
+        # de call loopt door na de deadline en werkt af
+        await asyncio.sleep(0.4)
+        retry = await client.post("/email/analyze", json=PAYLOAD, headers={"X-Deadline-Ms": "100"})
+
+    assert first.json()["isPartial"] is True
+    assert retry.json()["isPartial"] is False
+    assert retry.json()["summary"] == "Factuur betalen."
+    assert len(backend.calls) == 1
@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from main import app
+
+
+@pytest.mark.anyio
+async def test_analyze_batch_streams_ndjson_with_bounded_fan_out(monkeypatch):
+    active = 0
+    max_active = 0
+
+    async def fake_run_llm_json(*args, **kwargs):
+        nonlocal active, max_active
+        assert kwargs["priority"] == "batch"
+        active += 1
+        max_active = max(max_active, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if "kapot" in kwargs["user_prompt"]:
+            raise RuntimeError("boom")
+        return {"category": "Werk", "suggested_action": "Lezen", "summary": "Ok."}, "ok"
+
+    import features.email.analysis.service as svc
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    items = [{"id": f"m{i}", "subject": f"Mail {i}", "body": "Gewone werkmail zonder actie."} for i in range(6)]
+    items[3]["body"] = "Deze mail is kapot."
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze/batch", json={"items": items, "concurrency": 2})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in res.text.splitlines()]
+    assert sorted(line["id"] for line in lines) == [f"m{i}" for i in range(6)]
+    assert max_active <= 2
+
+    failed = [line for line in lines if not line["ok"]]
+    assert [line["id"] for line in failed] == ["m3"]
+    assert failed[0]["result"]["category"] == "Overig"
+    assert all(line["result"]["category"] == "Werk" for line in lines if line["ok"])
+
+
+@pytest.mark.anyio
+async def test_analyze_batch_packs_short_mails_and_falls_back_for_missing_entries(monkeypatch):
+    single_calls = []
+    packed_calls = []
+
+    async def fake_packed_run_llm_json(*args, **kwargs):
+        packed_calls.append(kwargs)
+        return (
+            {
+                "results": [
+                    {"index": 0, "category": "Reclame", "suggested_action": "Lezen", "summary": "Promo."},
+                    {"index": 2, "category": "Werk", "suggested_action": "Antwoorden", "summary": "Vraag."},
+                    {"index": 1, "summary": "geen categorie => onbruikbaar"},
+                ]
+            },
+            "ok",
+        )
+
+    async def fake_single_run_llm_json(*args, **kwargs):
+        single_calls.append(kwargs)
+        return {"category": "Prive", "suggested_action": "Lezen", "summary": "Los."}, "ok"
+
+    import features.email.analysis.batch as batch
+    import features.email.analysis.service as svc
+    monkeypatch.setattr(batch, "run_llm_json", fake_packed_run_llm_json)
+    monkeypatch.setattr(svc, "run_llm_json", fake_single_run_llm_json)
+
+    items = [
+        {"id": "a", "subject": "Korting", "body": "Nu 20% korting op alles."},
+        {"id": "b", "subject": "Verjaardag", "body": "Kom je zaterdag naar het feest?"},
+        {"id": "c", "subject": "Offerte", "body": "Kan je de offerte nog nakijken?"},
+        {"id": "long", "subject": "Rapport", "body": "Lange tekst. " * 200},
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze/batch", json={"items": items, "pack": True})
+
+    results = {line["id"]: line["result"] for line in map(json.loads, res.text.splitlines())}
+
+    assert len(packed_calls) == 1
+    assert "### E-mail 2" in packed_calls[0]["user_prompt"]
+    assert "Lange tekst" not in packed_calls[0]["user_prompt"]
+
+    assert results["a"]["category"] == "Reclame"
+    assert results["c"]["category"] == "Werk"
+    assert results["b"]["category"] == "Prive"
+    assert results["long"]["category"] == "Prive"
+    assert len(single_calls) == 2
+
+
+@pytest.mark.anyio
+async def test_analyze_batch_reports_fallback_items_as_not_ok(monkeypatch):
+    async def fake_run_llm_json(*args, **kwargs):
+        if "traag" in kwargs["user_prompt"]:
+            return None, "timeout"
+        return {"category": "Werk", "suggested_action": "Lezen", "summary": "Ok."}, "ok"
+
+    import features.email.analysis.service as svc
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    items = [
+        {"id": "snel", "subject": "Mail", "body": "Gewone werkmail zonder actie."},
+        {"id": "traag", "subject": "Mail", "body": "Deze mail is traag."},
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze/batch", json={"items": items})
+
+    lines = {line["id"]: line for line in map(json.loads, res.text.splitlines())}
+    assert lines["snel"]["ok"] is True
+    assert lines["traag"]["ok"] is False
+    assert lines["traag"]["error"] == "degraded"
+    assert lines["traag"]["result"]["isPartial"] is True
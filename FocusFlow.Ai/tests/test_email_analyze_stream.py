@@ -0,0 +1,149 @@
+import json
+
+import httpx
+import pytest
+
+from main import app
+from shared.json_stream import IncrementalJsonParser
+from shared.llm_cache import llm_cache
+
+
+MODEL_OUTPUT = json.dumps(
+    {
+        "category": "Factuur",
+        "suggested_action": "Actie Vereist",
+        "priority_score": 80,
+        "priority_signals": ["INVOICE_PAYMENT"],
+        "keyRequest": "Betaal de factuur.",
+        "summary": "Factuur januari moet betaald worden.",
+        "evidence": ["Gelieve te betalen voor 20/01."],
+        "tasks": [{"description": "Betaal factuur", "priority": "High"}],
+    }
+)
+
+PAYLOAD = {
+    "subject": "Factuur januari",
+    "body": "Hallo, hierbij de factuur voor januari. Gelieve te betalen voor 20/01. Bedankt.",
+    "sender": "boekhouding@firma.be",
+    "receivedAtUtc": "2026-01-10T20:00:00Z",
+}
+
+
+class FakeStreamingClient:
+    def __init__(self, content: str, chunk_size: int = 5):
+        self._content = content
+        self._chunk_size = chunk_size
+        self.chunks_sent = 0
+        self.closed = False
+
+    async def chat(self, *, stream=False, **kwargs):
+        async def _gen():
+            try:
+                for i in range(0, len(self._content), self._chunk_size):
+                    self.chunks_sent += 1
+                    yield {"message": {"content": self._content[i:i + self._chunk_size]}}
+            finally:
+                self.closed = True
+
+        return _gen()
+
+
+def test_incremental_parser_emits_fields_as_they_complete():
+    parser = IncrementalJsonParser()
+    emitted = []
+    for i in range(0, len(MODEL_OUTPUT), 3):
+        emitted.extend(parser.feed(MODEL_OUTPUT[i:i + 3]))
+
+    assert [key for key, _ in emitted] == list(json.loads(MODEL_OUTPUT).keys())
+    assert dict(emitted) == json.loads(MODEL_OUTPUT)
+
+
+@pytest.mark.anyio
+async def test_analyze_with_fields_stops_generation_early():
+    llm_cache.clear()
+    fake = FakeStreamingClient(MODEL_OUTPUT)
+    app.state.ollama_client = fake
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze", json={**PAYLOAD, "fields": ["category", "priorityScore"]})
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data["category"] == "Factuur"
+    assert data["priorityScore"] in (0, 25, 50, 75, 100)
+    assert data["extractedTasks"] == []
+    assert fake.closed
+    assert fake.chunks_sent < len(MODEL_OUTPUT) / 5 / 2
+
+
+@pytest.mark.anyio
+async def test_early_stop_marks_the_analysis_partial():
+    llm_cache.clear()
+    app.state.ollama_client = FakeStreamingClient(MODEL_OUTPUT)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze", json={**PAYLOAD, "fields": ["summary"]})
+
+    data = res.json()
+    assert data["summary"] == "Factuur januari moet betaald worden."
+    # evidence en taken kwamen nooit binnen: geen volledig resultaat
+    assert data["evidence"] == []
+    assert data["isPartial"] is True
+
+
+@pytest.mark.anyio
+async def test_analyze_stream_emits_category_before_summary():
+    llm_cache.clear()
+    app.state.ollama_client = FakeStreamingClient(MODEL_OUTPUT)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze/stream", json=PAYLOAD)
+
+    events = []
+    for block in res.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+
+    names = [data["name"] for event, data in events if event == "field"]
+    assert names.index("category") < names.index("summary")
+    assert names.index("priorityScore") < names.index("summary")
+
+    event, done = events[-1]
+    assert event == "done"
+    assert done["category"] == "Factuur"
+    assert len(done["extractedTasks"]) == 1
+
+
+class BrokenStreamingClient(FakeStreamingClient):
+    def __init__(self, content: str, fail_after: int):
+        super().__init__(content)
+        self._fail_after = fail_after
+
+    async def chat(self, *, stream=False, **kwargs):
+        async def _gen():
+            for i in range(0, self._fail_after, self._chunk_size):
+                yield {"message": {"content": self._content[i:i + self._chunk_size]}}
+            raise RuntimeError("verbinding met model verbroken")
+
+        return _gen()
+
+
+@pytest.mark.anyio
+async def test_analyze_with_fields_marks_partial_when_stream_breaks_mid_object():
+    llm_cache.clear()
+    cut = MODEL_OUTPUT.index('"priority_score"')
+    app.state.ollama_client = BrokenStreamingClient(MODEL_OUTPUT, fail_after=cut + 10)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze", json={**PAYLOAD, "fields": ["summary"]})
+
+    assert res.status_code == 200
+    data = res.json()
+    assert data["isPartial"] is True
+    assert data["category"] == "Factuur"
+    assert data["suggestedAction"] == "Actie Vereist"
+    assert data["summary"].startswith("Hallo, hierbij de factuur")
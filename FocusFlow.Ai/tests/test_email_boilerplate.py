@@ -0,0 +1,51 @@
+from features.email.utils.boilerplate import strip_boilerplate
+from features.email.utils.email_text import make_email_input
+
+
+def test_strip_boilerplate_removes_signature_blobs_and_shortens_urls():
+    body = (
+        "Hoi Karsten,\n\n"
+        "Kun je de offerte   voor vrijdag nakijken? "
+        "https://www.example.com/track/click?id=AbCdEf0123456789&utm_source=newsletter\n\n"
+        "Groet,\nJan\n"
+        "-- \n"
+        "Jan Janssens | Sales\n"
+        "Dit bericht is uitsluitend bestemd voor de geadresseerde.\n"
+    )
+
+    cleaned = strip_boilerplate(body)
+
+    assert cleaned.text == (
+        "Hoi Karsten,\n\n"
+        "Kun je de offerte voor vrijdag nakijken? example.com\n\n"
+        "Groet,\nJan"
+    )
+    assert cleaned.removed_chars == len(body) - len(cleaned.text)
+    assert cleaned.saved_tokens > 0
+
+
+def test_strip_boilerplate_drops_trailing_footer_but_keeps_first_paragraph():
+    body = (
+        "Unsubscribe-actie: we hebben je verzoek ontvangen.\n\n"
+        + "Je ontvangt nog één bevestiging per mail. " * 5
+        + "\n\nView in browser | Privacy policy | Unsubscribe\n\n"
+        + "QUJD" * 60
+    )
+
+    text = strip_boilerplate(body).text
+
+    assert text.startswith("Unsubscribe-actie")
+    assert "Privacy policy" not in text
+    assert "QUJD" not in text
+    assert "[data]" in text
+
+
+def test_make_email_input_uses_cleaned_body():
+    email = make_email_input(
+        subject="Vraag",
+        body="Kan je dit bekijken?\n\nSent from my iPhone",
+        sender=None,
+        received_at_utc=None,
+        thread_hint=None,
+    )
+    assert email.body == "Kan je dit bekijken?"
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from shared.token_estimate import estimate_tokens
+from features.email.utils.chunking import split_into_chunks
+
+_PARAGRAPH = "In het kwartaalrapport staan de cijfers per regio en de planning voor het volgende project. " * 6
+
+
+def _long_body(paragraphs: int = 60) -> str:
+    return "\n\n".join(f"{i}. {_PARAGRAPH}" for i in range(paragraphs))
+
+
+def test_split_into_chunks_respects_budget_and_reply_boundaries():
+    text = "Korte intro.\n\n" + _PARAGRAPH + "\n\nFrom: Jan <jan@firma.be>\n" + _PARAGRAPH
+
+    chunks = split_into_chunks(text, chunk_tokens=10_000)
+    assert len(chunks) == 2
+    assert chunks[1].startswith("From: Jan")
+
+    chunks = split_into_chunks(_long_body(), chunk_tokens=300, max_chunks=50)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 300 for c in chunks)
+
+
+@pytest.mark.anyio
+async def test_analyze_long_email_maps_chunks_concurrently_and_reduces(monkeypatch):
+    import features.email.analysis.service as svc
+
+    calls = []
+    active = 0
+    peak = 0
+
+    async def fake_run_llm_json(**kwargs):
+        nonlocal active, peak
+        calls.append(kwargs["log_name"])
+        if kwargs["log_name"] == "email-analysis-reduce":
+            return {"category": "Werk", "suggested_action": "Lezen", "keyRequest": "Lees het rapport.", "summary": "Rapport."}, "ok"
+
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return (
+            {
+                "category": "Werk",
+                "suggested_action": "Lezen",
+                "summary": "Deel van rapport.",
+                "evidence": [f"quote {len(calls)}"],
+                "tasks": [{"description": "Rapport nalezen", "priority": "Medium"}],
+            },
+            "ok",
+        )
+
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    result = await svc.analyze_email(client=object(), subject="Kwartaalrapport", body=_long_body(), user_name="Karsten")
+
+    chunk_calls = calls.count("email-analysis-chunk")
+    assert chunk_calls > 1
+    assert calls[-1] == "email-analysis-reduce"
+    assert peak == chunk_calls
+    assert result.summary == "Rapport."
+    assert [t.description for t in result.extractedTasks] == ["Rapport nalezen"]
+    assert len(result.evidence) == min(3, chunk_calls)
+
+
+@pytest.mark.anyio
+async def test_extract_tasks_long_email_merges_chunks_without_reduce_call(monkeypatch):
+    import features.email.tasks.service as svc
+
+    calls = []
+
+    async def fake_run_llm_json(**kwargs):
+        calls.append(kwargs["log_name"])
+        index = len(calls)
+        return (
+            {
+                "tasks": [
+                    {"title": "Cijfers controleren", "confidence": 0.9, "sourceQuote": "cijfers per regio"},
+                    {"title": f"Actie {index}", "confidence": 0.9, "sourceQuote": "planning"},
+                ],
+                "needsClarification": ["Welke regio?"],
+            },
+            "ok",
+        )
+
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    result = await svc.extract_tasks(client=object(), subject="Rapport", body=_long_body(), user_name="Karsten")
+
+    assert set(calls) == {"extract-tasks-chunk"}
+    titles = [t.title for t in result.tasks]
+    assert titles.count("Cijfers controleren") == 1
+    assert len(titles) == min(5, len(calls) + 1)
+    assert result.needsClarification == ["Welke regio?"]
+
+
+@pytest.mark.anyio
+async def test_overloaded_chunk_cancels_its_siblings(monkeypatch):
+    import features.email.analysis.service as svc
+    from shared.scheduler import SchedulerOverloaded
+
+    started = 0
+    cancelled = 0
+
+    async def fake_run_llm_json(**kwargs):
+        nonlocal started, cancelled
+        started += 1
+        if started == 1:
+            await asyncio.sleep(0)
+            raise SchedulerOverloaded("standard", 3)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    with pytest.raises(SchedulerOverloaded):
+        await svc.analyze_email(client=object(), subject="Kwartaalrapport", body=_long_body(), user_name="Karsten")
+
+    assert started > 1
+    assert cancelled == started - 1
+
+
+@pytest.mark.anyio
+async def test_body_beyond_chunk_limit_marks_tasks_partial(monkeypatch):
+    import features.email.tasks.service as svc
+    from config import settings
+
+    calls = []
+
+    async def fake_run_llm_json(**kwargs):
+        calls.append(kwargs["log_name"])
+        return {"tasks": [], "needsClarification": []}, "ok"
+
+    monkeypatch.setattr(settings, "chunk_max_count", 2)
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    result = await svc.extract_tasks(client=object(), subject="Rapport", body=_long_body(200), user_name="Karsten")
+
+    # de rest van de mail werd niet bekeken
+    assert len(calls) == 2
+    assert result.isPartial is True
@@ -41,7 +41,7 @@ async def test_email_extract_tasks_returns_proposals(monkeypatch):
 
     assert res.status_code == 200
     data = res.json()
-    assert set(data.keys()) == {"tasks", "needsClarification"}
+    assert set(data.keys()) == {"tasks", "needsClarification", "isPartial"}
     assert isinstance(data["tasks"], list)
     assert len(data["tasks"]) == 1
     t = data["tasks"][0]
@@ -0,0 +1,79 @@
+import httpx
+import pytest
+
+from main import app
+
+
+@pytest.mark.anyio
+async def test_email_process_returns_analysis_and_tasks_from_one_call(monkeypatch):
+    calls = []
+
+    async def fake_run_llm_json(*args, **kwargs):
+        calls.append(kwargs)
+        return (
+            {
+                "category": "Factuur",
+                "suggested_action": "Actie Vereist",
+                "priority_score": 80,
+                "keyRequest": "Betaal de factuur van januari.",
+                "summary": "Factuur januari: betaling vereist",
+                "evidence": ["Gelieve te betalen voor 20/01."],
+                "tasks": [
+                    {
+                        "title": "Betaal factuur januari",
+                        "priority": "High",
+                        "dueDate": None,
+                        "dueText": "vrijdag",
+                        "confidence": 0.9,
+                        "sourceQuote": "Gelieve te betalen voor 20/01.",
+                    }
+                ],
+                "needsClarification": [],
+            },
+            "ok",
+        )
+
+    import features.email.process.service as svc
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    payload = {
+        "subject": "Factuur januari",
+        "body": "Hallo, hierbij de factuur voor januari. Gelieve te betalen voor 20/01. Bedankt.",
+        "sender": "boekhouding@firma.be",
+        "receivedAtUtc": "2026-01-10T20:00:00Z",
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/process", json=payload)
+
+    assert res.status_code == 200
+    data = res.json()
+    assert len(calls) == 1
+
+    assert data["analysis"]["category"] == "Factuur"
+    assert data["analysis"]["priorityScore"] in (0, 25, 50, 75, 100)
+    assert data["analysis"]["extractedTasks"] == [{"description": "Betaal factuur januari", "priority": "High"}]
+
+    assert len(data["tasks"]["tasks"]) == 1
+    assert data["tasks"]["tasks"][0]["dueText"] == "vrijdag"
+
+
+@pytest.mark.anyio
+async def test_email_process_skips_tasks_for_fyi_mail(monkeypatch):
+    async def fake_run_llm_json(*args, **kwargs):
+        assert "needsClarification" not in kwargs["system_prompt"]
+        return {"category": "Werk", "suggested_action": "Lezen", "summary": "Ter info.", "tasks": []}, "ok"
+
+    import features.email.process.service as svc
+    monkeypatch.setattr(svc, "run_llm_json", fake_run_llm_json)
+
+    payload = {"subject": "Nieuwe huisstijl", "body": "Ter info: de nieuwe huisstijl staat op het intranet."}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/process", json=payload)
+
+    data = res.json()
+    assert data["analysis"]["category"] == "Werk"
+    assert data["tasks"] == {"tasks": [], "needsClarification": [], "isPartial": False}
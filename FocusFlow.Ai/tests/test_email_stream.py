@@ -0,0 +1,75 @@
+import json
+
+import httpx
+import pytest
+
+from main import app
+
+
+class FakeStreamingClient:
+    def __init__(self, content: str, chunk_size: int = 7):
+        self._content = content
+        self._chunk_size = chunk_size
+        self.closed = False
+
+    async def chat(self, *, stream=False, **kwargs):
+        assert stream is True
+
+        async def _gen():
+            try:
+                for i in range(0, len(self._content), self._chunk_size):
+                    yield {"message": {"content": self._content[i:i + self._chunk_size]}}
+            finally:
+                self.closed = True
+
+        return _gen()
+
+
+def _parse_sse(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.anyio
+async def test_compose_stream_emits_deltas_and_post_processed_done():
+    model_output = json.dumps(
+        {"subject": "Verplaatsing vergadering", "body": "Kunnen we de vergadering [datum] naar woensdag verplaatsen?"}
+    )
+    app.state.ollama_client = FakeStreamingClient(model_output)
+
+    payload = {"prompt": "Vraag of de vergadering van dinsdag naar woensdag kan.", "tone": "Neutral", "language": "nl"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/compose/stream", json=payload)
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_sse(res.text)
+    deltas = [data for event, data in events if event == "delta"]
+    assert len(deltas) > 1
+    assert "".join(d["text"] for d in deltas if d["field"] == "subject") == "Verplaatsing vergadering"
+
+    event, done = events[-1]
+    assert event == "done"
+    assert "[datum]" not in done["body"]
+    assert "Met vriendelijke groeten" in done["body"]
+
+
+@pytest.mark.anyio
+async def test_reply_stream_invalid_json_falls_back_to_empty_reply():
+    app.state.ollama_client = FakeStreamingClient('{"reply": "Dank je, ik kom')
+
+    payload = {"subject": "Vraagje", "body": "Kan je dit vandaag nog bekijken?", "tone": "Neutral", "length": "Short"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/reply/stream", json=payload)
+
+    events = _parse_sse(res.text)
+    assert "".join(d["text"] for e, d in events if e == "delta") == "Dank je, ik kom"
+    assert events[-1] == ("done", {"reply": ""})
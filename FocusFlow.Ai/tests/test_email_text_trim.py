@@ -0,0 +1,87 @@
+import random
+import re
+import time
+
+from config import settings
+from features.email.utils.email_text import _MIN_CUTOFF_AT, trim_body_for_processing
+
+# referentie: de oude patronen, per (gestripte) regel toegepast
+_LINE_PATTERNS = [
+    re.compile(r"-{2,}\s*Original Message\s*-{2,}", re.IGNORECASE),
+    re.compile(r"From:\s.+", re.IGNORECASE),
+    re.compile(r"Sent:\s.+", re.IGNORECASE),
+    re.compile(r"To:\s.+", re.IGNORECASE),
+    re.compile(r"Subject:\s.+", re.IGNORECASE),
+    re.compile(r"Op\s.+\sschreef\s.+:", re.IGNORECASE),
+]
+
+_LINES = [
+    "Hallo team,",
+    "Kun je de offerte nakijken voor vrijdag?",
+    "Met vriendelijke groet",
+    "",
+    "From: Jan <jan@firma.be>",
+    "Sent: maandag 12 januari 2026 10:00",
+    "To: Karsten",
+    "Subject: RE: offerte",
+    "-----Original Message-----",
+    "Op ma 12 jan. 2026 om 10:00 schreef Jan <jan@firma.be>:",
+    "Op maandag schreef ik al iets",
+    "From:",
+    "topic: planning",
+    "   ",
+]
+
+
+def _reference_cut(text: str):
+    pos = 0
+    for line in text.split("\n"):
+        if pos > _MIN_CUTOFF_AT and any(rx.fullmatch(line.strip()) for rx in _LINE_PATTERNS):
+            return pos
+        pos += len(line) + 1
+    return None
+
+
+def _best_ms(fn, runs=3):
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def test_trim_cuts_at_earliest_boundary_like_line_regexes():
+    rnd = random.Random(11)
+    for _ in range(500):
+        text = "\n".join(rnd.choice(_LINES) for _ in range(rnd.randint(1, 40))).strip()
+        cut = _reference_cut(text)
+        expected = text if cut is None else text[:cut].rstrip()
+        assert trim_body_for_processing(text) == expected
+
+
+def test_trim_keeps_short_prefix_before_header():
+    body = "Kort bericht.\nFrom: Jan <jan@firma.be>\nSubject: oud"
+    assert trim_body_for_processing(body) == body
+
+
+def test_trim_is_linear_on_pathological_single_lines():
+    # zonder afsluitende ':' liet "Op\s.+\sschreef\s.+:$" de regex-engine kwadratisch backtracken
+    cases = [
+        "x" * 300 + "\nOp " + "schreef " * 25_000,
+        "x" * 300 + "\nOp " + " " * 200_000 + "schreef",
+        "x" * 300 + "\n" + "From:" * 40_000,
+        "<div>" * 50_000,
+        ("a" * 200 + "\n") * 2_000,
+    ]
+    for body in cases:
+        assert _best_ms(lambda: trim_body_for_processing(body)) < 50
+
+
+def test_trim_stops_scanning_after_max_body_chars():
+    filler = ("Lorem ipsum dolor sit amet.\n" * (settings.max_body_chars // 20))
+    body = filler + "From: Jan <jan@firma.be>\n"
+    trimmed = trim_body_for_processing(body)
+
+    assert "From:" not in trimmed
+    assert len(trimmed) == settings.max_body_chars
@@ -0,0 +1,77 @@
+import httpx
+import pytest
+
+from main import app
+from features.email.analysis.service import _compute_priority_score_bucketed
+from features.email.constants import TRIAGE_BATCH_MAX_ITEMS
+from features.email.triage.service import triage_batch, triage_email
+
+
+_EMAILS = [
+    ("Storing", "De server is down, dringend oplossen aub.", "2026-01-10T08:00:00Z"),
+    ("Factuur januari", "Gelieve te betalen voor 12/01. Kun je bevestigen?", "2026-01-10T08:00:00Z"),
+    ("Meeting", "Kunnen we een call inplannen op 2026-02-20?", "2026-01-10T08:00:00Z"),
+    ("Nieuwsbrief", "Grote korting deze week! Klik hier om je uit te schrijven.", None),
+    ("Ter info", "Ter info: het verslag staat online. Geen actie nodig.", "2026-01-10T08:00:00Z"),
+    ("", "", None),
+]
+
+
+def test_triage_batch_matches_single_and_bucketed_score():
+    batch = triage_batch(
+        [s for s, _, _ in _EMAILS],
+        [b for _, b, _ in _EMAILS],
+        [r for _, _, r in _EMAILS],
+    )
+
+    assert len(batch) == len(_EMAILS)
+    for (subject, body, received), result in zip(_EMAILS, batch):
+        assert triage_email(subject=subject, body=body, received_at_utc=received) == result
+        assert result.priorityScore == _compute_priority_score_bucketed(
+            subject=subject,
+            body=body,
+            category=result.category,
+            suggested_action=result.suggestedAction,
+            received_at_utc=received,
+        )
+
+    assert batch[0].priorityScore == 100
+    assert "INCIDENT_OUTAGE" in batch[0].signals
+    assert batch[1].category == "Factuur"
+    assert "DUE_DATE_SOON" in batch[1].signals
+    assert batch[2].suggestedAction == "Inplannen"
+    assert batch[3].category == "Reclame"
+
+
+@pytest.mark.anyio
+async def test_triage_endpoints_keep_input_order():
+    payload = {
+        "items": [
+            {"id": "a", "subject": "Storing", "body": "Alles is down, dringend!"},
+            {"id": "b", "subject": "Ter info", "body": "Geen actie nodig."},
+        ]
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        single = await client.post("/email/triage", json={"subject": "Storing", "body": "Alles is down, dringend!"})
+        batch = await client.post("/email/triage/batch", json=payload)
+
+    assert single.status_code == 200
+    assert set(single.json().keys()) == {"priorityScore", "category", "suggestedAction", "signals"}
+
+    assert batch.status_code == 200
+    results = batch.json()["results"]
+    assert [r["id"] for r in results] == ["a", "b"]
+    assert results[0]["priorityScore"] == single.json()["priorityScore"]
+
+
+@pytest.mark.anyio
+async def test_triage_batch_rejects_oversized_batches():
+    items = [{"id": str(i), "subject": "x", "body": "y"} for i in range(TRIAGE_BATCH_MAX_ITEMS + 1)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/triage/batch", json={"items": items})
+
+    assert res.status_code == 422
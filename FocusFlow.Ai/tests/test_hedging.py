@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from shared.backends import FakeBackend
+from shared.hedging import HedgePolicy
+from shared.llm_json import run_llm_json
+
+
+@pytest.mark.anyio
+async def test_hedge_starts_second_attempt_after_p90_and_cancels_loser():
+    policy = HedgePolicy(enabled=True, min_samples=5, max_ratio=1.0)
+    for _ in range(10):
+        policy.record("ep", 0.01)
+
+    started = []
+    cancelled = []
+
+    async def attempt():
+        n = len(started)
+        started.append(n)
+        try:
+            await asyncio.sleep(1.0 if n == 0 else 0.0)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return n
+
+    assert await policy.run("ep", attempt) == 1
+    await asyncio.sleep(0)
+    assert started == [0, 1]
+    assert cancelled == [0]
+    assert policy.stats()["hedgeWins"] == 1
+
+
+@pytest.mark.anyio
+async def test_hedge_respects_budget_and_warmup():
+    policy = HedgePolicy(enabled=True, min_samples=5, max_ratio=0.0)
+    calls = []
+
+    async def attempt():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    # te weinig samples: geen p90, dus geen hedge
+    assert await policy.run("ep", attempt) == "ok"
+    for _ in range(10):
+        policy.record("ep", 0.001)
+    # budget 0: ook met p90 geen tweede poging
+    assert await policy.run("ep", attempt) == "ok"
+    assert len(calls) == 2
+    assert policy.stats()["hedged"] == 0
+
+
+@pytest.mark.anyio
+async def test_invalid_json_is_retried_with_lower_temperature():
+    replies = iter(["{niet geldig", '{"ok": true}'])
+    backend = FakeBackend(lambda messages: next(replies))
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Geef JSON.",
+        user_prompt="retry-test",
+        log_name="test-retry",
+    )
+
+    assert status == "ok"
+    assert data == {"ok": True}
+    temps = [c["options"]["temperature"] for c in backend.calls]
+    assert temps[0] > temps[1]
@@ -0,0 +1,128 @@
+import httpx
+import pytest
+
+from main import app
+from config import settings
+from shared.backends import FakeBackend
+from shared.json_tools import repair_json_object
+from shared.llm_json import run_llm_json
+from shared.llm_cache import llm_cache
+
+PAYLOAD = {
+    "subject": "Factuur januari",
+    "body": "Beste,\nGelieve de factuur van januari te betalen voor vrijdag.\nGroeten",
+    "receivedAtUtc": "2026-01-10T08:00:00Z",
+}
+
+
+def test_repair_closes_truncated_output_and_reports_fields():
+    repaired = repair_json_object(
+        '```json\n{"category": "Factuur", "evidence": ["a", "b",], '
+        '"tasks": [{"description": "Betalen", "priority": "Hoog"}, {"description": "Bevest'
+    )
+
+    assert repaired.data == {
+        "category": "Factuur",
+        "evidence": ["a", "b"],
+        "tasks": [{"description": "Betalen", "priority": "Hoog"}],
+    }
+    assert repaired.complete == ("category", "evidence")
+    assert repaired.partial == ("tasks",)
+
+
+def test_repair_keeps_cut_off_text_but_drops_half_values():
+    repaired = repair_json_object('{"summary": "Factuur van januari betalen", "keyRequest": "Betaal de f')
+    assert repaired.data["keyRequest"] == "Betaal de f"
+    assert repaired.partial == ("keyRequest",)
+
+    # half object of literal: weg; niets bruikbaar => None
+    assert repair_json_object('{"a": 1, "b": {"c": "d", "e": tr').data == {"a": 1}
+    assert repair_json_object('{"a": tru') is None
+    assert repair_json_object("geen json") is None
+
+
+@pytest.mark.anyio
+async def test_truncated_analysis_is_salvaged_without_retry():
+    llm_cache.clear()
+    backend = FakeBackend('{"category": "Factuur", "suggested_action": "Actie Vereist", "summary": "Factuur van jan')
+    app.state.ollama_client = backend
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze", json=PAYLOAD)
+
+    data = res.json()
+    assert res.status_code == 200
+    assert data["isPartial"] is True
+    assert data["category"] == "Factuur"
+    assert data["suggestedAction"] == "Actie Vereist"
+    assert len(backend.calls) == 1
+    # onvolledig resultaat komt niet in de cache
+    assert llm_cache.stats()["memoryEntries"] == 0
+
+
+@pytest.mark.anyio
+async def test_truncated_tasks_keep_complete_items():
+    llm_cache.clear()
+    app.state.ollama_client = FakeBackend(
+        '{"tasks": [{"title": "Factuur betalen", "description": "Betaal de factuur van januari", '
+        '"priority": "Hoog", "dueDate": null, "dueText": "vrijdag", "confidence": 0.9, '
+        '"sourceQuote": "Gelieve de factuur van januari te betalen"}, {"title": "Bevest'
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/extract-tasks", json=PAYLOAD)
+
+    data = res.json()
+    assert data["isPartial"] is True
+    assert [t["title"] for t in data["tasks"]] == ["Factuur betalen"]
+
+
+class _PerModelBackend(FakeBackend):
+    def __init__(self, replies) -> None:
+        super().__init__()
+        self._replies = replies
+
+    async def chat(self, *, model, **kwargs):
+        self._responder = self._replies[model]
+        return await super().chat(model=model, **kwargs)
+
+
+@pytest.mark.anyio
+async def test_small_model_escalates_before_its_output_is_salvaged(monkeypatch):
+    monkeypatch.setattr(settings, "ai_model_small", "tiny")
+    llm_cache.clear()
+    truncated = '{"category": "Factuur", "summary": "Factuur van jan'
+    backend = _PerModelBackend({"tiny": truncated, settings.ai_model: '{"category": "Werk", "summary": "Kla'})
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Geef JSON.",
+        user_prompt="volgorde",
+        log_name="test-repair-order",
+        model="tiny",
+    )
+
+    # 1. escalatie, 2. redden (van het grote model), geen nieuwe poging op hetzelfde model
+    assert [c["model"] for c in backend.calls] == ["tiny", settings.ai_model]
+    assert status == "repaired"
+    assert data["category"] == "Werk"
+
+
+@pytest.mark.anyio
+async def test_unsalvageable_output_is_retried_before_giving_up(monkeypatch):
+    monkeypatch.setattr(settings, "json_retry_attempts", 1)
+    llm_cache.clear()
+    backend = FakeBackend("geen json")
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Geef JSON.",
+        user_prompt="volgorde",
+        log_name="test-repair-order",
+    )
+
+    assert (data, status) == (None, "invalid_json")
+    assert len(backend.calls) == 2
+    assert backend.calls[1]["options"]["temperature"] <= backend.calls[0]["options"]["temperature"]
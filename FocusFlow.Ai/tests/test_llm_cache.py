@@ -0,0 +1,74 @@
+import httpx
+import pytest
+
+from main import app
+from shared.llm_cache import LlmResultCache, llm_cache
+
+
+@pytest.mark.anyio
+async def test_run_llm_json_second_call_served_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_ask_model_for_json(client, **kwargs):
+        calls.append(kwargs)
+        return '{"category": "Factuur"}'
+
+    import shared.llm_json as llm_json
+    monkeypatch.setattr(llm_json, "ask_model_for_json", fake_ask_model_for_json)
+    llm_cache.clear()
+
+    for _ in range(2):
+        data, status = await llm_json.run_llm_json(
+            client=object(),
+            system_prompt="system",
+            user_prompt="Onderwerp: Factuur januari",
+            log_name="test",
+            cache=True,
+        )
+        assert status == "ok"
+        assert data == {"category": "Factuur"}
+
+    assert len(calls) == 1
+    assert llm_cache.stats()["hits"] >= 1
+
+
+def test_cache_evicts_least_recently_used_when_over_byte_cap():
+    cache = LlmResultCache(enabled=True, ttl_seconds=60, max_bytes=250)
+
+    cache.set("a" * 64, {"v": "x" * 40})
+    cache.set("b" * 64, {"v": "y" * 40})
+    assert cache.get("a" * 64) is not None
+
+    cache.set("c" * 64, {"v": "z" * 40})
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == {"v": "x" * 40}
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["memoryBytes"] <= 250
+
+
+def test_cache_sqlite_tier_survives_memory_flush(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    first = LlmResultCache(enabled=True, ttl_seconds=60, max_bytes=1024, sqlite_path=path, sqlite_max_bytes=4096)
+    first.set("key", {"summary": "ok"})
+
+    second = LlmResultCache(enabled=True, ttl_seconds=60, max_bytes=1024, sqlite_path=path, sqlite_max_bytes=4096)
+    assert second.get("key") == {"summary": "ok"}
+    assert second.stats()["diskHits"] == 1
+
+
+@pytest.mark.anyio
+async def test_admin_llm_cache_inspect_and_flush():
+    llm_cache.set("admin-test", {"summary": "x"})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.get("/admin/llm-cache")
+        assert res.status_code == 200
+        assert res.json()["memoryEntries"] >= 1
+        assert "diskHits" in res.json() and "disk_hits" not in res.json()
+
+        res = await client.delete("/admin/llm-cache")
+
+    assert res.status_code == 200
+    assert res.json()["stats"]["memoryEntries"] == 0
@@ -0,0 +1,79 @@
+import pytest
+
+from config import settings
+from features.email.utils.model_route import guess_language, route_email_model
+from shared.backends import FakeBackend
+from shared.llm_cache import llm_cache
+from shared.llm_json import run_llm_json
+from features.email.tasks.service import extract_tasks
+
+
+class _PerModelBackend(FakeBackend):
+    def __init__(self, replies) -> None:
+        super().__init__()
+        self._replies = replies
+
+    async def chat(self, *, model, **kwargs):
+        self._responder = self._replies[model]
+        return await super().chat(model=model, **kwargs)
+
+
+@pytest.fixture
+def small_model(monkeypatch):
+    monkeypatch.setattr(settings, "ai_model_small", "tiny")
+    llm_cache.clear()
+    return "tiny"
+
+
+def test_router_picks_small_model_for_short_known_language_mail(small_model):
+    short_nl = "Hoi, kun je de notulen van de vergadering voor vrijdag doorsturen? Alvast bedankt."
+    assert guess_language(short_nl) == "nl"
+    assert route_email_model(endpoint="email-analysis", subject="Notulen", body=short_nl) == small_model
+
+    long_nl = short_nl + " " + " ".join(["Het project loopt verder volgens de planning."] * 200)
+    assert route_email_model(endpoint="email-analysis", subject="Notulen", body=long_nl) == settings.ai_model
+
+    # onbekende taal of endpoint buiten de regels => groot model
+    assert route_email_model(endpoint="email-analysis", subject="", body="Lorem ipsum dolor sit amet") == settings.ai_model
+    assert route_email_model(endpoint="email-compose", subject="Notulen", body=short_nl) == settings.ai_model
+
+
+def test_router_stays_on_default_model_without_small_model():
+    assert settings.ai_model_small is None
+    assert route_email_model(endpoint="email-analysis", subject="Hoi", body="Kun je dit nakijken?") == settings.ai_model
+
+
+@pytest.mark.anyio
+async def test_invalid_json_on_small_model_escalates_to_large(small_model):
+    backend = _PerModelBackend({small_model: "{kapot", settings.ai_model: '{"ok": true}'})
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Geef JSON.",
+        user_prompt="escalatie",
+        log_name="test-escalate",
+        model=small_model,
+    )
+
+    assert (data, status) == ({"ok": True}, "ok")
+    assert [c["model"] for c in backend.calls][-1] == settings.ai_model
+    assert all(c["model"] == small_model for c in backend.calls[:-1])
+
+
+@pytest.mark.anyio
+async def test_low_confidence_tasks_escalate_to_large_model(small_model):
+    task = {"title": "Stuur de notulen door", "confidence": 0.9, "sourceQuote": "kun je de notulen doorsturen"}
+    backend = _PerModelBackend({
+        small_model: {"tasks": [{**task, "confidence": 0.2}], "needsClarification": []},
+        settings.ai_model: {"tasks": [task], "needsClarification": []},
+    })
+
+    res = await extract_tasks(
+        client=backend,
+        subject="Notulen",
+        body="Hoi, kun je de notulen van de vergadering voor vrijdag doorsturen? Alvast bedankt.",
+        user_name="Karsten",
+    )
+
+    assert [c["model"] for c in backend.calls] == [small_model, settings.ai_model]
+    assert res.tasks[0].confidence == 0.9
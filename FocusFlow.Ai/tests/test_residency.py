@@ -0,0 +1,178 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from main import app
+from config import settings
+from shared.backends import BackendCapabilities, FakeBackend, HostPool
+from shared.residency import ModelResidency, model_residency
+
+
+class _OllamaLike(FakeBackend):
+    def __init__(self, loaded):
+        super().__init__(capabilities=BackendCapabilities(json_schema=True, residency=True))
+        self.loaded = loaded
+
+    async def loaded_models(self):
+        return list(self.loaded)
+
+
+class _SlowToLoad(FakeBackend):
+    def __init__(self):
+        super().__init__()
+        self.loaded = asyncio.Event()
+
+    async def chat(self, **kwargs):
+        await self.loaded.wait()
+        return await super().chat(**kwargs)
+
+
+async def _health_during_lifespan():
+    transport = httpx.ASGITransport(app=app)
+    statuses = []
+    try:
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                statuses.append(await client.get("/health"))
+                backend = app.state.ollama_client
+                if isinstance(backend, _SlowToLoad):
+                    backend.loaded.set()
+                for _ in range(100):
+                    res = await client.get("/health")
+                    if res.status_code == 200:
+                        break
+                    await asyncio.sleep(0.01)
+                statuses.append(res)
+    finally:
+        model_residency.reset()
+    return statuses
+
+
+@pytest.mark.anyio
+async def test_evicted_model_is_rewarmed_with_feature_prompts(monkeypatch):
+    monkeypatch.setattr(settings, "ai_model", "llama3.2")
+    monkeypatch.setattr(settings, "ai_model_small", "llama3.2:1b")
+    backend = _OllamaLike(loaded=["llama3.2:latest", "llama3.2:1b"])
+    residency = ModelResidency(poll_seconds=0)
+    residency.register_prompts({"email-analysis": "SYS-A", "extract-tasks": "SYS-T"})
+
+    await residency.warm_up(backend)
+    assert residency.is_ready()
+    assert {(c["model"], c["messages"][0]["content"]) for c in backend.calls} == {
+        ("llama3.2", "SYS-A"),
+        ("llama3.2", "SYS-T"),
+        ("llama3.2:1b", "SYS-A"),
+        ("llama3.2:1b", "SYS-T"),
+    }
+    assert all(c["options"]["num_predict"] == 1 for c in backend.calls)
+
+    # Ollama heeft het kleine model uitgeladen
+    backend.loaded = ["llama3.2:latest"]
+    backend.calls.clear()
+    await residency.check(backend)
+
+    assert [c["model"] for c in backend.calls] == ["llama3.2:1b", "llama3.2:1b"]
+    models = residency.stats()["models"]
+    assert models["llama3.2:1b"]["evictions"] == 1
+    assert models["llama3.2:1b"]["resident"] is True
+    assert models["llama3.2"]["evictions"] == 0
+
+
+@pytest.mark.anyio
+async def test_pool_hosts_are_warmed_and_rewarmed_one_by_one(monkeypatch):
+    monkeypatch.setattr(settings, "ai_model", "llama3.2")
+    monkeypatch.setattr(settings, "ai_model_small", "")
+    first, second = _OllamaLike(loaded=["llama3.2:latest"]), _OllamaLike(loaded=["llama3.2:latest"])
+    pool = HostPool({"gpu-a": first, "gpu-b": second})
+    residency = ModelResidency(poll_seconds=0)
+
+    await residency.warm_up(pool)
+    assert len(first.calls) == len(second.calls) == 1
+
+    # alleen gpu-b heeft het model uitgeladen
+    second.loaded = []
+    first.calls.clear()
+    second.calls.clear()
+    await residency.check(pool)
+
+    assert (len(first.calls), len(second.calls)) == (0, 1)
+    assert residency.stats()["models"]["llama3.2"]["hosts"] == {"gpu-a": True, "gpu-b": True}
+    assert residency.stats()["models"]["llama3.2"]["evictions"] == 1
+
+
+@pytest.mark.anyio
+async def test_health_reports_warming_until_the_background_warmup_is_done(monkeypatch):
+    model_residency.reset()
+    monkeypatch.setattr(main, "create_backend", lambda _settings: _SlowToLoad())
+
+    warming, ready = await _health_during_lifespan()
+
+    assert warming.status_code == 503
+    assert warming.json()["status"] == "warming"
+    assert ready.status_code == 200
+    assert ready.json()["status"] == "ok"
+    assert ready.json()["llm"]["models"][settings.ai_model]["resident"] is True
+
+
+@pytest.mark.anyio
+async def test_health_is_ready_without_a_backend(monkeypatch):
+    model_residency.reset()
+
+    def _missing(_settings):
+        raise ModuleNotFoundError("ollama")
+
+    monkeypatch.setattr(main, "create_backend", _missing)
+
+    first, _ = await _health_during_lifespan()
+
+    assert first.status_code == 200
+
+
+class _UnreachableLater(_OllamaLike):
+    async def loaded_models(self):
+        if self.loaded is None:
+            raise ConnectionError("connection refused")
+        return list(self.loaded)
+
+
+@pytest.mark.anyio
+async def test_outage_after_warmup_keeps_the_service_ready(monkeypatch):
+    monkeypatch.setattr(settings, "ai_model", "llama3.2")
+    monkeypatch.setattr(settings, "ai_model_small", "")
+    backend = _UnreachableLater(loaded=["llama3.2:latest"])
+    residency = ModelResidency(poll_seconds=60)
+
+    await residency.warm_up(backend)
+    assert residency.is_ready()
+
+    # Ollama onbereikbaar: informatief, geen 503 (de breaker antwoordt degraded)
+    backend.loaded = None
+    await residency.check(backend)
+
+    assert residency.is_ready()
+    assert residency.stats()["resident"] is False
+    assert residency.stats()["models"]["llama3.2"]["resident"] is False
+
+
+class _DownAtStart(_OllamaLike):
+    async def chat(self, **kwargs):
+        if not self.loaded:
+            raise ConnectionError("connection refused")
+        return await super().chat(**kwargs)
+
+
+@pytest.mark.anyio
+async def test_failed_first_warmup_stays_warming_until_a_check_succeeds(monkeypatch):
+    monkeypatch.setattr(settings, "ai_model", "llama3.2")
+    monkeypatch.setattr(settings, "ai_model_small", "")
+    backend = _DownAtStart(loaded=[])
+    residency = ModelResidency(poll_seconds=60)
+
+    await residency.warm_up(backend)
+    assert not residency.is_ready()
+
+    backend.loaded = ["llama3.2:latest"]
+    await residency.check(backend)
+    assert residency.is_ready()
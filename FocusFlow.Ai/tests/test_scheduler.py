@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+from main import app
+from shared.scheduler import AdmissionScheduler, SchedulerOverloaded
+
+
+@pytest.mark.anyio
+async def test_interactive_waiters_are_served_before_batch():
+    scheduler = AdmissionScheduler(max_concurrency=1, queue_limits={"interactive": 5, "standard": 5, "batch": 5})
+    order = []
+
+    async def job(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async with scheduler.slot("standard"):
+        tasks = [
+            asyncio.create_task(job("batch", "batch")),
+            asyncio.create_task(job("standard", "standard")),
+            asyncio.create_task(job("interactive", "interactive")),
+        ]
+        await asyncio.sleep(0.01)
+
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "standard", "batch"]
+    assert scheduler.stats()["active"] == 0
+
+
+@pytest.mark.anyio
+async def test_full_queue_sheds_with_retry_after():
+    scheduler = AdmissionScheduler(max_concurrency=1, queue_limits={"interactive": 1, "standard": 0, "batch": 0})
+
+    async with scheduler.slot("interactive"):
+        with pytest.raises(SchedulerOverloaded) as exc_info:
+            async with scheduler.slot("batch"):
+                pass
+
+    assert exc_info.value.retry_after_seconds >= 1
+    assert scheduler.stats()["queues"]["batch"]["rejected"] == 1
+
+
+@pytest.mark.anyio
+async def test_overloaded_scheduler_maps_to_429(monkeypatch):
+    async def fake_ask_model_for_json(*args, **kwargs):
+        raise SchedulerOverloaded("interactive", 7)
+
+    import shared.llm_json as llm_json
+    monkeypatch.setattr(llm_json, "ask_model_for_json", fake_ask_model_for_json)
+
+    payload = {"prompt": "Vraag of de vergadering van dinsdag naar woensdag kan verschuiven."}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/compose", json=payload)
+
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == "7"
@@ -0,0 +1,110 @@
+import random
+import re
+import time
+from datetime import date
+
+import httpx
+import pytest
+
+from main import app
+from shared.backends import FakeBackend
+from shared.llm_cache import llm_cache
+
+from features.email.utils import signals
+from features.email.utils.signals import deadline_days, scan_signals
+
+
+def _family_regex(keywords):
+    parts = [k[:-1] + r"\w*" if k.endswith("*") else r"\s+".join(map(re.escape, k.split())) for k in keywords]
+    return re.compile(r"(?i)\b(?:" + "|".join(parts) + r")\b")
+
+
+_REFERENCE = [(bit, _family_regex(keywords)) for bit, keywords in signals._FAMILIES]
+
+_VOCAB = [
+    kw.rstrip("*") for _, keywords in signals._FAMILIES for kw in keywords
+] + ["moeten", "voorstellen", "nummer", "Dringend!", "betaalde", "ter", "info", "kun", "je", "12/01", "2026-02-05"]
+_FILLER = ["de", "het", "project", "status", "klant", "hallo", "rapport", "\n", ",", "."]
+
+
+def _reference_bits(text: str) -> int:
+    bits = 0
+    for bit, rx in _REFERENCE:
+        if rx.search(text):
+            bits |= bit
+    return bits
+
+
+def test_scanner_matches_one_regex_per_family():
+    rnd = random.Random(7)
+    for _ in range(300):
+        words = [rnd.choice(_VOCAB if rnd.random() < 0.3 else _FILLER) for _ in range(rnd.randint(1, 30))]
+        text = " ".join(w.upper() if rnd.random() < 0.1 else w for w in words)
+
+        scan = scan_signals(text)
+        assert scan.bits & ~signals.DATE == _reference_bits(text), text
+
+
+def test_scanner_dates_and_positions():
+    text = "Graag betaling voor 12/01, anders 2026-02-05. FYI"
+    scan = scan_signals(text)
+
+    expected = signals.PAYMENT | signals.DEADLINE_WORD | signals.FYI | signals.DATE
+    assert scan.bits & expected == expected
+    assert (signals.PAYMENT, text.index("betaling")) in scan.positions
+    assert scan.dates == ((None, 1, 12), (2026, 2, 5))
+    assert deadline_days(scan.dates, date(2026, 1, 10)) == 2
+    assert deadline_days(scan.dates, date(2026, 3, 1)) == -24
+    assert not scan.fyi_without_action
+
+
+def test_scanner_is_faster_than_separate_regexes_on_long_body():
+    rnd = random.Random(1)
+    body = " ".join(rnd.choice(_FILLER[:-3]) for _ in range(3000))[:12000] + " dringend voor 12/01"
+
+    def _separate():
+        _reference_bits(body)
+        lowered = body.lower()
+        any(m in lowered for m in ("geen actie", "no action", "ter info", "fyi"))
+
+    def _best_of(fn, runs=5, loops=10):
+        best = float("inf")
+        for _ in range(runs):
+            started = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    separate = _best_of(_separate)
+    single = _best_of(lambda: scan_signals(body))
+
+    assert scan_signals(body).has(signals.URGENT | signals.DATE)
+    # relatief, geen absolute tijd: één gecombineerde scan mag niet trager zijn
+    assert single <= separate
+
+
+@pytest.mark.anyio
+async def test_each_request_scans_the_email_once(monkeypatch):
+    calls = []
+    real_scan = signals.scan_signals
+
+    def _spy(text):
+        calls.append(text)
+        return real_scan(text)
+
+    monkeypatch.setattr(signals, "scan_signals", _spy)
+    llm_cache.clear()
+    app.state.ollama_client = FakeBackend(
+        '{"category": "Factuur", "suggested_action": "Actie Vereist", "summary": "Factuur betalen.", '
+        '"evidence": [], "tasks": []}'
+    )
+    payload = {"subject": "Factuur januari", "body": "Gelieve dringend te betalen voor 12/01."}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for path in ("/email/analyze", "/email/analyze/stream", "/email/extract-tasks", "/email/process"):
+            calls.clear()
+            res = await client.post(path, json=payload)
+            assert res.status_code == 200
+            assert len(calls) == 1, path
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from shared.single_flight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_identical_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flights.do("k", factory, timeout=1) for _ in range(3)))
+
+    assert results == ["result"] * 3
+    assert calls == 1
+    assert flights.stats()["coalesced"] == 2
+    assert flights.stats()["inFlight"] == 0
+
+
+@pytest.mark.anyio
+async def test_cancelling_one_waiter_keeps_shared_call_for_others():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def factory():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.do("k", factory, timeout=1))
+    second = asyncio.create_task(flights.do("k", factory, timeout=1))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "done"
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.anyio
+async def test_waiter_timeout_is_independent_and_last_waiter_cancels_call():
+    flights = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def factory():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    slow = asyncio.create_task(flights.do("k", factory, timeout=0.2))
+    await asyncio.sleep(0)
+    with pytest.raises(TimeoutError):
+        await flights.do("k", factory, timeout=0.01)
+
+    assert not cancelled.is_set()
+
+    with pytest.raises(TimeoutError):
+        await slow
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+
+
+@pytest.mark.anyio
+async def test_keep_on_timeout_lets_a_retry_join_the_running_call():
+    flights = SingleFlight()
+    calls = 0
+    late = []
+
+    async def factory():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return "done"
+
+    with pytest.raises(TimeoutError):
+        await flights.do("k", factory, timeout=0.01, keep_on_timeout=True)
+    assert flights.when_done("k", late.append)
+
+    assert await flights.do("k", factory, timeout=1) == "done"
+    assert calls == 1
+    assert late == ["done"]
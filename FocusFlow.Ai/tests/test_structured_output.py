@@ -0,0 +1,102 @@
+import httpx
+import pytest
+
+from main import app
+from features.email.contracts import ANALYSIS_CONTRACT, REPLY_CONTRACT, TASKS_CONTRACT
+from shared.backends import BackendCapabilities, FakeBackend
+from shared.llm_cache import llm_cache
+from shared.llm_json import run_llm_json, stream_llm_json
+
+
+def test_contract_schema_uses_compact_keys_and_expands_back():
+    schema = TASKS_CONTRACT.schema()
+    assert schema["required"] == ["t", "nc"]
+    assert schema["additionalProperties"] is False
+    item = schema["properties"]["t"]["items"]
+    assert item["properties"]["pr"]["enum"] == ["High", "Medium", "Low"]
+    assert schema["properties"]["t"]["maxItems"] == 5
+
+    expanded = TASKS_CONTRACT.expand({"t": [{"ti": "Betaal factuur", "cf": 0.9, "q": "betalen"}], "nc": []})
+    assert expanded == {
+        "tasks": [{"title": "Betaal factuur", "confidence": 0.9, "sourceQuote": "betalen"}],
+        "needsClarification": [],
+    }
+    # volledige namen (backend zonder schema) blijven werken
+    assert TASKS_CONTRACT.expand({"tasks": []}) == {"tasks": []}
+
+
+@pytest.mark.anyio
+async def test_run_llm_json_sends_schema_and_returns_full_field_names():
+    backend = FakeBackend({"cat": "Factuur", "act": "Actie Vereist", "req": "Betalen.", "sum": "Factuur.", "ev": [], "t": []})
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Analyseer.",
+        user_prompt="schema-test",
+        log_name="test-schema",
+        contract=ANALYSIS_CONTRACT,
+    )
+
+    assert status == "ok"
+    assert data["category"] == "Factuur" and data["suggested_action"] == "Actie Vereist"
+    call = backend.calls[0]
+    assert call["format"] == ANALYSIS_CONTRACT.schema()
+    assert "cat = category" in call["messages"][0]["content"]
+
+
+@pytest.mark.anyio
+async def test_backend_without_schema_support_keeps_plain_json():
+    backend = FakeBackend('{"reply": "Hoi"}', capabilities=BackendCapabilities(json_schema=False, streaming=False))
+
+    data, status = await run_llm_json(
+        client=backend,
+        system_prompt="Antwoord.",
+        user_prompt="plain-test",
+        log_name="test-plain",
+        contract=REPLY_CONTRACT,
+    )
+
+    assert (data, status) == ({"reply": "Hoi"}, "ok")
+    assert backend.calls[0]["format"] == "json"
+    assert backend.calls[0]["messages"][0]["content"] == "Antwoord."
+
+
+@pytest.mark.anyio
+async def test_stream_maps_compact_keys_to_field_events():
+    backend = FakeBackend('{"r": "Dag Jan, prima zo."}', chunk_size=4)
+
+    events = [
+        e async for e in stream_llm_json(
+            client=backend,
+            system_prompt="Antwoord.",
+            user_prompt="stream-test",
+            log_name="test-stream",
+            stream_fields=("reply",),
+            contract=REPLY_CONTRACT,
+        )
+    ]
+
+    assert "".join(e.text for e in events if e.field == "reply") == "Dag Jan, prima zo."
+    assert events[-1].data == {"reply": "Dag Jan, prima zo."}
+
+
+@pytest.mark.anyio
+async def test_analyze_endpoint_with_compact_model_output():
+    llm_cache.clear()
+    app.state.ollama_client = FakeBackend({
+        "cat": "Werk",
+        "act": "Antwoorden",
+        "req": "Rapport nakijken.",
+        "sum": "Vraag om het rapport na te kijken.",
+        "ev": ["Kun je het rapport nakijken?"],
+        "t": [{"d": "Rapport nakijken", "p": "High"}],
+    })
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        res = await client.post("/email/analyze", json={"subject": "Rapport", "body": "Kun je het rapport nakijken?"})
+
+    data = res.json()
+    assert data["category"] == "Werk"
+    assert data["keyRequest"] == "Rapport nakijken."
+    assert data["extractedTasks"] == [{"description": "Rapport nakijken", "priority": "High"}]
@@ -0,0 +1,50 @@
+import pytest
+
+import shared.ai_client as ai_client
+from config import settings
+from shared.ai_client import ContextTiers, ask_model_for_json
+from shared.token_estimate import estimate_tokens, fit_to_tokens
+
+
+def test_fit_to_tokens_cuts_on_word_boundary_within_budget():
+    text = "Beste Karsten, " + "dit is een zin over de planning. " * 400
+
+    fitted = fit_to_tokens(text, 200)
+
+    assert estimate_tokens(fitted) <= 200
+    assert text.startswith(fitted)
+    assert not fitted.endswith(" ")
+    assert fit_to_tokens("kort", 200) == "kort"
+
+
+def test_context_tiers_only_grow_and_stay_put():
+    tiers = ContextTiers([8192, 4096])
+
+    assert tiers.pick(1000) == 4096
+    assert tiers.pick(5000) == 8192
+    assert tiers.pick(1000) == 8192
+    assert tiers.pick(20000) == 8192
+
+
+@pytest.mark.anyio
+async def test_ask_model_sets_ctx_tier_and_cuts_oversized_prompt(monkeypatch):
+    monkeypatch.setattr(ai_client, "context_tiers", ContextTiers([1024, 2048]))
+    seen = {}
+
+    class FakeClient:
+        async def chat(self, *, model, messages, format, options):
+            seen["options"] = options
+            seen["user"] = messages[1]["content"]
+            return {"message": {"content": "{}"}}
+
+    await ask_model_for_json(FakeClient(), system_prompt="Geef JSON.", user_prompt="Hallo", num_predict=128)
+    assert seen["options"]["num_ctx"] == 1024
+    assert seen["options"]["num_predict"] == 128
+
+    huge = "Onderwerp: test\n\n" + "woord " * 5000
+    await ask_model_for_json(FakeClient(), system_prompt="Geef JSON.", user_prompt=huge, num_predict=256)
+
+    budget = 2048 - estimate_tokens("Geef JSON.") - 256 - settings.llm_prompt_overhead_tokens
+    assert seen["options"]["num_ctx"] == 2048
+    assert estimate_tokens(seen["user"]) <= budget
+    assert huge.startswith(seen["user"])